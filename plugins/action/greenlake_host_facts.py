@@ -0,0 +1,11 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from ansible_collections.hpe.greenlake_data_services.plugins.plugin_utils.controller import GreenLakeActionBase
+
+
+class ActionModule(GreenLakeActionBase):
+
+    MODULE_NAME = 'greenlake_host_facts'
@@ -0,0 +1,322 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import asyncio
+import json
+
+try:
+    import httpx
+    HAS_HTTPX = True
+except ImportError:
+    HAS_HTTPX = False
+
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+BACKENDS = ('httpx', 'aiohttp')
+
+DEFAULT_MAX_CONNECTIONS = 100
+
+# Longest wait of a request for a slot of the concurrency limiter before
+# checking it again, in seconds
+SLOT_WAIT = 0.05
+
+TASKS_PATH = '/api/v1/tasks/'
+
+
+class AsyncTransport(object):
+    """
+    asyncio HTTP transport of the API, running many requests and task
+    polls concurrently on one thread.
+
+    The transport honours the rate limiter of the module without blocking
+    the event loop, and retries the requests answered with 429.
+    """
+
+    def __init__(self, base_url, get_headers, backend=None,
+                 max_connections=DEFAULT_MAX_CONNECTIONS, rate_limiter=None,
+                 throttle_retries=3, on_request=None, on_coalesced=None,
+                 http2=False, concurrency_limiter=None):
+        """
+        Args:
+            base_url: API host url.
+            get_headers: callable returning the request headers.
+            backend: 'httpx' or 'aiohttp', the first installed one when None.
+            max_connections: maximum number of concurrent requests.
+            rate_limiter: TokenBucketRateLimiter instance, or None.
+            throttle_retries: number of retries of the requests answered
+                with 429.
+            on_request: callable called with the kind of every request sent.
+            on_coalesced: callable called with the key of every GET request
+                sharing the response of an identical one in flight.
+            http2: negotiate HTTP/2, with the httpx backend only.
+            concurrency_limiter: AdaptiveConcurrencyLimiter bounding the
+                requests in flight below max_connections, or None.
+        """
+        if backend is None:
+            backend = 'httpx' if HAS_HTTPX else 'aiohttp'
+        if not {'httpx': HAS_HTTPX, 'aiohttp': HAS_AIOHTTP}.get(backend):
+            raise ImportError(
+                "The async transport requires httpx or aiohttp")
+
+        self.base_url = base_url.rstrip('/')
+        self.get_headers = get_headers
+        self.backend = backend
+        self.max_connections = max_connections
+        self.rate_limiter = rate_limiter
+        self.throttle_retries = throttle_retries
+        self.on_request = on_request
+        self.on_coalesced = on_coalesced
+        self.http2 = http2
+        self.concurrency_limiter = concurrency_limiter
+        self._inflight = {}
+        self._session = None
+        self._semaphore = None
+        self._slot_freed = None
+
+    async def __aenter__(self):
+        if self.backend == 'httpx':
+            self._session = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(max_connections=self.max_connections))
+        else:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.max_connections))
+        self._semaphore = asyncio.Semaphore(self.max_connections)
+        self._slot_freed = asyncio.Condition()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self.backend == 'httpx':
+            await self._session.aclose()
+        else:
+            await self._session.close()
+        self._session = None
+
+    async def _throttle(self, kind):
+        if self.on_request:
+            self.on_request(kind)
+        if self.rate_limiter:
+            wait = self.rate_limiter.reserve(kind)
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+    async def _acquire_slot(self):
+        """
+        Waits for a slot of the concurrency limiter without blocking the
+        event loop. The wait is bounded, the slots being also freed by the
+        requests of other threads.
+        """
+        while True:
+            ticket = self.concurrency_limiter.try_acquire()
+            if ticket is not None:
+                return ticket
+            async with self._slot_freed:
+                try:
+                    await asyncio.wait_for(self._slot_freed.wait(),
+                                           SLOT_WAIT)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _limited_send(self, kind, method, url, params, data):
+        """
+        Sends a request within the concurrency limiter, if any, and reports
+        its latency and throttling to it.
+        """
+        if not self.concurrency_limiter:
+            return await self._send(method, url, params, data)
+
+        ticket = await self._acquire_slot()
+        status = None
+        try:
+            status, headers, body = await self._send(method, url, params,
+                                                     data)
+            return status, headers, body
+        finally:
+            self.concurrency_limiter.release(ticket, kind, status == 429)
+            async with self._slot_freed:
+                self._slot_freed.notify_all()
+
+    async def _send(self, method, url, params, data):
+        headers = self.get_headers()
+        if self.backend == 'httpx':
+            response = await self._session.request(
+                method, url, params=params, content=data, headers=headers)
+            return response.status_code, response.headers, response.content
+
+        async with self._session.request(method, url, params=params,
+                                         data=data,
+                                         headers=headers) as response:
+            return response.status, response.headers, await response.read()
+
+    async def request(self, method, path, params=None, data=None, kind=None):
+        """
+        Sends a request. Identical GET requests in flight at the same time
+        share one call.
+
+        Args:
+            method: HTTP method.
+            path: API path, e.g. '/api/v1/volumes'.
+            params: query parameters.
+            data: request body, a dict is sent as JSON.
+            kind: rate limiter bucket, 'read', 'write' or 'poll'.
+        Returns: tuple of the status code, the headers and the body.
+        """
+        if method.upper() != 'GET':
+            return await self._request(method, path, params, data, kind)
+
+        key = 'GET {0}{1}'.format(self.base_url + path, '?' + '&'.join(
+            '{0}={1}'.format(name, value) for name, value
+            in sorted((params or {}).items())) if params else '')
+        flight = self._inflight.get(key)
+        if flight is not None:
+            if self.on_coalesced:
+                self.on_coalesced(key)
+            return await asyncio.shield(flight)
+
+        flight = asyncio.ensure_future(self._request(method, path, params,
+                                                     data, kind))
+        self._inflight[key] = flight
+        try:
+            return await asyncio.shield(flight)
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _request(self, method, path, params, data, kind):
+        if data is not None and not isinstance(data, (str, bytes)):
+            data = json.dumps(data)
+        if kind is None:
+            kind = 'read' if method.upper() == 'GET' else 'write'
+
+        url = self.base_url + path
+        async with self._semaphore:
+            for attempt in range(self.throttle_retries + 1):
+                await self._throttle(kind)
+                status, headers, body = await self._limited_send(
+                    kind, method, url, params, data)
+                if status != 429 or attempt == self.throttle_retries:
+                    break
+                try:
+                    delay = float(headers.get('Retry-After') or 1)
+                except ValueError:
+                    delay = 1.0
+                if self.rate_limiter:
+                    self.rate_limiter.penalize(kind, delay)
+                await asyncio.sleep(delay)
+
+        return status, headers, body
+
+    async def request_json(self, method, path, params=None, data=None,
+                           kind=None, decode=json.loads):
+        """
+        Sends a request and decodes its JSON body.
+
+        Raises: AsyncTransportError when the API answers an error status.
+        """
+        status, _, body = await self.request(method, path, params, data, kind)
+        if status >= 400:
+            raise AsyncTransportError(status, body)
+        return decode(body) if body else {}
+
+    async def map(self, func, items, limit=None):
+        """
+        Awaits func on every item, at most limit at a time.
+
+        Returns: list of (result, exception) tuples, in the order of the
+            items. The exception is None when the call succeeded.
+        """
+        semaphore = asyncio.Semaphore(limit or self.max_connections)
+
+        async def call(item):
+            async with semaphore:
+                try:
+                    return await func(item), None
+                except Exception as exception:
+                    return None, exception
+
+        return list(await asyncio.gather(*[call(item) for item in items]))
+
+    async def wait_for_tasks(self, tasks, pending_statuses, failed_statuses,
+                             interval=5, decode=json.loads):
+        """
+        Waits for several tasks, polling all the pending ones concurrently
+        in every round.
+
+        Returns: list of (task, error) tuples, in the order of the tasks.
+        """
+        results = [[task, False] for task in tasks]
+        pending = [(result, result[0].get("task_uri")
+                    or result[0].get("taskUri")) for result in results
+                   if result[0].get("status") in pending_statuses]
+
+        async def poll(item):
+            result, task_uri = item
+            path = (task_uri if task_uri.startswith('/')
+                    else TASKS_PATH + task_uri)
+            result[0] = await self.request_json('GET', path, kind='poll',
+                                                decode=decode)
+
+        while pending:
+            await asyncio.sleep(interval)
+            for _, error in await self.map(poll, pending):
+                if error:
+                    raise error
+
+            still_pending = []
+            for result, task_uri in pending:
+                task = result[0]
+                if task.get("status") in failed_statuses:
+                    result[1] = True
+                elif (task.get("status") in pending_statuses
+                      and task.get('state') != 'SUCCEEDED'):
+                    still_pending.append((result, task_uri))
+            pending = still_pending
+
+        return [tuple(result) for result in results]
+
+
+class AsyncTransportError(Exception):
+    """
+    Error status answered by the API to a request of the async transport.
+    """
+
+    def __init__(self, status, body):
+        self.status = status
+        self.body = body
+        super(AsyncTransportError, self).__init__(
+            "HTTP {0}: {1}".format(status, body[:500] if body else ''))
+
+
+def get_async_options(settings):
+    """
+    Parses the async_transport setting of a module.
+
+    Args:
+        settings: True, the name of the backend, or a dict with the backend
+            and max_connections keys.
+    Returns: the AsyncTransport keyword arguments, or None when the async
+        transport is disabled or no backend is installed.
+    """
+    if not settings:
+        return None
+    if settings is True or str(settings).lower() in ('true', 'yes', 'on'):
+        settings = {}
+    elif not isinstance(settings, dict):
+        settings = {'backend': str(settings)}
+
+    backend = settings.get('backend')
+    available = {'httpx': HAS_HTTPX, 'aiohttp': HAS_AIOHTTP}
+    if backend is None:
+        backend = next((name for name in BACKENDS if available[name]), None)
+    if not available.get(backend):
+        return None
+
+    return dict(backend=backend,
+                max_connections=int(settings.get('max_connections')
+                                    or DEFAULT_MAX_CONNECTIONS))
@@ -0,0 +1,433 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import collections
+import datetime
+import hashlib
+import json
+import logging
+import logging.handlers
+import os
+import threading
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.greenlake import attribute_name
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.timestamps import parse_timestamp
+
+# Length of the ISO 8601 timestamp prefix naming each time bucket
+TIME_BUCKETS = {
+    'minute': 16,
+    'hour': 13,
+    'day': 10,
+    'month': 7,
+}
+
+TIME_FORMAT = '%Y-%m-%dT%H:%M:%SZ'
+
+DEFAULT_GROUP_BY = ['user_email', 'category', 'associated_resource.type']
+TIME_FIELD = 'occurred_at'
+
+
+def get_event_field(event, field):
+    """
+    Returns a field of a decoded event, nested fields separated by '.'.
+    """
+    for part in field.split('.'):
+        if not isinstance(event, dict):
+            return None
+        event = event.get(attribute_name(part))
+    return event
+
+
+class EventAggregator(object):
+    """
+    Counts the audit events by group and time bucket as they are streamed,
+    so the memory used is bounded by the number of groups instead of the
+    number of events.
+    """
+
+    def __init__(self, group_by=None, time_bucket=None):
+        """
+        Args:
+            group_by: fields counted separately and together, nested fields
+                separated by '.'.
+            time_bucket: one of TIME_BUCKETS, or None.
+        """
+        self.group_by = list(group_by or DEFAULT_GROUP_BY)
+        self.time_bucket = time_bucket
+        self.total = 0
+        self.first = None
+        self.last = None
+        self.fields = dict((field, collections.Counter())
+                           for field in self.group_by)
+        self.buckets = collections.Counter()
+        self.groups = collections.Counter()
+
+    def add(self, event):
+        self.total += 1
+
+        occurred_at = get_event_field(event, TIME_FIELD)
+        if occurred_at:
+            occurred_at = str(occurred_at)
+            if self.first is None or occurred_at < self.first:
+                self.first = occurred_at
+            if self.last is None or occurred_at > self.last:
+                self.last = occurred_at
+
+        bucket = None
+        if self.time_bucket:
+            bucket = (occurred_at[:TIME_BUCKETS[self.time_bucket]]
+                      if occurred_at else None)
+            self.buckets[bucket] += 1
+
+        values = []
+        for field in self.group_by:
+            value = get_event_field(event, field)
+            if isinstance(value, (dict, list)):
+                value = str(value)
+            self.fields[field][value] += 1
+            values.append(value)
+
+        self.groups[tuple(values) + (bucket,)] += 1
+
+    def to_facts(self):
+        """
+        Returns the counters as plain dicts, the groups sorted by count.
+        """
+        groups = []
+        for key, count in self.groups.most_common():
+            group = dict(zip(self.group_by, key[:-1]))
+            if self.time_bucket:
+                group['bucket'] = key[-1]
+            group['count'] = count
+            groups.append(group)
+
+        facts = dict(
+            total=self.total,
+            first=self.first,
+            last=self.last,
+            by_field=dict((field, dict(counter.most_common()))
+                          for field, counter in self.fields.items()),
+            groups=groups)
+
+        if self.time_bucket:
+            facts['buckets'] = dict(sorted(
+                self.buckets.items(), key=lambda item: str(item[0])))
+
+        return facts
+
+
+def parse_time(value):
+    """
+    Parses an ISO 8601 timestamp into a naive UTC datetime.
+    """
+    return parse_timestamp(value).replace(tzinfo=None)
+
+
+def split_time_range(start, end, window_hours):
+    """
+    Splits a time range into consecutive windows.
+
+    Args:
+        start: ISO 8601 start of the range, included.
+        end: ISO 8601 end of the range, excluded.
+        window_hours: length of the windows, in hours.
+    Returns: list of (start, end) tuples of ISO 8601 timestamps.
+    """
+    start, end = parse_time(start), parse_time(end)
+    step = datetime.timedelta(hours=window_hours)
+    windows = []
+
+    while start < end:
+        window_end = min(start + step, end)
+        windows.append((start.strftime(TIME_FORMAT),
+                        window_end.strftime(TIME_FORMAT)))
+        start = window_end
+
+    return windows
+
+
+class EventCheckpoint(object):
+    """
+    Records the events of the completed time windows in a JSON lines file,
+    so an interrupted download resumes with the missing windows only.
+
+    The first line identifies the download. A file left by another download
+    is started over, and a line cut by an interruption is ignored.
+    """
+
+    def __init__(self, path, *key_parts):
+        """
+        Args:
+            path: checkpoint file path.
+            key_parts: parameters identifying the download, e.g. the time
+                range and the filter.
+        """
+        self.path = os.path.expanduser(path)
+        self.key = hashlib.sha256(json.dumps(
+            key_parts, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+        self._lock = threading.Lock()
+
+    def load(self):
+        """
+        Returns the offsets of the completed windows in the file, by window
+        start, their events being read back one window at a time by
+        read_window.
+        """
+        windows = {}
+        try:
+            with open(self.path, 'rb') as checkpoint:
+                header = json.loads(checkpoint.readline() or b'{}')
+                if header.get('key') != self.key:
+                    return {}
+                offset = checkpoint.tell()
+                for line in iter(checkpoint.readline, b''):
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break
+                    windows[entry['window']] = offset
+                    offset += len(line)
+        except (IOError, OSError, ValueError):
+            return {}
+
+        return windows
+
+    def read_window(self, offset):
+        """
+        Returns the events of a completed window, given its offset.
+        """
+        with open(self.path, 'rb') as checkpoint:
+            checkpoint.seek(offset)
+            return json.loads(checkpoint.readline())['events']
+
+    def start(self, resume):
+        """
+        Writes the header of a new download, or drops the line cut by the
+        interruption when resuming.
+        """
+        if resume:
+            with open(self.path, 'rb+') as checkpoint:
+                content = checkpoint.read()
+                checkpoint.truncate(content.rfind(b'\n') + 1)
+            return
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        with open(self.path, 'w') as checkpoint:
+            checkpoint.write(json.dumps(dict(key=self.key)) + '\n')
+
+    def record(self, window, events):
+        """
+        Appends the events of a completed window.
+        """
+        line = json.dumps(dict(window=window, events=events), default=str)
+        with self._lock:
+            with open(self.path, 'a') as checkpoint:
+                checkpoint.write(line + '\n')
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+class RecentIds(object):
+    """
+    Bounded set of the most recently seen event ids, the oldest ones being
+    forgotten first.
+    """
+
+    def __init__(self, size):
+        self.size = max(1, int(size))
+        self._ids = collections.OrderedDict()
+
+    def add(self, event_id):
+        """
+        Records an event id.
+
+        Returns: False when the id was already seen, else True. Events
+            without id are never considered duplicates.
+        """
+        if event_id is None:
+            return True
+        if event_id in self._ids:
+            self._ids.move_to_end(event_id)
+            return False
+        self._ids[event_id] = None
+        if len(self._ids) > self.size:
+            self._ids.popitem(last=False)
+        return True
+
+    def __len__(self):
+        return len(self._ids)
+
+
+class AdaptiveInterval(object):
+    """
+    Polling interval going back to its minimum as soon as a poll finds
+    events, and growing geometrically up to its maximum while the polls
+    find none.
+    """
+
+    def __init__(self, minimum, maximum, factor=2.0):
+        self.minimum = float(minimum)
+        self.maximum = max(float(maximum), self.minimum)
+        self.factor = factor
+        self.current = self.minimum
+
+    def next(self, found):
+        """
+        Returns the seconds to wait before the next poll.
+        """
+        if found:
+            self.current = self.minimum
+        else:
+            self.current = min(self.maximum, self.current * self.factor)
+        return self.current
+
+
+class EventCursor(object):
+    """
+    Occurrence time of the last delivered event, along with the ids of the
+    events delivered at that time, optionally kept in a JSON file so a
+    restarted watch neither skips nor repeats events.
+    """
+
+    def __init__(self, path=None, start=None, max_ids=10000):
+        """
+        Args:
+            path: cursor file path, or None.
+            start: ISO 8601 time of the first poll when there is no cursor.
+            max_ids: maximum number of ids kept for the last time.
+        """
+        self.path = os.path.expanduser(path) if path else None
+        self.time = start
+        self.ids = []
+        self.max_ids = max_ids
+        self._saved = None
+
+    def load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path) as cursor:
+                state = json.load(cursor)
+        except (IOError, OSError, ValueError):
+            return
+        self.time = state.get('time') or self.time
+        self.ids = state.get('ids') or []
+        self._saved = dict(time=self.time, ids=list(self.ids))
+
+    def advance(self, occurred_at, event_id):
+        if not occurred_at:
+            return
+        occurred_at = str(occurred_at)
+        if self.time is None or parse_time(occurred_at) > parse_time(
+                self.time):
+            self.time, self.ids = occurred_at, []
+        elif parse_time(occurred_at) < parse_time(self.time):
+            return
+        if event_id is not None and len(self.ids) < self.max_ids:
+            self.ids.append(event_id)
+
+    def save(self):
+        """
+        Replaces the cursor file atomically, unless it already holds the
+        cursor.
+
+        Returns: True when the file was written.
+        """
+        state = dict(time=self.time, ids=list(self.ids))
+        if not self.path or state == self._saved:
+            return False
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as cursor:
+            json.dump(state, cursor)
+        os.replace(temp_path, self.path)
+        self._saved = state
+        return True
+
+
+class NdjsonSink(object):
+    """
+    Appends the events to a JSON lines file, buffering them until flushed.
+    """
+
+    def __init__(self, path):
+        self.path = os.path.expanduser(path)
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._file = open(self.path, 'a')
+
+    def write(self, event):
+        self._file.write(json.dumps(event, default=str) + '\n')
+
+    def flush(self):
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+
+class SyslogSink(object):
+    """
+    Sends every event to syslog as a JSON message.
+    """
+
+    def __init__(self, address='/dev/log', facility='user',
+                 tag='greenlake_audit'):
+        """
+        Args:
+            address: path of the local syslog socket, or 'host:port' of a
+                remote syslog server, over UDP.
+            facility: syslog facility name, e.g. 'user' or 'local0'.
+            tag: program name prefixing the messages.
+        """
+        if ':' in address and not address.startswith('/'):
+            host, port = address.rsplit(':', 1)
+            address = (host, int(port))
+        self._handler = logging.handlers.SysLogHandler(
+            address=address,
+            facility=logging.handlers.SysLogHandler.facility_names[facility])
+        self._handler.setFormatter(logging.Formatter(tag + ': %(message)s'))
+
+    def write(self, event):
+        self._handler.emit(logging.LogRecord(
+            'greenlake_audit', logging.INFO, '', 0,
+            json.dumps(event, default=str), None, None))
+
+    def flush(self):
+        self._handler.flush()
+
+    def close(self):
+        self._handler.close()
+
+
+def get_event_sink(settings):
+    """
+    Creates the sink of an audit watch.
+
+    Args:
+        settings: dict with the sink 'type', 'ndjson' with a 'path', or
+            'syslog' with an optional 'address', 'facility' and 'tag'.
+    """
+    sink_type = settings.get('type') or 'ndjson'
+    if sink_type == 'ndjson':
+        if not settings.get('path'):
+            raise ValueError("The ndjson sink requires a path")
+        return NdjsonSink(settings['path'])
+    if sink_type == 'syslog':
+        return SyslogSink(settings.get('address') or '/dev/log',
+                          settings.get('facility') or 'user',
+                          settings.get('tag') or 'greenlake_audit')
+    raise ValueError("Invalid sink type '{0}', expected ndjson or "
+                     "syslog".format(sink_type))
@@ -0,0 +1,189 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import threading
+import time
+
+DEFAULT_INITIAL_LIMIT = 4
+DEFAULT_MIN_LIMIT = 1
+DEFAULT_MAX_LIMIT = 64
+
+# Factor the limit is multiplied by on a 429 or a latency spike
+DEFAULT_BACKOFF = 0.5
+
+# A request slower than this many times the usual latency of its kind is a
+# latency spike
+DEFAULT_LATENCY_TOLERANCE = 2.0
+
+# Seconds a request must exceed the usual latency by to be a latency spike,
+# so the jitter of fast requests does not count as one
+MIN_LATENCY_SPIKE = 0.05
+
+# Weight of the latest latency in the usual latency of a kind
+LATENCY_SMOOTHING = 0.1
+
+
+class AdaptiveConcurrencyLimiter(object):
+    """
+    AIMD limit of the requests in flight, shared by the threads of a
+    module.
+
+    The limit grows by one after every limit requests completed at the usual
+    latency, i.e. once per round trip at full concurrency, as long as the
+    requests in flight use at least half of it. It is multiplied
+    by the backoff factor when a request is throttled with 429 or takes much
+    longer than usual. The requests sent before a cut are not counted again,
+    so a burst of 429 cuts the limit once.
+
+    The usual latency is kept per kind of request (read, write, poll), the
+    kinds having different costs on the API side.
+    """
+
+    def __init__(self, initial=DEFAULT_INITIAL_LIMIT,
+                 min_limit=DEFAULT_MIN_LIMIT, max_limit=DEFAULT_MAX_LIMIT,
+                 backoff=DEFAULT_BACKOFF,
+                 latency_tolerance=DEFAULT_LATENCY_TOLERANCE):
+        """
+        Args:
+            initial: limit of the first requests.
+            min_limit: lowest limit.
+            max_limit: highest limit, also the number of threads of the
+                parallel operations.
+            backoff: factor the limit is multiplied by on congestion.
+            latency_tolerance: ratio to the usual latency of a kind above
+                which a request is a latency spike.
+        """
+        self.min_limit = max(1, int(min_limit))
+        self.max_limit = max(self.min_limit, int(max_limit))
+        self.limit = float(min(self.max_limit, max(self.min_limit, initial)))
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+
+        self.in_flight = 0
+        self.peak = 0
+        self.increases = 0
+        self.cuts = 0
+        self.throttled = 0
+        self.spikes = 0
+        self._generation = 0
+        self._successes = 0
+        self._latencies = {}
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Waits for a free slot.
+
+        Returns: the ticket to pass to release.
+        """
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            return self._take_slot()
+
+    def try_acquire(self):
+        """
+        Takes a free slot without waiting, e.g. from an event loop.
+
+        Returns: the ticket to pass to release, or None when every slot is
+            taken.
+        """
+        with self._condition:
+            if self.in_flight >= int(self.limit):
+                return None
+            return self._take_slot()
+
+    def _take_slot(self):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        return self._generation, time.time()
+
+    def release(self, ticket, kind, throttled=False):
+        """
+        Frees the slot of a completed request and adapts the limit.
+
+        Args:
+            ticket: value returned by acquire.
+            kind: kind of the request, see get_request_kind.
+            throttled: True when the API answered 429.
+        """
+        generation, started_at = ticket
+        latency = time.time() - started_at
+
+        with self._condition:
+            # A limit the requests do not use is not raised further
+            busy = self.in_flight * 2 >= int(self.limit)
+            self.in_flight -= 1
+
+            usual = self._latencies.get(kind)
+            spike = (not throttled and usual is not None
+                     and latency > usual * self.latency_tolerance
+                     and latency - usual > MIN_LATENCY_SPIKE)
+            if not throttled:
+                # The spikes count too, so a lasting slowdown becomes the
+                # usual latency instead of cutting the limit forever
+                self._latencies[kind] = latency if usual is None else (
+                    usual + LATENCY_SMOOTHING * (latency - usual))
+
+            if throttled or spike:
+                self.throttled += int(throttled)
+                self.spikes += int(spike)
+                if generation == self._generation:
+                    self._cut()
+            elif generation == self._generation and busy:
+                self._successes += 1
+                if (self._successes >= int(self.limit)
+                        and self.limit < self.max_limit):
+                    self.limit += 1
+                    self.increases += 1
+                    self._successes = 0
+
+            self._condition.notify_all()
+
+    def _cut(self):
+        self.limit = max(float(self.min_limit), self.limit * self.backoff)
+        self.cuts += 1
+        self._generation += 1
+        self._successes = 0
+
+    def to_facts(self):
+        """
+        Returns the limit the requests settled on and how it moved.
+        """
+        with self._condition:
+            return dict(limit=int(self.limit),
+                        min_limit=self.min_limit,
+                        max_limit=self.max_limit,
+                        peak=self.peak,
+                        increases=self.increases,
+                        cuts=self.cuts,
+                        throttled=self.throttled,
+                        latency_spikes=self.spikes)
+
+
+def get_concurrency_limiter(config):
+    """
+    Builds the limiter described by the 'adaptive_concurrency'
+    configuration.
+
+    Args:
+        config: True for the defaults, or a dict with optional 'initial',
+            'min', 'max', 'backoff' and 'latency_tolerance' keys.
+    Returns: AdaptiveConcurrencyLimiter instance or None when not configured.
+    """
+    if not config:
+        return None
+
+    if not isinstance(config, dict):
+        config = {}
+
+    return AdaptiveConcurrencyLimiter(
+        initial=int(config.get('initial') or DEFAULT_INITIAL_LIMIT),
+        min_limit=int(config.get('min') or DEFAULT_MIN_LIMIT),
+        max_limit=int(config.get('max') or DEFAULT_MAX_LIMIT),
+        backoff=float(config.get('backoff') or DEFAULT_BACKOFF),
+        latency_tolerance=float(config.get('latency_tolerance')
+                                or DEFAULT_LATENCY_TOLERANCE))
@@ -0,0 +1,135 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import datetime
+import hashlib
+import json
+import os
+import tempfile
+
+DEFAULT_FINGERPRINT_PATH = '~/.ansible/tmp/greenlake_fingerprints'
+
+# Seconds after a reconcile during which an unchanged task makes no API call.
+# The resource may be changed outside of Ansible at any time, so by default
+# every run still checks its modification marker with a single GET.
+DEFAULT_TTL = 0
+
+# Resource fields changed by the API on every modification, by preference
+MODIFIED_FIELDS = ('updated_at', 'modified_at', 'generation')
+
+
+def fingerprint(value):
+    """
+    Returns the canonical hash of a JSON-like value.
+    """
+    return hashlib.sha256(json.dumps(
+        value, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def normalize_modified(value):
+    """
+    Returns a modification marker as a string, the timestamps parsed by the
+    SDK and the raw ISO 8601 ones giving the same string.
+    """
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value.replace('Z',
+                                                                  '+00:00'))
+        except ValueError:
+            return value
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(datetime.timezone.utc).replace(
+                tzinfo=None)
+        return value.isoformat()
+    return str(value)
+
+
+def get_modified(resource):
+    """
+    Returns the modification field of a resource and its normalized value,
+    or (None, None) when the resource has none.
+    """
+    for field in MODIFIED_FIELDS:
+        if resource.get(field) is not None:
+            return field, normalize_modified(resource[field])
+    return None, None
+
+
+class FingerprintCache(object):
+    """
+    On-disk store of the fingerprints of the last reconciles: the hash of
+    the desired state, the modification marker of the resource observed,
+    and the facts returned.
+
+    Every entry is a small JSON file named by the hash of its key.
+    """
+
+    def __init__(self, path, ttl, namespace=''):
+        """
+        Args:
+            path: store directory.
+            ttl: seconds during which an entry is trusted without checking
+                the resource.
+            namespace: string mixed into every key, so tenants sharing a
+                directory never see each other entries.
+        """
+        self.path = path
+        self.ttl = ttl
+        self.namespace = namespace
+
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path, mode=0o700)
+
+    def key(self, *parts):
+        return fingerprint([self.namespace] + list(parts))
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, key)
+
+    def get(self, key):
+        try:
+            with open(self._entry_path(key)) as entry:
+                return json.load(entry)
+        except (IOError, OSError, ValueError):
+            return None
+
+    def store(self, key, entry):
+        fd, tmp_path = tempfile.mkstemp(prefix='.', dir=self.path)
+        with os.fdopen(fd, 'w') as entry_file:
+            json.dump(entry, entry_file, default=str)
+        os.replace(tmp_path, self._entry_path(key))
+
+    def discard(self, key):
+        try:
+            os.remove(self._entry_path(key))
+        except OSError:
+            pass
+
+
+def get_fingerprint_cache(config, host, client_id):
+    """
+    Builds the fingerprint cache described by the 'fingerprint_cache'
+    configuration.
+
+    Args:
+        config: True for the defaults, or a dict with optional 'path' and
+            'ttl' keys.
+        host: GreenLake host, used to isolate the tenants.
+        client_id: API client id, used to isolate the tenants.
+    Returns: FingerprintCache instance or None when not configured.
+    """
+    if not config:
+        return None
+
+    if not isinstance(config, dict):
+        config = {}
+
+    path = os.path.expanduser(config.get('path') or DEFAULT_FINGERPRINT_PATH)
+    ttl = float(config.get('ttl') or DEFAULT_TTL)
+
+    return FingerprintCache(path, ttl,
+                            namespace='{0}|{1}'.format(host, client_id))
@@ -0,0 +1,333 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.topology import RELATIONS, extract_relations
+
+DEFAULT_DB_PATH = '~/.ansible/greenlake_fleet.db'
+
+COLLECTIONS = ('storage_systems', 'volumes', 'volume_sets', 'hosts',
+               'host_groups', 'host_initiators')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS resources (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    name TEXT,
+    system_id TEXT,
+    digest TEXT NOT NULL,
+    body TEXT NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE INDEX IF NOT EXISTS resources_name ON resources (kind, name);
+CREATE INDEX IF NOT EXISTS resources_system ON resources (kind, system_id);
+
+CREATE TABLE IF NOT EXISTS relations (
+    relation TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    target_id TEXT,
+    target_name TEXT
+);
+CREATE INDEX IF NOT EXISTS relations_source ON relations (relation, source_id);
+CREATE INDEX IF NOT EXISTS relations_target_id ON relations (relation, target_id);
+CREATE INDEX IF NOT EXISTS relations_target_name ON relations (relation, target_name);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    kind TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL,
+    count INTEGER NOT NULL,
+    complete INTEGER NOT NULL DEFAULT 1
+);
+"""
+
+# Authorizer actions of a read only query, the other ones are denied
+READ_ACTIONS = frozenset(
+    action for action in (getattr(sqlite3, name, None) for name in (
+        'SQLITE_SELECT', 'SQLITE_READ', 'SQLITE_FUNCTION', 'SQLITE_RECURSIVE'))
+    if action is not None)
+
+NAMED_QUERIES = {
+    'volumes_exported_to_host_group': """
+        SELECT v.id AS volume_id, v.name AS volume_name,
+               v.system_id AS system_id, s.name AS system_name,
+               hg.id AS host_group_id, hg.name AS host_group_name
+        FROM resources hg
+        JOIN relations r ON r.relation = 'volume_host_group'
+             AND r.target_id = hg.id
+        JOIN resources v ON v.kind = 'volumes' AND v.id = r.source_id
+        LEFT JOIN resources s ON s.kind = 'storage_systems'
+             AND s.id = v.system_id
+        WHERE hg.kind = 'host_groups'
+          AND (hg.id = :host_group OR hg.name = :host_group)
+        ORDER BY s.name, v.name
+    """,
+    'host_groups_of_volume': """
+        SELECT v.id AS volume_id, v.name AS volume_name,
+               v.system_id AS system_id, r.target_id AS host_group_id,
+               COALESCE(hg.name, r.target_name) AS host_group_name
+        FROM resources v
+        JOIN relations r ON r.relation = 'volume_host_group'
+             AND r.source_id = v.id
+        LEFT JOIN resources hg ON hg.kind = 'host_groups'
+             AND hg.id = r.target_id
+        WHERE v.kind = 'volumes' AND (v.id = :volume OR v.name = :volume)
+        ORDER BY host_group_name
+    """,
+    'hosts_of_host_group': """
+        SELECT hg.id AS host_group_id, hg.name AS host_group_name,
+               h.id AS host_id, h.name AS host_name,
+               ri.target_id AS initiator_id,
+               COALESCE(i.name, ri.target_name) AS initiator_name
+        FROM resources hg
+        JOIN relations rh ON rh.relation = 'host_group_host'
+             AND rh.source_id = hg.id
+        JOIN resources h ON h.kind = 'hosts' AND h.id = rh.target_id
+        LEFT JOIN relations ri ON ri.relation = 'host_initiator'
+             AND ri.source_id = h.id
+        LEFT JOIN resources i ON i.kind = 'host_initiators'
+             AND i.id = ri.target_id
+        WHERE hg.kind = 'host_groups'
+          AND (hg.id = :host_group OR hg.name = :host_group)
+        ORDER BY h.name, initiator_name
+    """,
+    'volume_set_members': """
+        SELECT vs.id AS volume_set_id, vs.name AS volume_set_name,
+               vs.system_id AS system_id, v.id AS volume_id,
+               COALESCE(v.name, r.target_name) AS volume_name
+        FROM resources vs
+        JOIN relations r ON r.relation = 'volume_set_volume'
+             AND r.source_id = vs.id
+        LEFT JOIN resources v ON v.kind = 'volumes'
+             AND (v.id = r.target_id
+                  OR (r.target_id IS NULL AND v.name = r.target_name
+                      AND v.system_id = vs.system_id))
+        WHERE vs.kind = 'volume_sets'
+          AND (vs.id = :volume_set OR vs.name = :volume_set)
+        ORDER BY volume_name
+    """,
+    'volumes_of_system': """
+        SELECT v.id AS volume_id, v.name AS volume_name,
+               s.id AS system_id, s.name AS system_name
+        FROM resources s
+        JOIN resources v ON v.kind = 'volumes' AND v.system_id = s.id
+        WHERE s.kind = 'storage_systems'
+          AND (s.id = :system OR s.name = :system)
+        ORDER BY v.name
+    """,
+}
+
+
+def _authorize_read(action, *args):
+    return sqlite3.SQLITE_OK if action in READ_ACTIONS else sqlite3.SQLITE_DENY
+
+
+def single_select(sql):
+    """
+    Returns the SQL of a single SELECT statement, without its trailing
+    semicolon.
+
+    Raises: sqlite3.ProgrammingError on several statements or on another
+        statement than a SELECT.
+    """
+    sql = sql.strip()
+    for position, char in enumerate(sql):
+        if char == ';' and sqlite3.complete_statement(sql[:position + 1]):
+            if sql[position + 1:].strip():
+                raise sqlite3.ProgrammingError(
+                    "only a single SQL statement is allowed")
+            sql = sql[:position].rstrip()
+            break
+
+    keyword = sql.split(None, 1)[0].upper() if sql else ''
+    if keyword not in ('SELECT', 'WITH'):
+        raise sqlite3.ProgrammingError("only SELECT statements are allowed")
+    return sql
+
+
+def resource_digest(resource):
+    """
+    Returns a digest of the resource content, used to skip the unchanged
+    resources.
+    """
+    return hashlib.sha1(json.dumps(resource, sort_keys=True,
+                                   default=str).encode('utf-8')).hexdigest()
+
+
+class FleetIndex(object):
+    """
+    Local SQLite index of the fleet resources and of their relations.
+
+    Resources are stored as JSON bodies along with their kind, id, name and
+    system id, which are indexed. Syncing a collection only writes the
+    resources whose content changed and removes the ones no longer listed.
+    """
+
+    def __init__(self, path, read_only=False):
+        """
+        Args:
+            path: database file path.
+            read_only: Open an existing database without write access, the
+                statements being restricted to the reads.
+        """
+        self.path = os.path.expanduser(path)
+
+        if read_only:
+            self.connection = sqlite3.connect(
+                'file:{0}?mode=ro'.format(self.path), uri=True)
+            # Also denies the ATTACH and PRAGMA statements, which a read
+            # only database file does not prevent
+            self.connection.set_authorizer(_authorize_read)
+        else:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            self.connection = sqlite3.connect(self.path)
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.executescript(SCHEMA)
+            self._migrate()
+
+        self.connection.row_factory = sqlite3.Row
+
+    def _migrate(self):
+        columns = [row[1] for row in
+                   self.connection.execute('PRAGMA table_info(sync_state)')]
+        if 'complete' not in columns:
+            with self.connection:
+                self.connection.execute(
+                    'ALTER TABLE sync_state ADD COLUMN '
+                    'complete INTEGER NOT NULL DEFAULT 1')
+
+    def close(self):
+        self.connection.close()
+
+    def synced_at(self, kind):
+        """
+        Returns the time of the last complete sync of a collection, or None.
+        A partial sync does not count, so the next one lists the collection
+        again.
+        """
+        row = self.connection.execute(
+            'SELECT synced_at FROM sync_state WHERE kind = ? AND complete',
+            (kind,)).fetchone()
+        return row['synced_at'] if row else None
+
+    def sync_collection(self, kind, resources, listing=None):
+        """
+        Brings a collection of the index in line with the listed resources.
+
+        Args:
+            kind: collection name, one of COLLECTIONS.
+            resources: iterable of the decoded resources, consumed as a
+                stream.
+            listing: dict whose 'complete' key tells, once the resources are
+                consumed, whether they are the whole collection, see
+                iter_resource_items. The resources missing from an incomplete
+                listing are kept.
+        Returns: dict with the number of fetched, inserted, updated, deleted
+            and unchanged resources, and whether the listing was complete.
+        """
+        stats = dict(fetched=0, inserted=0, updated=0, deleted=0,
+                     unchanged=0, complete=True)
+
+        with self.connection:
+            known = dict(self.connection.execute(
+                'SELECT id, digest FROM resources WHERE kind = ?', (kind,)))
+            seen = set()
+
+            for resource in resources:
+                resource_id = resource.get('id')
+                if not resource_id:
+                    continue
+
+                stats['fetched'] += 1
+                seen.add(resource_id)
+
+                digest = resource_digest(resource)
+                if known.get(resource_id) == digest:
+                    stats['unchanged'] += 1
+                    continue
+
+                stats['updated' if resource_id in known else 'inserted'] += 1
+
+                self.connection.execute(
+                    'INSERT OR REPLACE INTO resources '
+                    '(kind, id, name, system_id, digest, body) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (kind, resource_id,
+                     resource.get('name') or resource.get('app_set_name'),
+                     resource.get('system_id'), digest,
+                     json.dumps(resource, default=str)))
+                self._replace_relations(kind, resource_id, resource)
+
+            if listing is not None:
+                stats['complete'] = bool(listing.get('complete'))
+
+            # A resource missing from a partial listing may still exist
+            deleted = [resource_id for resource_id in known
+                       if resource_id not in seen] if stats['complete'] else []
+            for resource_id in deleted:
+                self.connection.execute(
+                    'DELETE FROM resources WHERE kind = ? AND id = ?',
+                    (kind, resource_id))
+                self._replace_relations(kind, resource_id, None)
+            stats['deleted'] = len(deleted)
+
+            # The count of a partial listing is the one of the resources
+            # indexed, the listed ones and the ones kept from the previous sync
+            count = len(seen) if stats['complete'] else len(
+                seen.union(known))
+            self.connection.execute(
+                'INSERT OR REPLACE INTO sync_state '
+                '(kind, synced_at, count, complete) VALUES (?, ?, ?, ?)',
+                (kind, time.time(), count, int(stats['complete'])))
+
+        return stats
+
+    def _replace_relations(self, kind, resource_id, resource):
+        if kind not in RELATIONS:
+            return
+
+        self.connection.execute(
+            'DELETE FROM relations WHERE relation = ? AND source_id = ?',
+            (RELATIONS[kind][0], resource_id))
+
+        if resource:
+            self.connection.executemany(
+                'INSERT INTO relations '
+                '(relation, source_id, target_id, target_name) '
+                'VALUES (?, ?, ?, ?)',
+                [(relation, resource_id, target_id, target_name)
+                 for relation, target_id, target_name
+                 in extract_relations(kind, resource)])
+
+    def query(self, sql, args=None):
+        """
+        Runs a SQL query against the index.
+
+        Returns: list of the rows, as dicts.
+        """
+        cursor = self.connection.execute(sql, args or {})
+        return [dict(row) for row in cursor]
+
+    def select(self, sql, args=None):
+        """
+        Runs a single SELECT statement against the index, see single_select.
+
+        Returns: list of the rows, as dicts.
+        """
+        cursor = self.connection.execute(single_select(sql), args or {})
+        return [dict(row) for row in cursor]
+
+    def named_query(self, name, args=None):
+        """
+        Runs one of the NAMED_QUERIES.
+        """
+        return self.query(NAMED_QUERIES[name], args)
@@ -5,13 +5,21 @@
 # GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
 
 import abc
+import asyncio
 import collections
-from glob import escape
+import concurrent.futures
+import hashlib
+import itertools
 import json
 import logging
 import os
+import re
+import threading
 import traceback
 import time
+from collections.abc import Mapping
+from resource import RUSAGE_SELF, getrusage
+
 import requests
 from requests_oauthlib import OAuth2Session
 from requests.auth import HTTPBasicAuth
@@ -31,10 +39,76 @@ except ImportError:
 
 from ansible.module_utils.basic import AnsibleModule
 
+from greenlake_data_services.api import host_initiator_groups_api
+from greenlake_data_services.api import host_initiators_api
+from greenlake_data_services.api import storage_systems_api
 from greenlake_data_services.api import tasks_api
+from greenlake_data_services.api import volume_sets_api
+from greenlake_data_services.api import volumes_api
+from greenlake_data_services.exceptions import ApiException
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.async_transport import AsyncTransport, get_async_options
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.concurrency import get_concurrency_limiter
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.fingerprint import fingerprint, get_fingerprint_cache, get_modified, normalize_modified
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.http2_transport import HAS_HTTP2, HTTP_TRANSPORTS, Http2RESTClient, Http2Session, create_http2_client
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.rate_limiter import get_rate_limiter
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.response_cache import get_response_cache
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.single_flight import SingleFlight
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.topology import ExportTopology, TOPOLOGY_COLLECTIONS, extract_relations
 
 logger = logging.getLogger(__name__)  # Logger for development purposes
 
+TASK_URL_PATTERN = re.compile(r'/tasks(/|\?|$)')
+
+DEFAULT_TOKEN_URL = 'https://sso.common.cloud.hpe.com/as/token.oauth2'
+
+# Environment variable naming the file the modules append their run
+# statistics to
+STATS_FILE_ENV = 'GREENLAKE_STATS_FILE'
+
+# Seconds before the expiry of a cached access token it is refreshed
+TOKEN_EXPIRY_MARGIN = 60
+
+# Access tokens, SDK clients and HTTP sessions kept for the life of the
+# process. A module process runs once, but the controller action plugins
+# run every task of a worker process, loop items included, in the same one.
+_PROCESS_STATE = {'tokens': {}, 'clients': {}, 'sessions': {}}
+
+# Module and profile of the module instances created by execute_profiles,
+# per thread
+_fan_out = threading.local()
+
+# Default bound of the concurrent API calls of a module
+DEFAULT_MAX_WORKERS = 8
+
+TASK_PENDING_STATUSES = ('INITIALIZED', 'RUNNING', 'SUBMITTED')
+TASK_FAILED_STATUSES = ('FAILED', 'TIMEDOUT', 'PAUSED')
+
+# Fields of the references to the resources of a task, as opposed to the
+# full resources
+ASSOCIATED_RESOURCE_FIELDS = frozenset(('id', 'name', 'resource_uri', 'type',
+                                        'display_name'))
+
+# Same rules as the SDK generator uses to name the model attributes
+CAPITAL_CASE_PATTERN = re.compile(r'([A-Z]+)([A-Z][a-z][a-z]+)')
+LOWER_CASE_PATTERN = re.compile(r'([a-z\d])([A-Z])')
+RESERVED_ATTRIBUTE_NAMES = frozenset((
+    'and', 'del', 'from', 'not', 'while', 'as', 'elif', 'global', 'or',
+    'with', 'assert', 'else', 'if', 'pass', 'yield', 'break', 'except',
+    'import', 'print', 'class', 'exec', 'in', 'raise', 'continue', 'finally',
+    'is', 'return', 'def', 'for', 'lambda', 'try', 'self', 'nonlocal',
+    'async', 'await', 'property'))
+_attribute_names = {}
+_json_keys = None
+
+# Operators of the 'where' option evaluated by the API
+SERVER_OPERATORS = ('eq', 'ne', 'gt', 'ge', 'lt', 'le')
+# Operators of the 'where' option evaluated on the decoded items
+LOCAL_OPERATORS = ('in', 'not_in', 'contains', 'startswith', 'endswith',
+                   'regex')
+DATETIME_PATTERN = re.compile(
+    r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}(:\d{2}(\.\d+)?)?(Z|[+-]\d{2}:\d{2})$')
+
 
 def get_logger(mod_name):
     """
@@ -83,6 +157,29 @@ class GreenLakeDataServiceModuleException(Exception):
             Exception.__init__(self, self.msg)
 
 
+class ProfileModule(object):
+    """
+    AnsibleModule shared by the module instances execute_profiles creates.
+
+    fail_json and exit_json raise GreenLakeDataServiceModuleException
+    instead of printing the result and exiting, so a failing profile is
+    recorded as the failure of that profile and the others complete.
+    """
+
+    def __init__(self, module):
+        self._module = module
+
+    def __getattr__(self, name):
+        return getattr(self._module, name)
+
+    def fail_json(self, msg, **kwargs):
+        raise GreenLakeDataServiceModuleException(msg)
+
+    def exit_json(self, **kwargs):
+        raise GreenLakeDataServiceModuleException(
+            kwargs.get('msg') or 'The module exited before its result')
+
+
 # @six.add_metaclass(abc.ABCMeta)
 class GreenLakeDataServiceModule():
     MSG_CREATED = 'Resource created successfully.'
@@ -92,6 +189,16 @@ class GreenLakeDataServiceModule():
     MSG_ALREADY_ABSENT = 'Resource is already absent.'
     MSG_DIFF_AT_KEY = 'Difference found at key \'{0}\'. '
     MSG_MANDATORY_FIELD_MISSING = 'Missing mandatory field: name'
+    MSG_FINGERPRINT_UNCHANGED = ('Neither the desired state nor the resource '
+                                 'changed since the last run')
+    MSG_REQUEST_FAILED = '{0} {1} failed with HTTP {2}: {3}'
+    MSG_HTTP2_UNAVAILABLE = ('The http2 transport requires httpx and h2, '
+                             'using HTTP/1.1')
+    MSG_PROFILE_NOT_FOUND = 'Profile not found in the configuration: {0}'
+    MSG_PROFILES_FAILED = 'Every profile failed: {0}'
+    MSG_PROFILE_FAILED = 'Profile {0} failed: {1}'
+    MSG_BLAST_RADIUS_EXCEEDED = ('Removing the resource affects {0} resources,'
+                                 ' more than max_blast_radius ({1}): {2}')
     PYTHON_SDK_REQUIRED = ('HPE GreenLake Data Service Python SDK'
                            'is required for this module.')
 
@@ -99,27 +206,64 @@ class GreenLakeDataServiceModule():
         config=dict(type='path'),
         host=dict(type='str'),
         client_id=dict(type='str', no_log=True),
-        client_secret=dict(type='str')
+        client_secret=dict(type='str'),
+        rate_limit=dict(type='dict'),
+        response_cache=dict(type='raw'),
+        token_url=dict(type='str'),
+        async_transport=dict(type='raw'),
+        fingerprint_cache=dict(type='raw'),
+        http_transport=dict(type='str', choices=list(HTTP_TRANSPORTS)),
+        adaptive_concurrency=dict(type='raw'),
+        profile=dict(type='str')
     )
 
+    # Whether the module gathers facts from every profile of the
+    # configuration file at once, see execute_profiles
+    FAN_OUT_PROFILES = False
+
+    # Number of times a request answered with 429 is retried
+    THROTTLE_RETRIES = 3
+
+    # Types and resource_uri collections of the resources of the module,
+    # telling them apart from the tasks among the written resources
+    RESOURCE_TYPES = ()
+
     def __init__(self, additional_arg_spec=None):
         """
         GreenLakeDataServiceModule constructor.
 
         :arg dict additional_arg_spec: Additional argument spec definition.
         """
+        self.started_at = time.time()
+        self.request_counts = {}
+        self.token_fetches = 0
+        self.single_flight = SingleFlight()
+
         argument_spec = self._build_argument_spec(additional_arg_spec)
 
-        self.module = AnsibleModule(argument_spec=argument_spec,
-                                    supports_check_mode=False)
+        self.module = self._create_module(argument_spec)
 
         self.resource_client = None
         self.resource_data = {}
+        self.export_topology = None
 
         self.state = self.module.params.get('state')
-        self.data = self.module.params.get('data', {})
+        self.data = self.module.params.get('data') or {}
 
         self.api_client_conf = {}
+        self.rate_limiter = None
+        self.response_cache = None
+        self.async_options = None
+        # Transport of the run_async call of each thread, since the threads
+        # of run_concurrently may run their own
+        self._async_state = threading.local()
+        self.http_transport = 'http1'
+        self.concurrency_limiter = None
+        self.fingerprint_cache = None
+        self.fingerprint_key = None
+        self.fingerprint_data = None
+        self.fingerprint_entry = None
+        self.profiles = []
         self._create_greenlake_client()
 
         # Preload params for get_all - used by facts
@@ -129,6 +273,13 @@ class GreenLakeDataServiceModule():
         self.options = transform_list_to_dict(
             self.module.params.get('options'))
 
+        # Preload predicates on the listed resources - used by facts
+        self.where = self.module.params.get('where') or []
+
+        # Preload fields to keep in the facts - used by facts
+        self.select = self.module.params.get('select') or []
+        self.projection = build_projection(self.select)
+
         self.resource_id = self.module.params.get('id') or self.data.get('id')
         self.system_id = self.module.params.get('system_id')
         self.device_type = self.module.params.get('device_type')
@@ -139,6 +290,13 @@ class GreenLakeDataServiceModule():
         """
         Set resource data
         """
+        if self.profiles:
+            # Looked up by the module instance of every profile
+            return
+
+        if self.fingerprint_cache and self._check_fingerprint():
+            return
+
         # To handle the name field inconsistency in resource data
         if self.resource_name_field != "name" and self.data.get("name"):
             self.data[self.resource_name_field] = self.data.pop("name")
@@ -162,6 +320,72 @@ class GreenLakeDataServiceModule():
             # if self.resource_data and self.new_name:
             #     self.data[self.resource_name_field] = self.new_name
 
+    def refresh_resource_data(self, result, updates=None):
+        """
+        Sets the resource data after a successful write, reading the resource
+        back only when the write does not tell its new state:
+        - a full resource of the module collection among the task associated
+          resources is used as is,
+        - the updates of a known resource are merged into its data,
+        - otherwise the resource is read once by id, taken from the task
+          associated resources or from the known resource, and only looked
+          up by name as last resort.
+
+        :arg dict result: get_task result of the write
+        :arg dict updates: Fields written to the known resource, None when
+            the new state can not be derived from them.
+        """
+        associated = result.get("response") if result else None
+        if isinstance(associated, dict):
+            associated = [associated]
+        elif not isinstance(associated, list):
+            associated = []
+
+        resource_ids = []
+        for resource in associated:
+            if not (isinstance(resource, dict)
+                    and self._is_module_resource(resource)):
+                continue
+            if (resource.get("id")
+                    and resource.get(self.resource_name_field)
+                    and set(resource) - ASSOCIATED_RESOURCE_FIELDS):
+                self.resource_data = resource
+                return
+            resource_id = resource.get("id") or (
+                resource.get("resource_uri") or "").rstrip("/").split("/")[-1]
+            if resource_id and resource_id not in resource_ids:
+                resource_ids.append(resource_id)
+
+        if self.resource_data and updates is not None:
+            merged_data = self.resource_data.copy()
+            merged_data.update(
+                (key, value) for key, value in updates.items()
+                if key in self.resource_data)
+            self.resource_data = merged_data
+            return
+
+        if self.resource_data.get("id"):
+            resource_id = self.resource_data["id"]
+        elif len(resource_ids) == 1:
+            resource_id = resource_ids[0]
+        else:
+            # Several or no resources created, look the resource up by name
+            self.set_resource_data()
+            return
+
+        self.resource_data = self.get_resource_by_id_or_name(id=resource_id)
+
+    def _is_module_resource(self, resource):
+        """
+        Tells whether a resource returned by a task belongs to the module
+        collection, by its type or its resource_uri, the task itself being
+        returned when it has no associated resources.
+        """
+        if resource.get("type") in self.RESOURCE_TYPES:
+            return True
+        segments = (resource.get("resource_uri") or "").rstrip("/").split("/")
+        return len(segments) > 1 and segments[-2] in self.RESOURCE_TYPES
+
     def process_input_data(self, fields):
         """
         Delete unsupported fieleds from the request input
@@ -179,6 +403,17 @@ class GreenLakeDataServiceModule():
                 value = data.pop(key, "")
                 data[fields[key]] = value
 
+    def _create_module(self, argument_spec):
+        """
+        Creates the AnsibleModule. Overridden by the controller action plugins
+        to run the module logic without packaging the module.
+        """
+        module = getattr(_fan_out, 'module', None)
+        if module is not None:
+            return module
+        return AnsibleModule(argument_spec=argument_spec,
+                             supports_check_mode=False)
+
     def _build_argument_spec(self, additional_arg_spec):
         """
         Creates argument list by merging default arguments with additional
@@ -205,13 +440,26 @@ class GreenLakeDataServiceModule():
 
         return config
 
-    def _get_access_token(self, client_id, client_secret):
+    def _get_access_token(self, client_id, client_secret,
+                          token_url=DEFAULT_TOKEN_URL):
+        """
+        Fetches an access token, or reuses the one fetched earlier in the
+        process for the same credentials while it has not expired.
+        """
+        key = (token_url, client_id,
+               hashlib.sha256((client_secret or '').encode('utf-8'))
+               .hexdigest())
+        token = _PROCESS_STATE['tokens'].get(key)
+        if (token and token.get("expires_at")
+                and token["expires_at"] - TOKEN_EXPIRY_MARGIN > time.time()):
+            return token["access_token"]
+
         client = BackendApplicationClient(client_id)
         oauth = OAuth2Session(client=client)
         auth = HTTPBasicAuth(client_id, client_secret)
-        token = oauth.fetch_token(
-            token_url='https://sso.common.cloud.hpe.com/as/token.oauth2',
-            auth=auth)
+        token = oauth.fetch_token(token_url=token_url, auth=auth)
+        self.token_fetches += 1
+        _PROCESS_STATE['tokens'][key] = token
 
         return token["access_token"]
 
@@ -220,13 +468,37 @@ class GreenLakeDataServiceModule():
         Creates GreenLake client object using module prams/env variables/config
         file
         """
+        config = {}
+        if self.module.params['config']:
+            config = self._get_config_from_json_file(
+                self.module.params['config'])
+
+        profile = getattr(_fan_out, 'profile', None)
+        if (profile is None and config.get('profiles')
+                and not self.module.params.get('host')):
+            name = self.module.params.get('profile')
+            if name:
+                profile = next((item for item in config['profiles']
+                                if get_profile_name(item) == name), None)
+                if profile is None:
+                    self.module.fail_json(
+                        msg=self.MSG_PROFILE_NOT_FOUND.format(name))
+            elif self.FAN_OUT_PROFILES:
+                # Connected by the module instance of every profile
+                self.profiles = config['profiles']
+                self.greenlake_client = None
+                return
+            else:
+                profile = config['profiles'][0]
+        if profile:
+            # The profile settings override the top level ones
+            config = dict(config, **profile)
+
         if self.module.params.get('host'):
             host = self.module.params['host']
             client_id = self.module.params['client_id']
             client_secret = self.module.params['client_secret']
         elif self.module.params['config']:
-            config = self._get_config_from_json_file(
-                self.module.params['config'])
             host = config.get('host', '')
             client_id = config.get('client_id', '')
             client_secret = config.get('client_secret', '')
@@ -240,13 +512,255 @@ class GreenLakeDataServiceModule():
                 (GREENLAKE_HOST, GREENLAKE_CLIENT_ID, \
                     GREENLAKE_CLIENT_SECRET)")
 
-        access_token = self._get_access_token(client_id, client_secret)
-        configuration = greenlake_data_services.Configuration(
-            access_token=access_token,
-            host=host
-        )
-        self.api_client_conf = {"access_token": access_token, "host": host}
-        self.greenlake_client = greenlake_data_services.ApiClient(configuration)
+        token_url = (self.module.params.get('token_url')
+                     or config.get('token_url')
+                     or os.environ.get('GREENLAKE_TOKEN_URL')
+                     or DEFAULT_TOKEN_URL)
+
+        self.http_transport = (self.module.params.get('http_transport')
+                               or config.get('http_transport') or 'http1')
+        if self.http_transport == 'http2' and not HAS_HTTP2:
+            self.module.warn(self.MSG_HTTP2_UNAVAILABLE)
+            self.http_transport = 'http1'
+
+        self.http_session = _PROCESS_STATE['sessions'].get(
+            (host, self.http_transport))
+        if self.http_session is None:
+            if self.http_transport == 'http2':
+                self.http_session = Http2Session(create_http2_client())
+            else:
+                self.http_session = requests.Session()
+            _PROCESS_STATE['sessions'][(host, self.http_transport)] = (
+                self.http_session)
+
+        # The access token is fetched by the first request, so a run
+        # answered from the fingerprint cache makes no API call at all
+        self._token_args = (client_id, client_secret, token_url)
+        self.api_client_conf = {"access_token": None, "host": host}
+        client_key = (host, client_id, token_url, self.http_transport)
+        self.greenlake_client = _PROCESS_STATE['clients'].get(client_key)
+        if self.greenlake_client is None:
+            configuration = greenlake_data_services.Configuration(
+                host=host
+            )
+            self.greenlake_client = greenlake_data_services.ApiClient(
+                configuration)
+            if self.http_transport == 'http2':
+                # The SDK requests share the HTTP/2 connections of the
+                # session
+                self.greenlake_client.rest_client = Http2RESTClient(
+                    self.http_session.client, ApiException)
+            _PROCESS_STATE['clients'][client_key] = self.greenlake_client
+
+        self.rate_limiter = get_rate_limiter(
+            self.module.params.get('rate_limit') or config.get('rate_limit'),
+            host, client_id)
+        self.response_cache = get_response_cache(
+            self.module.params.get('response_cache')
+            or config.get('response_cache'),
+            host, client_id)
+        self.async_options = get_async_options(
+            self.module.params.get('async_transport')
+            or config.get('async_transport'))
+        self.fingerprint_cache = get_fingerprint_cache(
+            self.module.params.get('fingerprint_cache')
+            or config.get('fingerprint_cache'),
+            host, client_id)
+        self.concurrency_limiter = get_concurrency_limiter(
+            self.module.params.get('adaptive_concurrency')
+            or config.get('adaptive_concurrency'))
+        self._install_request_hooks(self.greenlake_client)
+
+    def _get_api_token(self):
+        """
+        Returns the access token, fetching it on the first call.
+        """
+        if self.api_client_conf["access_token"] is None:
+            access_token = self._get_access_token(*self._token_args)
+            self.api_client_conf["access_token"] = access_token
+            self.greenlake_client.configuration.access_token = access_token
+        return self.api_client_conf["access_token"]
+
+    def _install_request_hooks(self, api_client):
+        """
+        Routes every request made by the SDK client through _sdk_request,
+        after fetching the access token if needed. A client reused from an
+        earlier run keeps its original methods.
+        """
+        if not hasattr(api_client, 'sdk_request'):
+            api_client.sdk_request = api_client.request
+            api_client.sdk_call_api = api_client.call_api
+        sdk_request = api_client.sdk_request
+        sdk_call_api = api_client.sdk_call_api
+
+        def call_api(*args, **kwargs):
+            self._get_api_token()
+            return sdk_call_api(*args, **kwargs)
+
+        def request(method, url, *args, **kwargs):
+            return self._sdk_request(sdk_request, method, url, *args, **kwargs)
+
+        api_client.call_api = call_api
+        api_client.request = request
+
+    def _sdk_request(self, sdk_request, method, url, *args, **kwargs):
+        """
+        Sends a SDK request, honouring the rate limits, retrying the requests
+        rejected with 429 and revalidating the cached GET responses.
+        Identical GET requests in flight at the same time share one call.
+        """
+        if method != 'GET':
+            return self._send_sdk_request(sdk_request, method, url, *args,
+                                          **kwargs)
+
+        def send():
+            response = self._send_sdk_request(sdk_request, method, url,
+                                              *args, **kwargs)
+            # Read the body once for all the callers sharing the response
+            response.data
+            return response
+
+        key = get_request_key(method, url, kwargs.get('query_params'))
+        if kwargs.get('_preload_content') is False:
+            key += ' (raw)'
+        return self.single_flight.do(key, send)
+
+    def _send_sdk_request(self, sdk_request, method, url, *args, **kwargs):
+        kind = get_request_kind(method, url)
+        cache_key, cached = self._get_cached_response(
+            kind, url, kwargs.get('query_params'))
+
+        if cached:
+            kwargs['headers'] = dict(kwargs.get('headers') or {},
+                                     **cached.validators())
+
+        for attempt in range(self.THROTTLE_RETRIES + 1):
+            self._throttle(kind)
+            try:
+                response = self._send_limited(
+                    kind, lambda: sdk_request(method, url, *args, **kwargs))
+                break
+            except ApiException as exception:
+                if cached and exception.status == 304:
+                    self.response_cache.touch(cache_key)
+                    return cached
+                if (exception.status != 429
+                        or attempt == self.THROTTLE_RETRIES):
+                    raise
+                self._throttled(kind, exception.headers)
+
+        if cache_key:
+            self.response_cache.store(
+                cache_key, response.data, response.getheader)
+
+        return response
+
+    def _http_request(self, method, path, **kwargs):
+        """
+        Sends a request to the API using requests, honouring the rate limits,
+        retrying the requests rejected with 429 and revalidating the cached
+        GET responses. Identical GET requests in flight at the same time
+        share one call.
+        """
+        if method != 'GET':
+            return self._send_http_request(method, path, **kwargs)
+
+        return self.single_flight.do(
+            get_request_key(method, self.get_resource_url(path),
+                            kwargs.get('params')),
+            lambda: self._send_http_request(method, path, **kwargs))
+
+    def _send_http_request(self, method, path, **kwargs):
+        url = self.get_resource_url(path)
+        kind = get_request_kind(method, url)
+        cache_key, cached = self._get_cached_response(
+            kind, url, kwargs.get('params'))
+
+        headers = self.get_api_header()
+        if cached:
+            headers.update(cached.validators())
+
+        for attempt in range(self.THROTTLE_RETRIES + 1):
+            self._throttle(kind)
+            response = self._send_limited(
+                kind, lambda: self.http_session.request(
+                    method, url, headers=headers, **kwargs))
+            if (response.status_code != 429
+                    or attempt == self.THROTTLE_RETRIES):
+                break
+            self._throttled(kind, response.headers)
+
+        if cached and response.status_code == 304:
+            self.response_cache.touch(cache_key)
+            response.status_code = cached.status
+            response._content = cached.data
+            response.headers.update(cached.headers)
+        elif cache_key and response.status_code == 200:
+            self.response_cache.store(
+                cache_key, response.content, response.headers.get)
+
+        return response
+
+    def _get_cached_response(self, kind, url, query):
+        """
+        Looks up the response cache for a read request.
+
+        Returns: tuple with the cache key, None when the request can not be
+        cached, and the cached response, if any.
+        """
+        if not self.response_cache or kind != 'read':
+            return None, None
+
+        cache_key = self.response_cache.key(url, query)
+        return cache_key, self.response_cache.get(cache_key)
+
+    def _throttle(self, kind):
+        """
+        Waits for the rate limiter, if any, to allow a request of this kind
+        """
+        self._count_request(kind)
+        if self.rate_limiter:
+            self.rate_limiter.acquire(kind)
+
+    def _send_limited(self, kind, send):
+        """
+        Sends a request within the adaptive concurrency limit, if any, and
+        reports its latency and throttling to the limiter.
+
+        :arg str kind: Kind of the request, see get_request_kind
+        :arg send: Callable sending the request and returning the response
+        """
+        if not self.concurrency_limiter:
+            return send()
+
+        ticket = self.concurrency_limiter.acquire()
+        throttled = False
+        try:
+            response = send()
+            throttled = getattr(response, 'status_code', None) == 429
+            return response
+        except ApiException as exception:
+            throttled = exception.status == 429
+            raise
+        finally:
+            self.concurrency_limiter.release(ticket, kind, throttled)
+
+    def _count_request(self, kind):
+        self.request_counts[kind] = self.request_counts.get(kind, 0) + 1
+
+    def _throttled(self, kind, headers):
+        """
+        Makes every process back off after the API answered 429
+        """
+        try:
+            delay = float((headers or {}).get('Retry-After') or 1)
+        except ValueError:
+            delay = 1.0
+
+        if self.rate_limiter:
+            self.rate_limiter.penalize(kind, delay)
+        else:
+            time.sleep(delay)
 
     def set_resource_client(self, resource_client):
         """
@@ -254,26 +768,407 @@ class GreenLakeDataServiceModule():
         """
         self.resource_client = resource_client
 
+    def get_raw_response(self, api_call, *args, **kwargs):
+        """
+        Calls a SDK endpoint without deserializing the response into models.
+
+        The JSON body is decoded once into plain dicts, keyed like the
+        to_dict() output of the SDK models.
+
+        :arg api_call: SDK endpoint method, e.g. self.resource_client.volumes_list
+        :return: dict: decoded response body.
+        """
+        kwargs['_preload_content'] = False
+        response = api_call(*args, **kwargs)
+        return decode_json_response(response.data)
+
+    def list_resource_items(self, api_call, *args, **kwargs):
+        """
+        Calls a SDK list endpoint using the raw JSON fast path.
+
+        :return: list: items of the returned page, as plain dicts.
+        """
+        return self.get_raw_response(api_call, *args, **kwargs).get(
+            "items") or []
+
+    def iter_resource_items(self, api_call, *args, page_size=500,
+                            listing=None, **kwargs):
+        """
+        Pages through a SDK list endpoint using the raw JSON fast path.
+
+        The API may return short pages before the end of the listing, so the
+        paging only stops on an empty page or once the total is reached.
+
+        :arg int page_size: Number of items requested per call.
+        :arg dict listing: Filled with the 'total' announced by the API and
+            'complete', True once the listing reached that total.
+        :return: generator of the items, as plain dicts, so only one page is
+            held in memory at a time.
+        """
+        offset = kwargs.pop('offset', None) or 0
+        total = None
+
+        while True:
+            page = self.get_raw_response(api_call, *args, limit=page_size,
+                                         offset=offset, **kwargs)
+            items = page.get("items") or []
+
+            for item in items:
+                yield item
+
+            offset += len(items)
+            total = page.get("total")
+            if not items or (total is not None and offset >= total):
+                break
+
+        if listing is not None:
+            listing.update(total=total,
+                           complete=total is None or offset >= total)
+
+    def list_facts(self, api_call, *args, select_pushdown=False, **kwargs):
+        """
+        Lists resources for the facts, keeping only the resources matching
+        the 'where' option and the fields of the 'select' option.
+
+        The 'where' predicates the API can evaluate are sent in the filter
+        query, the others are checked on the decoded items.
+
+        :arg bool select_pushdown: The endpoint supports the 'select' query,
+            so the server only sends the selected fields.
+        :return: list: items of the returned page, as plain dicts.
+        """
+        server_filter, local_predicates = compile_where(self.where)
+        if server_filter:
+            kwargs['filter'] = join_filters(kwargs.get('filter'),
+                                            server_filter)
+
+        if self.select and select_pushdown and not kwargs.get('select'):
+            # The fields checked locally must be sent by the server too
+            select = self.select + [predicate[0] for predicate
+                                    in local_predicates]
+            try:
+                items = self.list_resource_items(
+                    api_call, *args, select=get_select_query(select),
+                    **kwargs)
+            except ApiException as exception:
+                # Not every resource type accepts every field in the query,
+                # fall back to the projection on our side
+                if exception.status != 400:
+                    raise
+                items = self.list_resource_items(api_call, *args, **kwargs)
+        else:
+            items = self.list_resource_items(api_call, *args, **kwargs)
+
+        if local_predicates or self.projection:
+            items = [self.project_facts(item) for item in items
+                     if matches_where(item, local_predicates)]
+
+        return items
+
+    def iter_facts(self, api_call, *args, **kwargs):
+        """
+        Streams the resources for the facts page by page, keeping only the
+        resources matching the 'where' option and the fields of the 'select'
+        option.
+
+        :return: generator of the items, as plain dicts.
+        """
+        server_filter, local_predicates = compile_where(self.where)
+        if server_filter:
+            kwargs['filter'] = join_filters(kwargs.get('filter'),
+                                            server_filter)
+
+        for item in self.iter_resource_items(api_call, *args, **kwargs):
+            if matches_where(item, local_predicates):
+                yield self.project_facts(item)
+
+    def project_facts(self, resource):
+        """
+        Keeps only the fields of the 'select' option of a resource.
+        """
+        if not self.projection or not resource:
+            return resource
+        return project(resource, self.projection)
+
+    def get_collection_list_calls(self):
+        """
+        Returns the SDK list endpoint of every resource collection
+        """
+        host_initiators = host_initiators_api.HostInitiatorsApi(
+            self.greenlake_client)
+
+        return {
+            'storage_systems': storage_systems_api.StorageSystemsApi(
+                self.greenlake_client).systems_list,
+            'volumes': volumes_api.VolumesApi(
+                self.greenlake_client).volumes_list,
+            'volume_sets': volume_sets_api.VolumeSetsApi(
+                self.greenlake_client).volumeset_list,
+            'hosts': host_initiators.host_list,
+            'host_groups': host_initiator_groups_api.HostInitiatorGroupsApi(
+                self.greenlake_client).host_group_list,
+            'host_initiators': host_initiators.host_initiator_list,
+        }
+
+    def get_export_topology(self, kinds=TOPOLOGY_COLLECTIONS):
+        """
+        Returns the export topology, listing in bulk the collections it is
+        still missing. The topology is built once per run.
+
+        :arg tuple kinds: Collections the caller needs.
+        """
+        if self.export_topology is None:
+            self.export_topology = ExportTopology()
+
+        list_calls = None
+        for kind in TOPOLOGY_COLLECTIONS:
+            if kind in kinds and kind not in self.export_topology.resources:
+                list_calls = list_calls or self.get_collection_list_calls()
+                self.export_topology.add_collection(
+                    kind, self.iter_resource_items(list_calls[kind]))
+                # Mark the collection loaded, even when empty
+                self.export_topology.resources.setdefault(kind, {})
+
+        return self.export_topology
+
+    def get_host_group_volumes(self, host_group_ids):
+        """
+        Returns the volumes exported to some host groups. Only the volumes
+        referencing the host groups are listed when the API can filter on
+        them, else the volumes are streamed and the others dropped.
+
+        :arg list host_group_ids: Ids of the host groups
+        :return: list: volumes, as plain dicts, sorted by id.
+        """
+        host_group_ids = set(host_group_ids)
+        if not host_group_ids:
+            return []
+
+        list_volumes = self.get_collection_list_calls()['volumes']
+
+        def exported(volumes):
+            return sorted(
+                (volume for volume in volumes
+                 if any(target_id in host_group_ids for _, target_id, _
+                        in extract_relations('volumes', volume))),
+                key=lambda volume: volume.get('id') or '')
+
+        volume_filter = ' or '.join(
+            'hostGroups/any(g: g/id eq {0})'.format(
+                format_filter_value(host_group_id))
+            for host_group_id in sorted(host_group_ids))
+        try:
+            return exported(self.iter_resource_items(list_volumes,
+                                                     filter=volume_filter))
+        except ApiException as exception:
+            # Not every API version filters on the host groups
+            if exception.status != 400:
+                raise
+            return exported(self.iter_resource_items(list_volumes))
+
+    def check_blast_radius(self, kind, resource_id):
+        """
+        Fails when removing a resource affects more resources than the
+        'max_blast_radius' option allows.
+
+        :arg str kind: Collection of the resource, e.g. 'volumes'
+        :return: dict: Blast radius, None when the option is not set.
+        """
+        max_blast_radius = self.module.params.get('max_blast_radius')
+        if max_blast_radius is None:
+            return None
+
+        radius = self.get_export_topology().blast_radius(kind, resource_id)
+        if radius['count'] > max_blast_radius:
+            raise GreenLakeDataServiceModuleException(
+                self.MSG_BLAST_RADIUS_EXCEEDED.format(
+                    radius['count'], max_blast_radius,
+                    json.dumps(radius, sort_keys=True)))
+
+        return radius
+
+    def run_concurrently(self, func, items, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Calls func on every item from a bounded pool of threads.
+
+        :arg func: Callable taking one item
+        :arg list items: Items to process
+        :arg int max_workers: Maximum number of concurrent calls. With the
+            adaptive concurrency enabled, the pool has as many threads as
+            the limiter allows requests and the limiter bounds the requests
+            in flight instead.
+        :return: list: (result, exception) tuples, in the order of the items.
+            The exception is None when the call succeeded.
+        """
+        def call(item):
+            try:
+                return func(item), None
+            except Exception as exception:
+                return None, exception
+
+        items = list(items)
+        if self.concurrency_limiter:
+            max_workers = self.concurrency_limiter.max_limit
+        if len(items) <= 1 or max_workers <= 1:
+            return [call(item) for item in items]
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(max_workers, len(items))) as executor:
+            return list(executor.map(call, items))
+
+    def iter_concurrently(self, func, items, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Streaming counterpart of run_concurrently, for results too large to
+        be held together: at most max_workers items are in flight or waiting
+        to be yielded, the next item being submitted as the oldest result is
+        yielded.
+
+        :arg func: Callable taking one item
+        :arg items: Iterable of the items to process
+        :arg int max_workers: Maximum number of concurrent calls, and of the
+            results held
+        :return: iterator of (result, exception) tuples, in the order of the
+            items. The exception is None when the call succeeded.
+        """
+        def call(item):
+            try:
+                return func(item), None
+            except Exception as exception:
+                return None, exception
+
+        items = iter(items)
+        if max_workers <= 1:
+            for item in items:
+                yield call(item)
+            return
+
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers) as executor:
+            pending = collections.deque(
+                executor.submit(call, item)
+                for item in itertools.islice(items, max_workers))
+            while pending:
+                outcome = pending.popleft().result()
+                for item in itertools.islice(items, 1):
+                    pending.append(executor.submit(call, item))
+                yield outcome
+
+    @property
+    def async_transport(self):
+        """
+        Transport opened by the run_async call of the current thread, or
+        None.
+        """
+        return getattr(self._async_state, 'transport', None)
+
+    def run_async(self, coroutine_function):
+        """
+        Runs a coroutine on a fresh event loop, with self.async_transport
+        open in the current thread for the duration of the call.
+
+        :arg coroutine_function: Callable taking no argument and returning
+            the coroutine to run
+        :return: the result of the coroutine
+        """
+        async def main():
+            async with AsyncTransport(
+                    self.api_client_conf["host"], self.get_api_header,
+                    rate_limiter=self.rate_limiter,
+                    throttle_retries=self.THROTTLE_RETRIES,
+                    on_request=self._count_request,
+                    on_coalesced=self.single_flight.record,
+                    http2=self.http_transport == 'http2',
+                    concurrency_limiter=self.concurrency_limiter,
+                    **self.async_options) as transport:
+                self._async_state.transport = transport
+                try:
+                    return await coroutine_function()
+                finally:
+                    self._async_state.transport = None
+
+        return asyncio.run(main())
+
+    def request_concurrently(self, calls, max_workers=DEFAULT_MAX_WORKERS):
+        """
+        Sends several requests concurrently, on the async transport when it
+        is enabled, else from a bounded pool of threads.
+
+        :arg list calls: (method, path, data) tuples, data may be None
+        :arg int max_workers: Maximum number of concurrent requests when
+            running on threads
+        :return: list: (response, exception) tuples, in the order of the
+            calls. The response is the raw JSON body, e.g. the task to pass
+            to wait_for_tasks. A request answered with an error status comes
+            back with its exception.
+        """
+        if self.async_options:
+            async def send_async(call):
+                method, path, data = call
+                return await self.async_transport.request_json(
+                    method, path, data=data)
+
+            return self.run_async(
+                lambda: self.async_transport.map(send_async, calls))
+
+        def send(call):
+            method, path, data = call
+            response = self._http_request(method, path, data=data)
+            if response.status_code >= 400:
+                raise GreenLakeDataServiceModuleException(
+                    self.MSG_REQUEST_FAILED.format(
+                        method, path, response.status_code,
+                        to_native(response.content[:500])))
+            return response.json()
+
+        return self.run_concurrently(send, calls, max_workers)
+
     def get_task_reponse(self, task):
         """Handle task reponse"""
-        task_instance = tasks_api.TasksApi(self.greenlake_client)
-        error = False
-        while task.get("status") in ('INITIALIZED', 'RUNNING', 'SUBMITTED'):
-            time.sleep(5)
-            try:
-                api_response = task_instance.get_task(task["task_uri"])
-            except KeyError:
-                api_response = task_instance.get_task(task["taskUri"])
+        return self.wait_for_tasks([task])[0]
 
-            task = api_response.to_dict()
-            if task.get("status") in ('FAILED', 'TIMEDOUT', 'PAUSED'):
-                error = True
-                break
+    def wait_for_tasks(self, tasks):
+        """
+        Waits for several tasks at once. Every polling round checks all the
+        pending tasks, so waiting for N tasks takes as long as the slowest
+        one instead of the sum of them.
 
-            if task.get('state') == 'SUCCEEDED':
-                break
+        With the async transport, the pending tasks of a round are all
+        polled concurrently.
 
-        return task, error
+        :arg list tasks: Task responses, as dicts
+        :return: list: (task, error) tuples, in the order of the tasks.
+        """
+        if self.async_options:
+            return self.run_async(lambda: self.async_wait_for_tasks(tasks))
+
+        task_instance = tasks_api.TasksApi(self.greenlake_client)
+        results = [[task, False] for task in tasks]
+        pending = [(result, result[0].get("task_uri")
+                    or result[0].get("taskUri")) for result in results
+                   if result[0].get("status") in TASK_PENDING_STATUSES]
+
+        while pending:
+            time.sleep(5)
+            still_pending = []
+            for result, task_uri in pending:
+                task = task_instance.get_task(task_uri).to_dict()
+                result[0] = task
+                if task.get("status") in TASK_FAILED_STATUSES:
+                    result[1] = True
+                elif (task.get("status") in TASK_PENDING_STATUSES
+                      and task.get('state') != 'SUCCEEDED'):
+                    still_pending.append((result, task_uri))
+            pending = still_pending
+
+        return [tuple(result) for result in results]
+
+    async def async_wait_for_tasks(self, tasks):
+        """
+        Coroutine counterpart of wait_for_tasks, for use inside run_async.
+        """
+        return await self.async_transport.wait_for_tasks(
+            tasks, TASK_PENDING_STATUSES, TASK_FAILED_STATUSES,
+            decode=decode_json_response)
 
     def get_task(self, task):
         error, response = False, {}
@@ -329,7 +1224,15 @@ class GreenLakeDataServiceModule():
 
         """
         try:
-            result = self.execute_module()
+            if self.fingerprint_entry:
+                result = dict(changed=False,
+                              msg=self.MSG_FINGERPRINT_UNCHANGED,
+                              ansible_facts=self.fingerprint_entry['facts'])
+            elif self.profiles:
+                result = self.execute_profiles()
+            else:
+                result = self.execute_module()
+                self._store_fingerprint(result or {})
 
             if not result:
                 result = {}
@@ -337,16 +1240,202 @@ class GreenLakeDataServiceModule():
             if "changed" not in result:
                 result['changed'] = False
 
+            concurrency = self.get_concurrency()
+            if concurrency:
+                result['concurrency'] = concurrency
+
             self.module.exit_json(**result)
 
         except GreenLakeDataServiceModuleException as exception:
             error_msg = '; '.join(to_native(e) for e in exception.args)
             self.module.fail_json(msg=error_msg,
                                   exception=traceback.format_exc())
+        finally:
+            self._write_stats()
+
+    def _check_fingerprint(self):
+        """
+        Looks up the fingerprint of the last reconcile of the resource.
+
+        The desired state is unchanged when its hash matches. The resource
+        is trusted unchanged during the TTL of the cache, and past it when a
+        GET of the resource returns the same modification marker.
+
+        :return: bool: True when the run can return the facts of the last
+            reconcile, set in self.fingerprint_entry.
+        """
+        name = (self.module.params.get('name')
+                or self.data.get(self.resource_name_field)
+                or self.data.get('name'))
+        if self.state not in ('present', 'absent') or not (
+                name or self.resource_id):
+            return False
+
+        self.fingerprint_key = self.fingerprint_cache.key(
+            self.__class__.__name__, self.system_id, name, self.resource_id)
+        if self.state != 'present':
+            self.fingerprint_cache.discard(self.fingerprint_key)
+            self.fingerprint_key = None
+            return False
+
+        self.fingerprint_data = fingerprint(dict(
+            (key, value) for key, value in self.module.params.items()
+            if key not in self.GREENLAKE_ARGS))
+        entry = self.fingerprint_cache.get(self.fingerprint_key)
+        if not entry or entry.get('data') != self.fingerprint_data:
+            return False
+
+        if time.time() - entry['checked_at'] >= self.fingerprint_cache.ttl:
+            if not (entry.get('resource_uri') and entry.get('modified')):
+                return False
+            response = self._http_request(
+                'GET', entry['resource_uri'],
+                params={'select': get_select_query(
+                    [entry['modified_field']])})
+            if response.status_code != 200:
+                return False
+            resource = decode_json_response(response.content)
+            if (normalize_modified(resource.get(entry['modified_field']))
+                    != entry['modified']):
+                return False
+            entry['checked_at'] = time.time()
+            self.fingerprint_cache.store(self.fingerprint_key, entry)
+
+        self.fingerprint_entry = entry
+        return True
+
+    def _store_fingerprint(self, result):
+        """
+        Records the fingerprint of a reconcile which found the resource
+        compliant, the resource data then being the one read from the API.
+        A reconcile which changed the resource or failed drops the
+        fingerprint, so the next run compares the resource again.
+        """
+        if not self.fingerprint_key:
+            return
+        if (result.get('changed') or result.get('failed')
+                or not self.resource_data.get("id")):
+            self.fingerprint_cache.discard(self.fingerprint_key)
+            return
+
+        modified_field, modified = get_modified(self.resource_data)
+        self.fingerprint_cache.store(self.fingerprint_key, dict(
+            data=self.fingerprint_data,
+            modified_field=modified_field,
+            modified=modified,
+            resource_uri=self.resource_data.get("resource_uri"),
+            checked_at=time.time(),
+            facts=result.get('ansible_facts') or {}))
+
+    def execute_profiles(self):
+        """
+        Runs the module against every profile of the configuration file
+        concurrently, with a module instance per profile.
+
+        The facts lists of the profiles are merged, every item tagged with
+        the profile name in a 'region' key, and the other facts are keyed
+        by profile name. The 'regions' fact holds the host, the elapsed time
+        and the error, if any, of every profile. A failing profile, even
+        through fail_json, does not fail the task unless every profile fails.
+        """
+        def execute(profile):
+            _fan_out.module = ProfileModule(self.module)
+            _fan_out.profile = profile
+            started_at = time.time()
+            outcome = dict(result=None, error=None, concurrency=None)
+            try:
+                instance = self.__class__()
+                try:
+                    outcome['result'] = instance.execute_module()
+                finally:
+                    for kind, count in instance.request_counts.items():
+                        self.request_counts[kind] = (
+                            self.request_counts.get(kind, 0) + count)
+                    self.token_fetches += instance.token_fetches
+                    outcome['concurrency'] = instance.get_concurrency()
+            except Exception as exception:
+                outcome['error'] = to_native(exception)
+            finally:
+                _fan_out.module = _fan_out.profile = None
+            outcome['elapsed'] = round(time.time() - started_at, 4)
+            return outcome
+
+        outcomes = self.run_concurrently(execute, self.profiles,
+                                         len(self.profiles))
+
+        ansible_facts, regions, errors = {}, {}, []
+        for profile, (outcome, _) in zip(self.profiles, outcomes):
+            name = get_profile_name(profile)
+            regions[name] = dict(host=profile.get('host'),
+                                 elapsed=outcome['elapsed'],
+                                 failed=outcome['error'] is not None)
+            if outcome['concurrency']:
+                regions[name]['concurrency'] = outcome['concurrency']
+            if outcome['error'] is not None:
+                regions[name]['msg'] = outcome['error']
+                errors.append(self.MSG_PROFILE_FAILED.format(
+                    name, outcome['error']))
+                continue
+
+            facts = (outcome['result'] or {}).get('ansible_facts') or {}
+            for key, value in facts.items():
+                if isinstance(value, list):
+                    ansible_facts.setdefault(key, []).extend(
+                        dict(item, region=name) if isinstance(item, dict)
+                        else item for item in value)
+                else:
+                    ansible_facts.setdefault(key, {})[name] = value
+
+        if len(errors) == len(self.profiles):
+            raise GreenLakeDataServiceModuleException(
+                self.MSG_PROFILES_FAILED.format('; '.join(errors)))
+
+        for error in errors:
+            self.module.warn(error)
+
+        ansible_facts['regions'] = regions
+        return dict(changed=False, ansible_facts=ansible_facts)
+
+    def get_concurrency(self):
+        """
+        Returns the limit the adaptive concurrency settled on and how it
+        moved, None when it is not enabled or no request went through it.
+        """
+        if (not self.concurrency_limiter
+                or not self.concurrency_limiter.peak):
+            return None
+        return self.concurrency_limiter.to_facts()
+
+    def _write_stats(self):
+        """
+        Appends the run statistics of the module to the file named by the
+        GREENLAKE_STATS_FILE environment variable, if set, as a JSON line:
+        elapsed seconds, requests per kind, token fetches, GET requests
+        saved by coalescing per request, adaptive concurrency and peak
+        memory.
+        """
+        stats_file = os.environ.get(STATS_FILE_ENV)
+        if not stats_file:
+            return
+
+        stats = dict(module=self.__class__.__name__,
+                     pid=os.getpid(),
+                     elapsed=round(time.time() - self.started_at, 4),
+                     requests=self.request_counts,
+                     token_fetches=self.token_fetches,
+                     coalesced=self.single_flight.saved,
+                     concurrency=self.get_concurrency(),
+                     max_rss_kb=getrusage(RUSAGE_SELF).ru_maxrss)
+
+        try:
+            with open(stats_file, 'a') as stats_fd:
+                stats_fd.write(json.dumps(stats) + '\n')
+        except (IOError, OSError):
+            pass
 
     def get_api_header(self):
         return {
-            'Authorization': 'Bearer ' + self.api_client_conf["access_token"],
+            'Authorization': 'Bearer ' + self._get_api_token(),
             'Content-type': 'application/json'}
 
     def get_resource_url(self, path):
@@ -355,21 +1444,71 @@ class GreenLakeDataServiceModule():
         return url
 
     def get_resource(self, path, params={}):
-        response = requests.get(
-            self.get_resource_url(path),  headers=self.get_api_header(),
-            params=params,)
+        response = self._http_request('GET', path, params=params)
         return self.get_task(response.json())
 
-    def delete_resource(self, path):
-        response = requests.delete(self.get_resource_url(path),
-                                   headers=self.get_api_header())
+    def delete_resource(self, path, wait=True):
+        response = self._http_request('DELETE', path)
+        if not wait:
+            # Task response, for wait_for_tasks
+            return response.json()
         return self.get_task(response.json())
 
-    def post_resource(self, path, data):
-        response = requests.post(self.get_resource_url(path),
-                                 headers=self.get_api_header(),  data=data)
+    def post_resource(self, path, data, wait=True):
+        response = self._http_request('POST', path, data=data)
+        if not wait:
+            # Task response, for wait_for_tasks
+            return response.json()
         return self.get_task(response.json())
 
+    async def async_get_resource(self, path, params=None):
+        """
+        Coroutine counterpart of get_resource, for use inside run_async.
+        """
+        _, _, body = await self.async_transport.request('GET', path,
+                                                        params=params)
+        return await self.async_get_task(json.loads(body) if body else {})
+
+    async def async_delete_resource(self, path, wait=True):
+        """
+        Coroutine counterpart of delete_resource, for use inside run_async.
+        """
+        _, _, body = await self.async_transport.request('DELETE', path)
+        task = json.loads(body) if body else {}
+        return await self.async_get_task(task) if wait else task
+
+    async def async_post_resource(self, path, data, wait=True):
+        """
+        Coroutine counterpart of post_resource, for use inside run_async.
+        """
+        _, _, body = await self.async_transport.request('POST', path,
+                                                        data=data)
+        task = json.loads(body) if body else {}
+        return await self.async_get_task(task) if wait else task
+
+    async def async_get_task(self, task):
+        """
+        Coroutine counterpart of get_task, for use inside run_async.
+        """
+        response, error = (await self.async_wait_for_tasks([task]))[0]
+
+        if response.get("associated_resources"):
+            task = response.get("associated_resources")
+        elif response.get("child_tasks"):
+            child_task = response.get("child_tasks")[0]
+            task_req = {"status": "INITIALIZED",
+                        "taskUri": child_task["resource_uri"].split('/')[-1],
+                        'message': ''}
+            task, error = (await self.async_wait_for_tasks([task_req]))[0]
+
+        if(task.get("response") and
+           task["response"].get("state") == "SUCCEEDED"):
+            error = False
+
+        return {"error": error,
+                "message": task.get("message", ""),
+                "response": task}
+
     def host_group_get_by_id_or_name(self, id, name):
         """
         Method to help getting the host group resource data by name or id
@@ -377,15 +1516,15 @@ class GreenLakeDataServiceModule():
         resource = {}
 
         if id:
-            response = self.resource_client.host_group_get_by_id(id)
-            resource =  eval(response.to_str())
+            resource = self.get_raw_response(
+                self.resource_client.host_group_get_by_id, id)
         elif name:
-            name = escape(name)
-            filter = "name eq '"+name+"'"
-            response = self.resource_client.host_group_list(filter=filter)
+            filter = "name eq " + format_filter_value(name)
+            items = self.list_resource_items(
+                self.resource_client.host_group_list, filter=filter)
 
-            if response.to_dict().get("items"):
-                resource = eval(response.to_str()).get("items",[])[0]
+            if items:
+                resource = items[0]
 
         return resource
 
@@ -396,15 +1535,15 @@ class GreenLakeDataServiceModule():
         resource = {}
 
         if id:
-            response = self.resource_client.host_get_by_id(id)
-            resource = eval(response.to_str())
+            resource = self.get_raw_response(
+                self.resource_client.host_get_by_id, id)
         elif name:
-            name = escape(name)
-            filter = "name eq '"+name+"'"
-            response = self.resource_client.host_list(filter=filter)
+            filter = "name eq " + format_filter_value(name)
+            items = self.list_resource_items(
+                self.resource_client.host_list, filter=filter)
 
-            if response.to_dict().get("items"):
-                resource = eval(response.to_str()).get("items",[])[0]
+            if items:
+                resource = items[0]
 
         return resource
 
@@ -415,15 +1554,15 @@ class GreenLakeDataServiceModule():
         resource = {}
 
         if id:
-            response = self.resource_client.host_initiator_get_by_id(id)
-            resource = eval(response.to_str())
+            resource = self.get_raw_response(
+                self.resource_client.host_initiator_get_by_id, id)
         elif name:
-            name = escape(name)
-            filter = "name eq '"+name+"'"
-            response = self.resource_client.host_initiator_list(filter=filter)
+            filter = "name eq " + format_filter_value(name)
+            items = self.list_resource_items(
+                self.resource_client.host_initiator_list, filter=filter)
 
-            if response.to_dict().get("items"):
-                resource = eval(response.to_str()).get("items",[])[0]
+            if items:
+                resource = items[0]
 
         return resource
 
@@ -433,15 +1572,15 @@ class GreenLakeDataServiceModule():
         """
         resource = {}
         if id:
-            response = self.resource_client.volume_get_by_id(id)
-            resource = eval(response.to_str())
+            resource = self.get_raw_response(
+                self.resource_client.volume_get_by_id, id)
         elif name:
-            name = escape(name)
-            filter = "name eq '"+name+"'"
-            response = self.resource_client.volumes_list(filter=filter)
+            filter = "name eq " + format_filter_value(name)
+            items = self.list_resource_items(
+                self.resource_client.volumes_list, filter=filter)
 
-            if response.to_dict().get("items"):
-                resource = eval(response.to_str()).get("items",[])[0]
+            if items:
+                resource = items[0]
 
         return resource
 
@@ -453,23 +1592,327 @@ class GreenLakeDataServiceModule():
 
         if self.device_type == "1":
             if id:
-                response = self.resource_client.device_type1_volume_sets_get_by_id(
+                resource = self.get_raw_response(
+                    self.resource_client.device_type1_volume_sets_get_by_id,
                     id, system_id)
-                resource = eval(response.to_str())
             else:
-                name = escape(name)
-                filter = "name eq '"+name+"'"
+                filter = "name eq " + format_filter_value(name)
 
-                response = self.resource_client.device_type1_volume_sets_list(
+                items = self.list_resource_items(
+                    self.resource_client.device_type1_volume_sets_list,
                     system_id, filter=filter)
 
-                if response.to_dict().get("items"):
-                    resource = eval(response.to_str()).get("items",[])[0]
+                if items:
+                    resource = items[0]
         else:
             pass  # TODO need to implement for device type 2
 
         return resource
 
+def get_profile_name(profile):
+    """
+    Returns the name of a configuration profile: its name, else its region,
+    else its host.
+    """
+    return (profile.get('name') or profile.get('region')
+            or profile.get('host', ''))
+
+def get_request_key(method, url, query=None):
+    """
+    Returns the key identifying a request, e.g. 'GET /api/v1/volumes?limit=10'.
+    """
+    if query:
+        if isinstance(query, dict):
+            query = query.items()
+        url = url + '?' + '&'.join('{0}={1}'.format(key, value) for key, value
+                                   in sorted(query, key=str))
+    return '{0} {1}'.format(method, url)
+
+def get_request_kind(method, url):
+    """
+    Classifies a request for the rate limiter.
+
+    :arg str method: HTTP method
+    :arg str url: Request url
+    :return: str: 'poll' for task status requests, 'read' for the other
+        reads and 'write' for everything else.
+    """
+    if method.upper() in ('GET', 'HEAD', 'OPTIONS'):
+        if TASK_URL_PATTERN.search(url):
+            return 'poll'
+        return 'read'
+
+    return 'write'
+
+def attribute_name(json_key):
+    """
+    Converts a JSON key of the API into the attribute name of the SDK
+    models, e.g. 'systemId' into 'system_id' and 'sizeMiB' into 'size_mi_b'.
+
+    :arg str json_key: JSON key
+    :return: str: SDK model attribute name
+    """
+    name = _attribute_names.get(json_key)
+
+    if name is None:
+        name = CAPITAL_CASE_PATTERN.sub(r'\1_\2', json_key)
+        name = LOWER_CASE_PATTERN.sub(r'\1_\2', name)
+        name = name.replace('-', '_').replace(' ', '_').lower()
+        if name in RESERVED_ATTRIBUTE_NAMES:
+            name = '_' + name
+        _attribute_names[json_key] = name
+
+    return name
+
+def _attribute_dict(pairs):
+    return dict((attribute_name(key), value) for key, value in pairs)
+
+def decode_json_response(data):
+    """
+    Decodes an API response body into plain dicts in a single pass, renaming
+    the keys as the SDK models do.
+
+    :arg data: response body, bytes or str
+    :return: decoded body
+    """
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+
+    if not data:
+        return {}
+
+    return json.loads(data, object_pairs_hook=_attribute_dict)
+
+def build_projection(fields):
+    """
+    Builds the projection tree of a list of field names.
+
+    Nested fields are separated by '.', and names can be spelled as in the
+    API (camelCase) or as in the facts (snake_case).
+
+    :arg list fields: field names, e.g. ['id', 'name', 'capacity.total']
+    :return: dict: tree of attribute names, None marking the kept fields.
+    """
+    tree = {}
+
+    for field in fields or []:
+        parts = [attribute_name(part) for part in field.split('.')]
+        node = tree
+        for part in parts[:-1]:
+            if part in node and node[part] is None:
+                # The parent field is already kept as a whole
+                break
+            node = node.setdefault(part, {})
+        else:
+            node[parts[-1]] = None
+
+    return tree
+
+def project(resource, projection):
+    """
+    Returns a copy of a decoded resource keeping only the projected fields.
+
+    :arg resource: decoded resource, or list of resources
+    :arg dict projection: tree built by build_projection
+    """
+    if isinstance(resource, list):
+        return [project(item, projection) for item in resource]
+
+    if not isinstance(resource, dict):
+        return resource
+
+    result = {}
+    for key, subtree in projection.items():
+        if key in resource:
+            if subtree is None:
+                result[key] = resource[key]
+            else:
+                result[key] = project(resource[key], subtree)
+
+    return result
+
+def _get_json_keys():
+    """
+    Returns the JSON keys of the SDK models by attribute name, e.g.
+    'system_wwn' -> 'systemWWN', which camelCasing the name gets wrong.
+    """
+    global _json_keys
+
+    if _json_keys is None:
+        json_keys = {}
+        try:
+            # Imports every model, only once the first query needs it
+            from greenlake_data_services import models
+        except ImportError:
+            models = None
+        for model in vars(models).values() if models else []:
+            attribute_map = getattr(model, 'attribute_map', None)
+            if isinstance(attribute_map, dict):
+                for name, json_key in attribute_map.items():
+                    json_keys.setdefault(name, json_key)
+        _json_keys = json_keys
+
+    return _json_keys
+
+def _json_key(name):
+    if name.lower() != name:
+        return name
+    json_key = _get_json_keys().get(name)
+    if json_key:
+        return json_key
+    first, _, rest = name.partition('_')
+    return first + ''.join(part[:1].upper() + part[1:]
+                           for part in rest.split('_'))
+
+def get_select_query(fields):
+    """
+    Builds the server side 'select' query of a list of field names.
+
+    :arg list fields: field names, as accepted by build_projection
+    :return: str: comma separated list of API field names
+    """
+    return ','.join('.'.join(_json_key(part) for part in field.split('.'))
+                    for field in fields)
+
+def format_filter_value(value, is_datetime=False):
+    """
+    Formats a value as a literal of the API filter query.
+
+    Strings are quoted, doubling the embedded quotes, except the date-times
+    the caller marks as such, which the API expects unquoted. A value is
+    never taken for a date-time from its look, since a resource name can
+    look like one.
+
+    :arg value: str, number, bool or None
+    :arg bool is_datetime: True when the value is an ISO 8601 date-time
+    :return: str: filter literal
+    """
+    if value is None:
+        return 'null'
+
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+
+    if isinstance(value, (int, float)):
+        return str(value)
+
+    value = to_native(value)
+    if is_datetime and DATETIME_PATTERN.match(value):
+        return value
+
+    return "'" + value.replace("'", "''") + "'"
+
+def join_filters(*filters):
+    """
+    Combines filter queries with 'and', skipping the empty ones.
+    """
+    filters = [item for item in filters if item]
+
+    if len(filters) == 1:
+        return filters[0]
+
+    return ' and '.join('(' + item + ')' for item in filters)
+
+def compile_where(predicates):
+    """
+    Compiles the predicates of the 'where' option.
+
+    Each predicate is a dict with the 'field' (nested fields separated by
+    '.'), the 'op' (defaults to 'eq') and the 'value' to compare with.
+    Predicates using a local operator or flagged with 'local: true' are
+    left to matches_where. The values of the predicates flagged with
+    'datetime: true' are sent unquoted.
+
+    :arg list predicates: predicates of the 'where' option
+    :return: tuple: filter query for the API, and list of the local
+        predicates as (field, op, value) tuples.
+    """
+    server_filters, local_predicates = [], []
+
+    for predicate in predicates or []:
+        if (not isinstance(predicate, Mapping)
+                or not predicate.get('field')):
+            raise GreenLakeDataServiceModuleException(
+                "Invalid 'where' predicate {0}: a field is required".format(
+                    predicate))
+
+        field = predicate['field']
+        operator = predicate.get('op') or 'eq'
+        value = predicate.get('value')
+
+        if operator not in SERVER_OPERATORS + LOCAL_OPERATORS:
+            raise GreenLakeDataServiceModuleException(
+                "Invalid 'where' operator '{0}', expected one of: {1}".format(
+                    operator, ', '.join(SERVER_OPERATORS + LOCAL_OPERATORS)))
+
+        if operator in LOCAL_OPERATORS or predicate.get('local'):
+            local_predicates.append((field, operator, value))
+        else:
+            server_filters.append('{0} {1} {2}'.format(
+                '.'.join(_json_key(part) for part in field.split('.')),
+                operator, format_filter_value(
+                    value, is_datetime=bool(predicate.get('datetime')))))
+
+    return ' and '.join(server_filters), local_predicates
+
+def _get_field(resource, field):
+    for part in field.split('.'):
+        if not isinstance(resource, Mapping):
+            return None
+        resource = resource.get(attribute_name(part))
+    return resource
+
+def _order(first, second):
+    try:
+        return float(first) - float(second)
+    except (TypeError, ValueError):
+        first, second = _standardize_value(first), _standardize_value(second)
+        return (first > second) - (first < second)
+
+def _matches(actual, operator, value):
+    if operator == 'eq':
+        return _standardize_value(actual) == _standardize_value(value)
+    if operator == 'ne':
+        return _standardize_value(actual) != _standardize_value(value)
+    if operator in ('in', 'not_in'):
+        found = _standardize_value(actual) in set(
+            _standardize_value(item) for item in value or [])
+        return found if operator == 'in' else not found
+    if actual is None:
+        return False
+    if operator == 'gt':
+        return _order(actual, value) > 0
+    if operator == 'ge':
+        return _order(actual, value) >= 0
+    if operator == 'lt':
+        return _order(actual, value) < 0
+    if operator == 'le':
+        return _order(actual, value) <= 0
+    if operator == 'contains':
+        if isinstance(actual, list):
+            return _standardize_value(value) in [_standardize_value(item)
+                                                 for item in actual]
+        return to_native(value) in to_native(actual)
+    if operator == 'startswith':
+        return to_native(actual).startswith(to_native(value))
+    if operator == 'endswith':
+        return to_native(actual).endswith(to_native(value))
+    if operator == 'regex':
+        return re.search(value, to_native(actual)) is not None
+    return False
+
+def matches_where(resource, predicates):
+    """
+    Checks a decoded resource against the local predicates returned by
+    compile_where.
+
+    :return: bool: True when every predicate matches.
+    """
+    for field, operator, value in predicates:
+        if not _matches(_get_field(resource, field), operator, value):
+            return False
+    return True
+
 def transform_list_to_dict(list_):
     """
     Transforms a list into a dictionary, putting values as keys.
@@ -484,7 +1927,7 @@ def transform_list_to_dict(list_):
         return ret
 
     for value in list_:
-        if isinstance(value, collections.Mapping):
+        if isinstance(value, Mapping):
             ret.update(value)
         else:
             ret[to_native(value)] = True
@@ -492,7 +1935,7 @@ def transform_list_to_dict(list_):
     return ret
 
 def _str_sorted(obj):
-    if isinstance(obj, collections.Mapping):
+    if isinstance(obj, Mapping):
         return json.dumps(obj, sort_keys=True)
     else:
         return str(obj)
@@ -548,7 +1991,7 @@ def compare(first_resource, second_resource):
         # If both values are null, empty or False it will be considered equal.
         elif not resource1[key] and not resource2[key]:
             continue
-        elif isinstance(resource1[key], collections.Mapping):
+        elif isinstance(resource1[key], Mapping):
             # recursive call
             if not compare(resource1[key], resource2[key]):
                 # + debug_resources)
@@ -602,7 +2045,7 @@ def compare_list(first_resource, second_resource):
     resource2 = sorted(resource2, key=_str_sorted)
 
     for i, val in enumerate(resource1):
-        if isinstance(val, collections.Mapping):
+        if isinstance(val, Mapping):
             # change comparison function to compare dictionaries
             if not compare(val, resource2[i]):
                 logger.debug("resources are different. " + debug_resources)
@@ -0,0 +1,182 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import json
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+try:
+    import httpx
+    import h2  # noqa: F401, required by httpx for HTTP/2
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
+HTTP_TRANSPORTS = ('http1', 'http2')
+
+# Maximum number of connections of a HTTP/2 client. Every connection
+# multiplexes the concurrent requests, so one is usually enough.
+DEFAULT_MAX_CONNECTIONS = 4
+
+
+def create_http2_client(max_connections=DEFAULT_MAX_CONNECTIONS,
+                        prior_knowledge=False):
+    """
+    Creates a httpx client speaking HTTP/2.
+
+    Args:
+        max_connections: maximum number of connections.
+        prior_knowledge: use HTTP/2 without negotiation, also over plain
+            HTTP, e.g. against a local test server. HTTPS connections
+            otherwise negotiate HTTP/2 with ALPN and fall back to HTTP/1.1.
+    """
+    if not HAS_HTTP2:
+        raise ImportError("The http2 transport requires httpx and h2")
+    return httpx.Client(http2=True, http1=not prior_knowledge,
+                        limits=httpx.Limits(max_connections=max_connections))
+
+
+class Http2Session(object):
+    """
+    Stands in for the requests session of the modules, sending the requests
+    over HTTP/2. The responses are httpx responses, which expose the
+    status_code, headers, content and json() used by the modules.
+    """
+
+    def __init__(self, client):
+        self.client = client
+
+    def request(self, method, url, headers=None, params=None, data=None,
+                **kwargs):
+        if isinstance(data, (str, bytes)):
+            kwargs['content'] = data
+        elif data is not None:
+            kwargs['data'] = data
+        return self.client.request(method, url, headers=headers,
+                                   params=params, **kwargs)
+
+    def close(self):
+        self.client.close()
+
+
+class Http2Response(object):
+    """
+    Response of Http2RESTClient, mimicking the SDK RESTResponse.
+    """
+
+    def __init__(self, response):
+        self.status = response.status_code
+        self.reason = response.reason_phrase
+        self.data = response.content
+        self.headers = response.headers
+
+    def getheaders(self):
+        return self.headers
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name, default)
+
+
+class Http2RESTClient(object):
+    """
+    Stands in for the SDK REST client, sending the requests over HTTP/2.
+    """
+
+    def __init__(self, client, api_exception):
+        """
+        Args:
+            client: httpx client, see create_http2_client.
+            api_exception: SDK ApiException class, raised on the error
+                statuses as the SDK REST client does.
+        """
+        self.client = client
+        self.api_exception = api_exception
+
+    def request(self, method, url, query_params=None, headers=None,
+                body=None, post_params=None, _preload_content=True,
+                _request_timeout=None):
+        headers = dict(headers or {})
+        content = None
+
+        if method in ('POST', 'PUT', 'PATCH', 'OPTIONS', 'DELETE'):
+            content_type = headers.setdefault('Content-Type',
+                                              'application/json')
+            if post_params and 'x-www-form-urlencoded' in content_type:
+                content = urlencode(post_params)
+            elif isinstance(body, (str, bytes)):
+                content = body
+            elif body is not None:
+                content = json.dumps(body)
+
+        timeout = _request_timeout
+        if isinstance(timeout, (tuple, list)):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+
+        response = Http2Response(self.client.request(
+            method, url, params=query_params or None, headers=headers,
+            content=content,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT))
+
+        if not 200 <= response.status <= 299:
+            raise self.api_exception(http_resp=response)
+
+        return response
+
+    def GET(self, url, headers=None, query_params=None, _preload_content=True,
+            _request_timeout=None):
+        return self.request("GET", url, headers=headers,
+                            query_params=query_params,
+                            _preload_content=_preload_content,
+                            _request_timeout=_request_timeout)
+
+    def HEAD(self, url, headers=None, query_params=None,
+             _preload_content=True, _request_timeout=None):
+        return self.request("HEAD", url, headers=headers,
+                            query_params=query_params,
+                            _preload_content=_preload_content,
+                            _request_timeout=_request_timeout)
+
+    def OPTIONS(self, url, headers=None, query_params=None, post_params=None,
+                body=None, _preload_content=True, _request_timeout=None):
+        return self.request("OPTIONS", url, headers=headers,
+                            query_params=query_params,
+                            post_params=post_params, body=body,
+                            _preload_content=_preload_content,
+                            _request_timeout=_request_timeout)
+
+    def DELETE(self, url, headers=None, query_params=None, body=None,
+               _preload_content=True, _request_timeout=None):
+        return self.request("DELETE", url, headers=headers,
+                            query_params=query_params, body=body,
+                            _preload_content=_preload_content,
+                            _request_timeout=_request_timeout)
+
+    def POST(self, url, headers=None, query_params=None, post_params=None,
+             body=None, _preload_content=True, _request_timeout=None):
+        return self.request("POST", url, headers=headers,
+                            query_params=query_params,
+                            post_params=post_params, body=body,
+                            _preload_content=_preload_content,
+                            _request_timeout=_request_timeout)
+
+    def PUT(self, url, headers=None, query_params=None, post_params=None,
+            body=None, _preload_content=True, _request_timeout=None):
+        return self.request("PUT", url, headers=headers,
+                            query_params=query_params,
+                            post_params=post_params, body=body,
+                            _preload_content=_preload_content,
+                            _request_timeout=_request_timeout)
+
+    def PATCH(self, url, headers=None, query_params=None, post_params=None,
+              body=None, _preload_content=True, _request_timeout=None):
+        return self.request("PATCH", url, headers=headers,
+                            query_params=query_params,
+                            post_params=post_params, body=body,
+                            _preload_content=_preload_content,
+                            _request_timeout=_request_timeout)
@@ -0,0 +1,161 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import contextlib
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+    HAS_FCNTL = True
+except ImportError:
+    HAS_FCNTL = False
+
+
+class TokenBucketRateLimiter(object):
+    """
+    Token bucket rate limiter shared by every module process on a controller.
+
+    The bucket state lives in a small JSON file guarded by an exclusive
+    flock, so all Ansible forks talking to the same tenant draw from the same
+    budget. Each call reserves a token up front and sleeps until the
+    reservation is due, which keeps the callers in arrival order without
+    busy looping on the lock.
+
+    Buckets:
+        read: GET requests
+        write: POST, PUT, PATCH and DELETE requests
+        poll: task status requests
+    """
+
+    BUCKETS = ('read', 'write', 'poll')
+
+    def __init__(self, buckets, state_file):
+        """
+        Args:
+            buckets: dict of bucket name to dict(rate=<tokens per second>,
+                burst=<bucket capacity>). Buckets without a rate are not
+                limited.
+            state_file: path of the file shared by all processes.
+        """
+        self.buckets = {}
+        for name in self.BUCKETS:
+            conf = buckets.get(name) or {}
+            rate = float(conf.get('rate') or 0)
+            if rate > 0:
+                burst = float(conf.get('burst') or rate)
+                self.buckets[name] = (rate, max(burst, 1.0))
+
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        self._local_state = {}
+
+    @contextlib.contextmanager
+    def _locked_state(self):
+        """
+        Yields the shared bucket state while holding the lock, and persists
+        it back once the caller is done.
+        """
+        with self._lock:
+            if not HAS_FCNTL:
+                yield self._local_state
+                return
+
+            with open(self.state_file, 'a+') as state_fd:
+                fcntl.flock(state_fd.fileno(), fcntl.LOCK_EX)
+                try:
+                    state_fd.seek(0)
+                    try:
+                        state = json.loads(state_fd.read() or '{}')
+                    except ValueError:
+                        state = {}
+
+                    yield state
+
+                    state_fd.seek(0)
+                    state_fd.truncate()
+                    state_fd.write(json.dumps(state))
+                    state_fd.flush()
+                finally:
+                    fcntl.flock(state_fd.fileno(), fcntl.LOCK_UN)
+
+    def reserve(self, bucket):
+        """
+        Takes a token from the bucket and returns how long the caller has to
+        wait before using it.
+        """
+        if bucket not in self.buckets:
+            return 0.0
+
+        rate, burst = self.buckets[bucket]
+
+        with self._locked_state() as state:
+            now = time.time()
+            tokens, stamp = state.get(bucket) or (burst, now)
+            tokens = min(burst, tokens + max(now - stamp, 0) * rate) - 1
+            state[bucket] = [tokens, now]
+
+        return -tokens / rate if tokens < 0 else 0.0
+
+    def acquire(self, bucket):
+        """
+        Blocks until a token of the given bucket is available.
+
+        Returns: the time spent waiting, in seconds.
+        """
+        wait = self.reserve(bucket)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def penalize(self, bucket, delay):
+        """
+        Empties the bucket so that every process backs off for the given
+        number of seconds, used when the API answers 429 anyway.
+        """
+        if bucket not in self.buckets:
+            return
+
+        rate = self.buckets[bucket][0]
+
+        with self._locked_state() as state:
+            now = time.time()
+            tokens, stamp = state.get(bucket) or (0.0, now)
+            state[bucket] = [min(tokens, -delay * rate), now]
+
+
+def get_rate_limiter(config, host, client_id):
+    """
+    Builds the rate limiter described by the 'rate_limit' configuration.
+
+    Args:
+        config: dict with the 'read', 'write' and 'poll' buckets and an
+            optional 'state_file'.
+        host: GreenLake host, used to keep a budget per tenant.
+        client_id: API client id, used to keep a budget per tenant.
+    Returns: TokenBucketRateLimiter instance or None when not configured.
+    """
+    if not config:
+        return None
+
+    state_file = config.get('state_file')
+    if not state_file:
+        tenant = hashlib.sha256(
+            '{0}|{1}'.format(host, client_id).encode('utf-8')).hexdigest()
+        state_file = os.path.join(
+            tempfile.gettempdir(),
+            'greenlake_rate_limit_{0}.json'.format(tenant[:16]))
+
+    limiter = TokenBucketRateLimiter(config, os.path.expanduser(state_file))
+
+    if not limiter.buckets:
+        return None
+
+    return limiter
@@ -0,0 +1,238 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from ansible.module_utils.parsing.convert_bool import boolean
+
+try:
+    from urllib.parse import urlencode
+except ImportError:
+    from urllib import urlencode
+
+DEFAULT_CACHE_PATH = '~/.ansible/tmp/greenlake_response_cache'
+DEFAULT_MAX_SIZE_MB = 256
+
+# Response headers kept along with the cached bodies
+CACHED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+class CachedResponse(object):
+    """
+    Response served from the cache after a 304 answer.
+
+    Mimics the parts of the SDK RESTResponse / urllib3 HTTPResponse used by
+    the SDK client and the modules.
+    """
+
+    status = 200
+    reason = 'OK'
+
+    def __init__(self, headers, data):
+        self.headers = headers
+        self.data = data
+
+    def getheaders(self):
+        return self.headers
+
+    def getheader(self, name, default=None):
+        for key, value in self.headers.items():
+            if key.lower() == name.lower():
+                return value
+        return default
+
+    def validators(self):
+        """
+        Returns the conditional request headers matching this response.
+        """
+        headers = {}
+        if self.getheader('ETag'):
+            headers['If-None-Match'] = self.getheader('ETag')
+        if self.getheader('Last-Modified'):
+            headers['If-Modified-Since'] = self.getheader('Last-Modified')
+        return headers
+
+
+class ResponseCache(object):
+    """
+    Size bounded on-disk store of GET response bodies and their validators.
+
+    Every entry is a file holding a JSON header line followed by the raw
+    body. The file modification time records the last use, and the least
+    recently used entries are evicted once the store grows past max_size.
+    """
+
+    def __init__(self, path, max_size, namespace=''):
+        """
+        Args:
+            path: cache directory.
+            max_size: maximum size of the cache, in bytes.
+            namespace: string mixed into every key, so tenants sharing a
+                directory never see each other entries.
+        """
+        self.path = path
+        self.max_size = max_size
+        self.namespace = namespace
+        self._size = None
+        self._lock = threading.Lock()
+
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path, mode=0o700)
+
+    def key(self, url, query=None):
+        """
+        Returns the cache key of a GET request.
+        """
+        if query:
+            if isinstance(query, dict):
+                query = query.items()
+            url = url + '?' + urlencode(sorted(query, key=str))
+
+        return hashlib.sha256(
+            (self.namespace + '|' + url).encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key):
+        return os.path.join(self.path, key)
+
+    def get(self, key):
+        """
+        Returns the CachedResponse stored under key, or None.
+        """
+        try:
+            with open(self._entry_path(key), 'rb') as entry:
+                headers = json.loads(entry.readline().decode('utf-8'))
+                return CachedResponse(headers, entry.read())
+        except (IOError, OSError, ValueError):
+            return None
+
+    def touch(self, key):
+        """
+        Marks an entry as recently used.
+        """
+        try:
+            os.utime(self._entry_path(key), None)
+        except OSError:
+            pass
+
+    def store(self, key, data, getheader):
+        """
+        Stores a response body when it carries an ETag or Last-Modified
+        validator, otherwise drops any stale entry for the key.
+
+        Args:
+            key: cache key
+            data: response body, as bytes
+            getheader: callable returning a response header by name
+        """
+        headers = dict((name, getheader(name)) for name in CACHED_HEADERS
+                       if getheader(name))
+
+        if not headers.get('ETag') and not headers.get('Last-Modified'):
+            self.discard(key)
+            return
+
+        if not isinstance(data, bytes):
+            data = data.encode('utf-8')
+
+        content = json.dumps(headers).encode('utf-8') + b'\n' + data
+
+        fd, tmp_path = tempfile.mkstemp(prefix='.', dir=self.path)
+        with os.fdopen(fd, 'wb') as entry:
+            entry.write(content)
+
+        with self._lock:
+            previous = self._file_size(key)
+            os.replace(tmp_path, self._entry_path(key))
+            self._add_size(len(content) - previous)
+
+    def discard(self, key):
+        """
+        Removes an entry from the cache.
+        """
+        with self._lock:
+            size = self._file_size(key)
+            try:
+                os.remove(self._entry_path(key))
+            except OSError:
+                return
+            self._add_size(-size)
+
+    def _file_size(self, key):
+        try:
+            return os.path.getsize(self._entry_path(key))
+        except OSError:
+            return 0
+
+    def _add_size(self, delta):
+        if self._size is None:
+            self._size = sum(self._file_size(name)
+                             for name in os.listdir(self.path)
+                             if not name.startswith('.'))
+        else:
+            self._size += delta
+
+        if self._size > self.max_size:
+            self._evict()
+
+    def _evict(self):
+        """
+        Removes the least recently used entries until the cache is back to
+        90% of its maximum size.
+        """
+        entries = []
+        for name in os.listdir(self.path):
+            # Skip the entries being written
+            if name.startswith('.'):
+                continue
+            try:
+                stat = os.stat(self._entry_path(name))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, name))
+
+        entries.sort()
+        self._size = sum(size for _, size, _ in entries)
+
+        for _, size, name in entries:
+            if self._size <= self.max_size * 0.9:
+                break
+            try:
+                os.remove(self._entry_path(name))
+            except OSError:
+                continue
+            self._size -= size
+
+
+def get_response_cache(config, host, client_id):
+    """
+    Builds the response cache described by the 'response_cache'
+    configuration.
+
+    Args:
+        config: a boolean, True for the defaults, or a dict with optional
+            'path' and 'max_size_mb' keys. The templated booleans, such as
+            the string 'False', are parsed as Ansible booleans.
+        host: GreenLake host, used to isolate the tenants.
+        client_id: API client id, used to isolate the tenants.
+    Returns: ResponseCache instance or None when not configured.
+    """
+    if not config:
+        return None
+
+    if not isinstance(config, dict):
+        if not boolean(config, strict=False):
+            return None
+        config = {}
+
+    path = os.path.expanduser(config.get('path') or DEFAULT_CACHE_PATH)
+    max_size = float(config.get('max_size_mb') or DEFAULT_MAX_SIZE_MB)
+
+    return ResponseCache(path, int(max_size * 1024 * 1024),
+                         namespace='{0}|{1}'.format(host, client_id))
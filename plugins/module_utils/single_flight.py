@@ -0,0 +1,68 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import threading
+
+
+class SingleFlight(object):
+    """
+    Coalesces identical concurrent calls: the first caller of a key makes
+    the call, and the callers arriving while it is in flight wait for it
+    and share its result, or its exception.
+
+    Attributes:
+        saved (dict): number of calls saved, by key.
+    """
+
+    class _Flight(object):
+
+        def __init__(self):
+            self.done = threading.Event()
+            self.result = None
+            self.error = None
+
+    def __init__(self):
+        self.saved = {}
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def record(self, key):
+        """
+        Counts a call saved on key.
+        """
+        with self._lock:
+            self.saved[key] = self.saved.get(key, 0) + 1
+
+    def do(self, key, func):
+        """
+        Calls func, unless a call of the same key is in flight, and returns
+        its result.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = self._Flight()
+            else:
+                self.saved[key] = self.saved.get(key, 0) + 1
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func()
+        except Exception as exception:
+            flight.error = exception
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+        return flight.result
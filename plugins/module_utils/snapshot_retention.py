@@ -0,0 +1,71 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import time
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.timestamps import parse_timestamp
+
+
+def snapshot_name(snapshot):
+    return snapshot.get("name") or snapshot.get("snapshot_name") or ""
+
+
+def snapshot_time(snapshot):
+    """
+    Returns the creation time of a snapshot as a timestamp, or None.
+    """
+    value = snapshot.get("creation_time") or snapshot.get("created_at")
+
+    if isinstance(value, dict):
+        value = value.get("ms")
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # Milliseconds since the epoch
+        return value / 1000.0 if value > 1e11 else float(value)
+    if isinstance(value, str):
+        try:
+            return parse_timestamp(value).timestamp()
+        except ValueError:
+            return None
+
+    return None
+
+
+def expired_snapshots(snapshots, name_prefix, retain_count=None,
+                      retain_days=None, now=None):
+    """
+    Returns the snapshots past the retention, the most recent first.
+
+    Only the snapshots named with the prefix and whose creation time is known
+    are pruned, the other ones are neither deleted nor counted in
+    retain_count. Nothing is pruned without a prefix or a retention.
+
+    Args:
+        snapshots: decoded snapshots of a parent.
+        name_prefix: prefix of the names of the snapshots to prune.
+        retain_count: number of the most recent snapshots kept.
+        retain_days: age in days past which the snapshots are deleted.
+        now: current timestamp, defaults to the current time.
+    Returns: list of the expired snapshots.
+    """
+    if not name_prefix or (retain_count is None and retain_days is None):
+        return []
+
+    if now is None:
+        now = time.time()
+    min_time = now - retain_days * 86400 if retain_days is not None else None
+
+    dated = []
+    for snapshot in snapshots:
+        if not snapshot_name(snapshot).startswith(name_prefix):
+            continue
+        created = snapshot_time(snapshot)
+        if created is not None:
+            dated.append((created, snapshot))
+    dated.sort(key=lambda item: item[0], reverse=True)
+
+    return [snapshot for position, (created, snapshot) in enumerate(dated)
+            if (retain_count is not None and position >= retain_count)
+            or (min_time is not None and created < min_time)]
@@ -0,0 +1,152 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import collections
+import json
+import math
+import os
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.audit import get_event_field, parse_time
+
+DEFAULT_GROUP_BY = ['name']
+
+# Percentiles of the durations reported per operation
+PERCENTILES = (50, 90, 99)
+
+
+def task_duration(task):
+    """
+    Returns the duration of a finished task in seconds, or None when the
+    task is not finished or its times are missing.
+    """
+    start = task.get('start_time') or task.get('created_at')
+    end = task.get('end_time')
+    if not start or not end:
+        return None
+    try:
+        duration = (parse_time(end) - parse_time(start)).total_seconds()
+    except ValueError:
+        return None
+    return duration if duration >= 0 else None
+
+
+def percentile(values, percent):
+    """
+    Returns the nearest rank percentile of sorted values.
+    """
+    rank = min(len(values), max(1, int(math.ceil(percent / 100.0
+                                                 * len(values)))))
+    return values[rank - 1]
+
+
+class TaskDurationStats(object):
+    """
+    Counts the tasks by state and computes the duration statistics of every
+    operation as the tasks are streamed. Only the durations are kept, one
+    number per finished task.
+    """
+
+    def __init__(self, group_by=None):
+        """
+        Args:
+            group_by: fields identifying an operation, nested fields
+                separated by '.'.
+        """
+        self.group_by = list(group_by or DEFAULT_GROUP_BY)
+        self.total = 0
+        self.first = None
+        self.last = None
+        self.states = collections.Counter()
+        self.operations = collections.OrderedDict()
+
+    def add(self, task):
+        self.total += 1
+
+        state = task.get('state') or task.get('status')
+        self.states[state] += 1
+
+        created_at = task.get('created_at')
+        if created_at:
+            created_at = str(created_at)
+            if self.first is None or created_at < self.first:
+                self.first = created_at
+            if self.last is None or created_at > self.last:
+                self.last = created_at
+
+        key = []
+        for field in self.group_by:
+            value = get_event_field(task, field)
+            key.append(str(value) if isinstance(value, (dict, list))
+                       else value)
+        key = tuple(key)
+
+        operation = self.operations.get(key)
+        if operation is None:
+            operation = self.operations[key] = dict(
+                states=collections.Counter(), durations=[])
+        operation['states'][state] += 1
+
+        duration = task_duration(task)
+        if duration is not None:
+            operation['durations'].append(duration)
+
+    def to_facts(self):
+        """
+        Returns the statistics as plain dicts, the operations sorted by
+        count. Durations are in seconds.
+        """
+        operations = []
+        for key, operation in self.operations.items():
+            entry = dict(zip(self.group_by, key))
+            entry['count'] = sum(operation['states'].values())
+            entry['states'] = dict(operation['states'].most_common())
+
+            durations = sorted(operation['durations'])
+            entry['finished'] = len(durations)
+            if durations:
+                entry['duration'] = dict(
+                    min=durations[0],
+                    max=durations[-1],
+                    mean=round(sum(durations) / len(durations), 3),
+                    total=round(sum(durations), 3),
+                    **dict(('p{0}'.format(percent),
+                            percentile(durations, percent))
+                           for percent in PERCENTILES))
+            operations.append(entry)
+
+        operations.sort(key=lambda entry: -entry['count'])
+
+        return dict(total=self.total,
+                    first=self.first,
+                    last=self.last,
+                    states=dict(self.states.most_common()),
+                    operations=operations)
+
+
+class TaskWriter(object):
+    """
+    Appends the streamed tasks to a JSON lines file.
+    """
+
+    def __init__(self, path, append=False):
+        self.path = os.path.expanduser(path)
+        self.append = append
+        self.count = 0
+        self._file = None
+
+    def __enter__(self):
+        directory = os.path.dirname(self.path)
+        if directory and not os.path.isdir(directory):
+            os.makedirs(directory)
+        self._file = open(self.path, 'a' if self.append else 'w')
+        return self
+
+    def __exit__(self, *exc_info):
+        self._file.close()
+
+    def write(self, task):
+        self._file.write(json.dumps(task, default=str) + '\n')
+        self.count += 1
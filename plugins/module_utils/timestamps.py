@@ -0,0 +1,43 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import datetime
+import re
+
+# ISO 8601 timestamp with any number of fractional digits, which
+# datetime.fromisoformat only parses from Python 3.11
+ISO_TIMESTAMP = re.compile(
+    r'^(?P<time>\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2})?)'
+    r'(?:\.(?P<fraction>\d+))?'
+    r'(?P<offset>Z|[+-]\d{2}(?::?\d{2})?)?$')
+
+
+def parse_timestamp(value):
+    """
+    Parses an ISO 8601 timestamp into an UTC datetime, the timestamps
+    without offset being taken as UTC.
+
+    Raises: ValueError when the value is not an ISO 8601 timestamp.
+    """
+    value = str(value).strip()
+    match = ISO_TIMESTAMP.match(value)
+    if match:
+        value = match.group('time')
+        if match.group('fraction'):
+            value += '.' + match.group('fraction')[:6].ljust(6, '0')
+
+        offset = match.group('offset')
+        if offset == 'Z':
+            offset = '+00:00'
+        elif offset:
+            offset = offset.replace(':', '')
+            offset = '{0}:{1}'.format(offset[:3], offset[3:] or '00')
+        value += offset or ''
+
+    parsed = datetime.datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.astimezone(datetime.timezone.utc)
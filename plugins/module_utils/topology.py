@@ -0,0 +1,202 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+import collections
+
+# Collections the export topology is built from
+TOPOLOGY_COLLECTIONS = ('volumes', 'volume_sets', 'host_groups', 'hosts')
+
+# Relations between the resources, as (relation, resource fields holding
+# the references). The first field found in a resource is used.
+RELATIONS = {
+    # Same field VolumeModule uses to find the host groups to unexport
+    'volumes': ('volume_host_group', ('host_groups', 'initiators')),
+    'volume_sets': ('volume_set_volume', ('members',)),
+    'host_groups': ('host_group_host', ('hosts',)),
+    'hosts': ('host_initiator', ('initiators',)),
+}
+
+
+def extract_relations(kind, resource):
+    """
+    Extracts the references a resource holds to other resources.
+
+    Args:
+        kind: collection of the resource, e.g. 'volumes'
+        resource: decoded resource
+    Returns: list of (relation, target_id, target_name) tuples. The target
+        id is None when the resource only references the target by name.
+    """
+    if kind not in RELATIONS:
+        return []
+
+    relation, fields = RELATIONS[kind]
+    references = []
+
+    for field in fields:
+        if resource.get(field):
+            references = resource[field]
+            break
+
+    relations = []
+    for reference in references:
+        if isinstance(reference, dict):
+            relations.append((relation, reference.get('id'),
+                              reference.get('name')))
+        else:
+            relations.append((relation, None, str(reference)))
+
+    return relations
+
+
+class ExportTopology(object):
+    """
+    Adjacency indexes of the export mapping, built from bulk listings:
+    volume -> host groups, host group -> hosts -> initiators and
+    volume set -> member volumes, along with the reverse indexes.
+    """
+
+    def __init__(self):
+        self.resources = collections.defaultdict(dict)
+        self.volume_host_groups = collections.defaultdict(set)
+        self.host_group_volumes = collections.defaultdict(set)
+        self.host_group_hosts = collections.defaultdict(set)
+        self.host_host_groups = collections.defaultdict(set)
+        self.host_initiators = collections.defaultdict(set)
+        self.volume_set_members = collections.defaultdict(set)
+        self.volume_volume_sets = collections.defaultdict(set)
+        self._volume_ids = {}
+        self._member_names = []
+
+    def add_collection(self, kind, resources):
+        """
+        Indexes the resources of a collection.
+
+        Args:
+            kind: one of TOPOLOGY_COLLECTIONS
+            resources: iterable of decoded resources
+        """
+        for resource in resources:
+            resource_id = resource.get('id')
+            if not resource_id:
+                continue
+
+            self.resources[kind][resource_id] = resource
+
+            if kind == 'volumes':
+                self._volume_ids[(resource.get('system_id'),
+                                  resource.get('name'))] = resource_id
+
+            for _, target_id, target_name in extract_relations(
+                    kind, resource):
+                if kind == 'volumes' and target_id:
+                    self.volume_host_groups[resource_id].add(target_id)
+                    self.host_group_volumes[target_id].add(resource_id)
+                elif kind == 'host_groups' and target_id:
+                    self.host_group_hosts[resource_id].add(target_id)
+                    self.host_host_groups[target_id].add(resource_id)
+                elif kind == 'hosts' and target_id:
+                    self.host_initiators[resource_id].add(target_id)
+                elif kind == 'volume_sets':
+                    if target_id:
+                        self._add_member(resource_id, target_id)
+                    else:
+                        # Members referenced by name are resolved once the
+                        # volumes are indexed
+                        self._member_names.append(
+                            (resource_id, resource.get('system_id'),
+                             target_name))
+
+        self._resolve_member_names()
+
+    def _add_member(self, volume_set_id, volume_id):
+        self.volume_set_members[volume_set_id].add(volume_id)
+        self.volume_volume_sets[volume_id].add(volume_set_id)
+
+    def _resolve_member_names(self):
+        unresolved = []
+        for volume_set_id, system_id, name in self._member_names:
+            volume_id = self._volume_ids.get((system_id, name))
+            if volume_id:
+                self._add_member(volume_set_id, volume_id)
+            else:
+                unresolved.append((volume_set_id, system_id, name))
+        self._member_names = unresolved
+
+    def _ref(self, kind, resource_id):
+        resource = self.resources[kind].get(resource_id) or {}
+        return dict(id=resource_id, name=resource.get('name')
+                    or resource.get('app_set_name'))
+
+    def blast_radius(self, kind, resource_id):
+        """
+        Returns the resources affected by the removal of a resource.
+
+        Args:
+            kind: one of TOPOLOGY_COLLECTIONS
+            resource_id: id of the resource to remove
+        Returns: dict of the affected volumes, volume sets, host groups and
+            hosts, as lists of dict(id, name), and their total 'count'.
+        """
+        volumes, host_groups, hosts = set(), set(), set()
+
+        if kind == 'volumes':
+            volumes.add(resource_id)
+        elif kind == 'volume_sets':
+            volumes.update(self.volume_set_members[resource_id])
+        elif kind == 'host_groups':
+            host_groups.add(resource_id)
+            volumes.update(self.host_group_volumes[resource_id])
+        elif kind == 'hosts':
+            hosts.add(resource_id)
+            host_groups.update(self.host_host_groups[resource_id])
+            for host_group_id in self.host_host_groups[resource_id]:
+                volumes.update(self.host_group_volumes[host_group_id])
+
+        if kind in ('volumes', 'volume_sets'):
+            for volume_id in volumes:
+                host_groups.update(self.volume_host_groups[volume_id])
+            for host_group_id in host_groups:
+                hosts.update(self.host_group_hosts[host_group_id])
+        elif kind == 'host_groups':
+            hosts.update(self.host_group_hosts[resource_id])
+
+        volume_sets = set()
+        for volume_id in volumes:
+            volume_sets.update(self.volume_volume_sets[volume_id])
+
+        radius = dict(
+            volumes=[self._ref('volumes', i) for i in sorted(volumes)],
+            volume_sets=[self._ref('volume_sets', i)
+                         for i in sorted(volume_sets)],
+            host_groups=[self._ref('host_groups', i)
+                         for i in sorted(host_groups)],
+            hosts=[self._ref('hosts', i) for i in sorted(hosts)])
+
+        # The resource itself is not part of its blast radius
+        radius[kind] = [ref for ref in radius[kind]
+                        if ref['id'] != resource_id]
+        radius['count'] = sum(len(refs) for refs in radius.values())
+
+        return radius
+
+    def to_facts(self):
+        """
+        Returns the adjacency indexes as plain dicts of sorted id lists.
+        """
+        def as_lists(index):
+            return dict((key, sorted(values))
+                        for key, values in index.items() if values)
+
+        return dict(
+            volume_host_groups=as_lists(self.volume_host_groups),
+            host_group_volumes=as_lists(self.host_group_volumes),
+            host_group_hosts=as_lists(self.host_group_hosts),
+            host_initiators=as_lists(self.host_initiators),
+            volume_set_members=as_lists(self.volume_set_members),
+            unresolved_members=[dict(volume_set_id=volume_set_id, name=name)
+                                for volume_set_id, _, name
+                                in self._member_names])
@@ -16,6 +16,48 @@ requirements:
     - greenlake_data_services >= 1.0.0
 author: "Sijeesh Kattumunda (@sijeesh)"
 options:
+    aggregate:
+      description:
+        - Count the events instead of returning them. The pages are consumed as a stream and only the counters are
+          kept, so the memory used is bounded by the number of groups instead of the number of events.
+        - "C(group_by): list of the fields counted, nested fields separated by C(.), defaults to C(user_email),
+           C(category) and C(associated_resource.type)."
+        - "C(time_bucket): C(minute), C(hour), C(day) or C(month), to also count the events by period of C(occurred_at)."
+        - The C(limit) of C(params) sets the number of events requested per API call.
+      required: false
+      type: dict
+    time_range:
+      description:
+        - Download the events of a time range, split into time windows fetched concurrently. The windows are merged in
+          time order and the events deduplicated by id.
+        - "C(start) and C(end): ISO 8601 bounds of the range on C(occurred_at), the start included and the end excluded.
+           C(end) defaults to now."
+        - "C(window_hours): length of the windows, defaults to 24. C(max_workers): number of windows fetched
+           concurrently, defaults to 8. The windows are yielded as they complete, in order, so at most C(max_workers)
+           windows are held in memory when aggregating."
+        - "C(checkpoint): file recording the completed windows. A run interrupted before the end of the download resumes
+           from it, and it is removed once the download completes."
+      required: false
+      type: dict
+    where:
+      description:
+        - List of predicates the listed resources must match, each one a dict with the C(field) (nested fields separated by C(.)),
+          the C(op) and the C(value) to compare with.
+        - "C(op) is one of C(eq) (default), C(ne), C(gt), C(ge), C(lt), C(le), which are sent to the API in the filter query,
+          or C(in), C(not_in), C(contains), C(startswith), C(endswith), C(regex), which are checked on the decoded resources."
+        - Set C(local) to C(true) on a predicate to check it on the decoded resources when the API can not filter on its field.
+        - Set C(datetime) to C(true) on a predicate whose C(value) is an ISO 8601 date-time, which the API expects unquoted.
+          The other string values are always quoted.
+        - The predicates are combined with C(and), along with the C(filter) of C(params).
+      required: false
+      type: list
+    select:
+      description:
+        - List of the fields to keep in the facts, e.g. C(occurred_at), C(user_email) or C(category). Nested fields are
+          separated by C(.).
+        - The selection is applied to every page once it is decoded, so only the selected fields are kept in the facts.
+      required: false
+      type: list
     params:
       description:
         - List of params to delimit, filter and sort the list of resources.
@@ -36,6 +78,47 @@ EXAMPLES = '''
     client_id: <client_id>
     client_secret: <client_secret>
 - debug: var=events
+
+- name: Get the time, user and category of the GreenLake Audit Events
+  greenlake_audit_events_facts:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    select:
+      - occurred_at
+      - user_email
+      - category
+- debug: var=events
+
+- name: Count the GreenLake Audit Events of the last week by user and day
+  greenlake_audit_events_facts:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    where:
+      - field: occurred_at
+        op: ge
+        value: "2023-06-01T00:00:00Z"
+        datetime: true
+    aggregate:
+      group_by:
+        - user_email
+        - category
+      time_bucket: day
+- debug: var=event_aggregates
+
+- name: Get a month of GreenLake Audit Events, 6 hours at a time
+  greenlake_audit_events_facts:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    time_range:
+      start: "2023-06-01T00:00:00Z"
+      end: "2023-07-01T00:00:00Z"
+      window_hours: 6
+      max_workers: 8
+      checkpoint: "~/.ansible/tmp/audit_events_june.jsonl"
+- debug: var=events
 '''
 
 RETURN = '''
@@ -43,16 +126,28 @@ events:
     description: Has all the Greenlake Data Service facts about the audit logs.
     returned: Always, but can be null.
     type: dict
+event_aggregates:
+    description: Total number of events, first and last occurrence, counts per field, per time bucket and per group.
+    returned: When aggregate is set, instead of events.
+    type: dict
 '''
 
-from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.greenlake import GreenLakeDataServiceModule
+import time
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.greenlake import DEFAULT_MAX_WORKERS, GreenLakeDataServiceModule, GreenLakeDataServiceModuleException, format_filter_value, join_filters
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.audit import (
+    TIME_BUCKETS, TIME_FORMAT, EventAggregator, EventCheckpoint, get_event_field, split_time_range)
 from greenlake_data_services.api import audit_api
 
 
 class GreenLakeEventsFactsModule(GreenLakeDataServiceModule):
 
     def __init__(self):
-        argument_spec = dict(params=dict(type='dict'))
+        argument_spec = dict(params=dict(type='dict'),
+                             aggregate=dict(type='dict'),
+                             time_range=dict(type='dict'),
+                             select=dict(type='list'),
+                             where=dict(type='list'))
 
         super(GreenLakeEventsFactsModule, self).__init__(
             additional_arg_spec=argument_spec)
@@ -60,12 +155,122 @@ class GreenLakeEventsFactsModule(GreenLakeDataServiceModule):
         self.set_resource_client(audit_api.AuditApi(self.greenlake_client))
 
     def execute_module(self):
+        if self.module.params.get('aggregate') is not None:
+            return self._aggregate(self.module.params['aggregate'])
+
         facts = {'events': []}
-        api_response = self.resource_client.audit_events_get(
-            **self.facts_params)
-        facts["events"] = facts["events"] + api_response.to_dict()["items"]
+        if self.module.params.get('time_range'):
+            facts["events"] = list(self._iter_time_range(
+                self.module.params['time_range']))
+        else:
+            facts["events"] = facts["events"] + self.list_facts(
+                self.resource_client.audit_events_get, **self.facts_params)
         return dict(changed=False, ansible_facts=facts)
 
+    def _iter_events(self):
+        if self.module.params.get('time_range'):
+            return self._iter_time_range(self.module.params['time_range'])
+
+        params = dict(self.facts_params)
+        if params.get('limit'):
+            params['page_size'] = params.pop('limit')
+
+        return self.iter_facts(self.resource_client.audit_events_get,
+                               **params)
+
+    def _iter_time_range(self, time_range):
+        """
+        Downloads the events of a time range, one window per worker, and
+        yields them in time order without duplicates, window by window, so
+        at most max_workers windows are held in memory.
+        """
+        if not time_range.get('start'):
+            raise GreenLakeDataServiceModuleException(
+                "time_range requires a start")
+
+        params = dict(self.facts_params)
+        params.pop('offset', None)
+        if params.get('limit'):
+            params['page_size'] = params.pop('limit')
+
+        windows = split_time_range(
+            time_range['start'],
+            time_range.get('end') or time.strftime(TIME_FORMAT, time.gmtime()),
+            float(time_range.get('window_hours') or 24))
+
+        checkpoint, completed = None, {}
+        if time_range.get('checkpoint'):
+            checkpoint = EventCheckpoint(time_range['checkpoint'], windows,
+                                         params, self.where, self.select)
+            completed = checkpoint.load()
+            checkpoint.start(resume=bool(completed))
+
+        def fetch(window):
+            start, end = window
+            window_params = dict(params)
+            window_params['filter'] = join_filters(
+                params.get('filter'),
+                "occurredAt ge {0} and occurredAt lt {1}".format(
+                    format_filter_value(start, is_datetime=True),
+                    format_filter_value(end, is_datetime=True)))
+            events = list(self.iter_facts(
+                self.resource_client.audit_events_get, **window_params))
+            if checkpoint:
+                checkpoint.record(start, events)
+            return events
+
+        missing = [window for window in windows if window[0] not in completed]
+        fetched = self.iter_concurrently(
+            fetch, missing,
+            int(time_range.get('max_workers') or DEFAULT_MAX_WORKERS))
+
+        # Duplicates can only straddle two consecutive windows
+        errors, previous_ids = [], set()
+        for start, _ in windows:
+            if start in completed:
+                events = checkpoint.read_window(completed[start])
+            else:
+                events, error = next(fetched)
+                if error:
+                    errors.append("{0}: {1}".format(start, error))
+                    previous_ids = set()
+                    continue
+
+            events.sort(key=lambda event: str(
+                get_event_field(event, 'occurred_at') or ''))
+            window_ids = set()
+            for event in events:
+                event_id = event.get('id')
+                if event_id is not None:
+                    if event_id in previous_ids or event_id in window_ids:
+                        continue
+                    window_ids.add(event_id)
+                yield event
+            previous_ids = window_ids
+
+        if errors:
+            raise GreenLakeDataServiceModuleException(
+                "{0} of {1} time windows failed, rerun to resume: {2}".format(
+                    len(errors), len(windows), "; ".join(errors)))
+
+        if checkpoint:
+            checkpoint.remove()
+
+    def _aggregate(self, aggregate):
+        time_bucket = aggregate.get('time_bucket')
+        if time_bucket and time_bucket not in TIME_BUCKETS:
+            raise GreenLakeDataServiceModuleException(
+                "Invalid time_bucket '{0}', expected one of: {1}".format(
+                    time_bucket, ', '.join(sorted(TIME_BUCKETS))))
+
+        aggregator = EventAggregator(aggregate.get('group_by'), time_bucket)
+
+        for event in self._iter_events():
+            aggregator.add(event)
+
+        return dict(changed=False,
+                    ansible_facts=dict(event_aggregates=aggregator.to_facts()))
+
 
 def main():
     GreenLakeEventsFactsModule().run()
@@ -0,0 +1,289 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+DOCUMENTATION = '''
+---
+module: greenlake_audit_events_watch
+short_description: Tail the Audit Logs into a file or syslog
+description:
+    - Polls the HPE Greenlake Data Services Audit Logs for new events during a given time and appends them to a JSON
+      lines file or sends them to syslog, e.g. for a SIEM pipeline.
+    - The polls follow a cursor on the occurrence time, so a watch started again with the same C(cursor_file) resumes
+      where the previous one stopped. The events are written before the cursor is saved, so an interrupted watch may
+      repeat events but never skips one.
+    - Run it with C(async) to keep watching in the background.
+version_added: "2.13.8"
+requirements:
+    - python >= 3.8
+    - greenlake_data_services >= 1.0.0
+author: "Sijeesh Kattumunda (@sijeesh)"
+options:
+    sink:
+      description:
+        - Destination of the events.
+        - "C(type): C(ndjson) (default) or C(syslog)."
+        - "C(path): JSON lines file the C(ndjson) sink appends to."
+        - "C(address): local socket path (default C(/dev/log)) or C(host:port) of a remote syslog server over UDP,
+           C(facility): syslog facility (default C(user)), C(tag): program name of the messages (default
+           C(greenlake_audit)), for the C(syslog) sink."
+      required: true
+      type: dict
+    cursor_file:
+      description:
+        - File keeping the occurrence time and the ids of the last delivered events between watches.
+      required: false
+      type: path
+    start:
+      description:
+        - ISO 8601 time of the first events to deliver when there is no cursor, defaults to the start of the watch.
+      required: false
+      type: str
+    duration:
+      description:
+        - Seconds to watch for. C(0) polls once.
+      required: false
+      default: 3600
+      type: float
+    max_events:
+      description:
+        - Stop watching after this number of events.
+      required: false
+      type: int
+    min_interval:
+      description:
+        - Seconds between two polls while events keep coming. The interval doubles after every poll without events,
+          up to C(max_interval).
+      required: false
+      default: 5
+      type: float
+    max_interval:
+      description:
+        - Maximum seconds between two polls.
+      required: false
+      default: 60
+      type: float
+    flush_interval:
+      description:
+        - Maximum seconds between two flushes of the sink, the cursor being saved after every flush.
+      required: false
+      default: 5
+      type: float
+    flush_count:
+      description:
+        - Maximum number of events written between two flushes of the sink.
+      required: false
+      default: 100
+      type: int
+    dedup_size:
+      description:
+        - Number of the most recent event ids remembered to drop the events returned again, e.g. by overlapping polls.
+          Bounds the memory used by the watch.
+      required: false
+      default: 10000
+      type: int
+    where:
+      description:
+        - List of predicates the events must match, each one a dict with the C(field) (nested fields separated by C(.)),
+          the C(op) and the C(value) to compare with.
+        - "C(op) is one of C(eq) (default), C(ne), C(gt), C(ge), C(lt), C(le), which are sent to the API in the filter query,
+          or C(in), C(not_in), C(contains), C(startswith), C(endswith), C(regex), which are checked on the decoded resources."
+        - Set C(local) to C(true) on a predicate to check it on the decoded resources when the API can not filter on its field.
+        - Set C(datetime) to C(true) on a predicate whose C(value) is an ISO 8601 date-time, which the API expects unquoted.
+          The other string values are always quoted.
+      required: false
+      type: list
+    select:
+      description:
+        - List of the fields of the events to deliver. Nested fields are separated by C(.).
+      required: false
+      type: list
+    params:
+      description:
+        - "params allowed:
+           C(filter): Filter criteria added to the cursor - e.g. category eq 'volume' (optional)
+           C(limit): The number of events requested per API call, defaults to 500 (optional)"
+      required: false
+      type: dict
+'''
+
+EXAMPLES = '''
+- name: Tail the GreenLake Audit Events into a file for an hour
+  greenlake_audit_events_watch:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    sink:
+      type: ndjson
+      path: /var/log/greenlake/audit.jsonl
+    cursor_file: /var/lib/greenlake/audit.cursor
+    duration: 3600
+  async: 3900
+  poll: 0
+
+- name: Forward the GreenLake Audit Events to a syslog server
+  greenlake_audit_events_watch:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    sink:
+      type: syslog
+      address: "siem.example.com:514"
+      facility: local0
+    cursor_file: /var/lib/greenlake/audit.cursor
+    min_interval: 2
+    max_interval: 30
+- debug: var=audit_watch
+'''
+
+RETURN = '''
+audit_watch:
+    description: Number of events delivered, duplicates dropped, polls and flushes, the cursor time and the elapsed seconds.
+    returned: Always.
+    type: dict
+'''
+
+import time
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.greenlake import GreenLakeDataServiceModule, GreenLakeDataServiceModuleException, compile_where, format_filter_value, join_filters, matches_where
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.audit import (
+    TIME_FIELD, TIME_FORMAT, AdaptiveInterval, EventCursor, RecentIds, get_event_field, get_event_sink)
+from greenlake_data_services.api import audit_api
+
+
+class GreenLakeEventsWatchModule(GreenLakeDataServiceModule):
+
+    def __init__(self):
+        argument_spec = dict(sink=dict(required=True, type='dict'),
+                             cursor_file=dict(type='path'),
+                             start=dict(type='str'),
+                             duration=dict(type='float', default=3600),
+                             max_events=dict(type='int'),
+                             min_interval=dict(type='float', default=5),
+                             max_interval=dict(type='float', default=60),
+                             flush_interval=dict(type='float', default=5),
+                             flush_count=dict(type='int', default=100),
+                             dedup_size=dict(type='int', default=10000),
+                             params=dict(type='dict'),
+                             select=dict(type='list'),
+                             where=dict(type='list'))
+
+        super(GreenLakeEventsWatchModule, self).__init__(
+            additional_arg_spec=argument_spec)
+
+        self.set_resource_client(audit_api.AuditApi(self.greenlake_client))
+
+    def execute_module(self):
+        params = self.module.params
+        started_at = time.time()
+        deadline = started_at + params['duration']
+
+        cursor = EventCursor(params.get('cursor_file'),
+                             params.get('start') or time.strftime(
+                                 TIME_FORMAT, time.gmtime(started_at)),
+                             params['dedup_size'])
+        cursor.load()
+        recent = RecentIds(params['dedup_size'])
+        for event_id in cursor.ids:
+            recent.add(event_id)
+        interval = AdaptiveInterval(params['min_interval'],
+                                    params['max_interval'])
+
+        try:
+            sink = get_event_sink(params['sink'])
+        except (ValueError, KeyError, IOError, OSError) as exception:
+            raise GreenLakeDataServiceModuleException(
+                "Invalid sink: {0}".format(exception))
+
+        stats = dict(events=0, duplicates=0, polls=0, flushes=0)
+        state = dict(pending=0, flushed_at=time.time(), cursor_saved=False)
+
+        def flush():
+            sink.flush()
+            if cursor.save():
+                state['cursor_saved'] = True
+            stats['flushes'] += 1
+            state['pending'], state['flushed_at'] = 0, time.time()
+
+        try:
+            while True:
+                stats['polls'] += 1
+                found = 0
+                for event, matched in self._poll(cursor.time):
+                    if not recent.add(event.get('id')):
+                        stats['duplicates'] += int(matched)
+                        continue
+
+                    # The events the local predicates reject move the cursor
+                    # too, so they are not fetched again by every poll
+                    cursor.advance(get_event_field(event, TIME_FIELD),
+                                   event.get('id'))
+                    if not matched:
+                        continue
+
+                    sink.write(self.project_facts(event))
+                    found += 1
+                    stats['events'] += 1
+                    state['pending'] += 1
+
+                    if state['pending'] >= params['flush_count']:
+                        flush()
+                    if (params.get('max_events')
+                            and stats['events'] >= params['max_events']):
+                        break
+
+                if (state['pending'] and time.time() - state['flushed_at']
+                        >= params['flush_interval']):
+                    flush()
+
+                remaining = deadline - time.time()
+                if (remaining <= 0 or (params.get('max_events')
+                                       and stats['events']
+                                       >= params['max_events'])):
+                    break
+
+                wait = interval.next(found > 0)
+                if state['pending']:
+                    # Wake up in time for the flush of the pending events
+                    wait = min(wait, max(0, params['flush_interval'] - (
+                        time.time() - state['flushed_at'])))
+                time.sleep(min(wait, remaining))
+        finally:
+            flush()
+            sink.close()
+
+        stats.update(cursor=cursor.time,
+                     elapsed=round(time.time() - started_at, 3))
+
+        # Events were appended to the sink, or the cursor file was written
+        changed = bool(stats['events']) or state['cursor_saved']
+        return dict(changed=changed, ansible_facts=dict(audit_watch=stats))
+
+    def _poll(self, since):
+        """
+        Streams the events that occurred at or after a time, oldest first,
+        as (event, matched) tuples, matched being False for the events the
+        local predicates reject. The events at the cursor time are returned
+        again, and dropped as duplicates by the caller.
+        """
+        server_filter, local_predicates = compile_where(self.where)
+        event_filter = join_filters(
+            self.facts_params.get('filter'), server_filter,
+            "occurredAt ge {0}".format(
+                format_filter_value(since, is_datetime=True)))
+
+        for event in self.iter_resource_items(
+                self.resource_client.audit_events_get,
+                page_size=int(self.facts_params.get('limit') or 500),
+                filter=event_filter, sort='occurredAt asc'):
+            yield event, matches_where(event, local_predicates)
+
+
+def main():
+    GreenLakeEventsWatchModule().run()
+
+
+if __name__ == '__main__':
+    main()
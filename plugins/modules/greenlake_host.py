@@ -29,6 +29,13 @@ options:
             - List with the Greenlake Data Service host resource properties.
         required: true
         type: dict
+    max_blast_radius:
+        description:
+            - On C(absent), maximum number of other volumes, volume sets, host groups and hosts the removal may affect.
+              The export topology is listed in bulk before the removal, and the task fails without removing anything
+              when the blast radius is larger. The blast radius is returned in the C(blast_radius) fact.
+        required: false
+        type: int
 '''
 
 EXAMPLES = '''
@@ -94,6 +101,8 @@ class GreenLakeDataServiceHostModule(GreenLakeDataServiceModule):
     MSG_UPDATED = "Host resource updated"
     MSG_ALREADY_PRESENT = 'Host resource exists with the same details'
 
+    RESOURCE_TYPES = ('host-initiator', 'host-initiators')
+
     UPDATE_FIELDS = ["initiators_to_create",
                      "name",
                      "updated_initiators"]
@@ -101,6 +110,7 @@ class GreenLakeDataServiceHostModule(GreenLakeDataServiceModule):
     def __init__(self):
 
         additional_arg_spec = dict(data=dict(required=True, type='dict'),
+                                   max_blast_radius=dict(type='int'),
                                    state=dict(
                                        required=True,
                                        choices=['present', 'absent']))
@@ -131,7 +141,7 @@ class GreenLakeDataServiceHostModule(GreenLakeDataServiceModule):
 
     def _present(self):
         ansible_facts, msg, changed = {"hosts": []}, "", False
-        result = {}
+        result, updates = {}, None
 
         if self.resource_data:
             self.process_input_data(self.UPDATE_FIELDS)
@@ -174,6 +184,9 @@ class GreenLakeDataServiceHostModule(GreenLakeDataServiceModule):
                     self.resource_data["id"], update_host_input)
 
                 result = self.get_task(api_response.to_dict())
+                if not initiators_to_add and not initiator_ids_to_update:
+                    # The initiators are unchanged, so the host is known
+                    updates = self.data
                 changed = True
                 msg = self.MSG_UPDATED
 
@@ -184,7 +197,7 @@ class GreenLakeDataServiceHostModule(GreenLakeDataServiceModule):
             msg = self.MSG_CREATED
 
         if result and not result.get("error"):
-            self.set_resource_data()
+            self.refresh_resource_data(result, updates)
             changed = True
 
         ansible_facts["hosts"].append(self.resource_data)
@@ -196,10 +209,14 @@ class GreenLakeDataServiceHostModule(GreenLakeDataServiceModule):
         )
 
     def _absent(self):
-        changed = False
+        changed, ansible_facts = False, {}
+        msg = ''
 
         if self.data.get("id") or self.data.get("name"):
             host_id = self.resource_data["id"]
+            blast_radius = self.check_blast_radius("hosts", host_id)
+            if blast_radius:
+                ansible_facts["blast_radius"] = blast_radius
 
             self.delete_resource(
                 "/api/v1/host-initiators/{host_id}?force={force}".format(
@@ -209,7 +226,7 @@ class GreenLakeDataServiceHostModule(GreenLakeDataServiceModule):
             msg = self.MSG_DELETED
             self.resource_data = {}
 
-        return changed, msg, {}
+        return changed, msg, ansible_facts
 
 
 def main():
@@ -34,6 +34,25 @@ options:
         - "To gather facts about getVolumes
            a Host name/id is required. Otherwise, these options will be ignored."
       type: list
+    where:
+      description:
+        - List of predicates the listed resources must match, each one a dict with the C(field) (nested fields separated by C(.)),
+          the C(op) and the C(value) to compare with.
+        - "C(op) is one of C(eq) (default), C(ne), C(gt), C(ge), C(lt), C(le), which are sent to the API in the filter query,
+          or C(in), C(not_in), C(contains), C(startswith), C(endswith), C(regex), which are checked on the decoded resources."
+        - Set C(local) to C(true) on a predicate to check it on the decoded resources when the API can not filter on its field.
+        - Set C(datetime) to C(true) on a predicate whose C(value) is an ISO 8601 date-time, which the API expects unquoted.
+          The other string values are always quoted.
+        - The predicates are combined with C(and), along with the C(filter) of C(params).
+      required: false
+      type: list
+    select:
+      description:
+        - List of the fields to keep in the facts, e.g. C(id), C(name) or C(initiators). Nested fields are separated by
+          C(.), e.g. C(initiators.address).
+        - The selection is applied to every page once it is decoded, so only the selected fields are kept in the facts.
+      required: false
+      type: list
     params:
       description:
         - List of params to delimit, filter and sort the list of resources.
@@ -53,6 +72,16 @@ EXAMPLES = '''
     client_id: <client_id>
     client_secret: <client_secret>
 - debug: var=hosts
+
+- name: Get the names and the initiator addresses of the GreenLake hosts
+  greenlake_host_facts:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    select:
+      - name
+      - initiators.address
+- debug: var=hosts
 '''
 
 RETURN = '''
@@ -68,11 +97,15 @@ from greenlake_data_services.api import host_initiators_api
 
 class GreenLakeHostFactsModule(GreenLakeDataServiceModule):
 
+    FAN_OUT_PROFILES = True
+
     def __init__(self):
         argument_spec = dict(id=dict(type='str'),
                              name=dict(type='str'),
                              options=dict(type='list'),
-                             params=dict(type='dict'))
+                             params=dict(type='dict'),
+                             select=dict(type='list'),
+                             where=dict(type='list'))
 
         super(GreenLakeHostFactsModule, self).__init__(
             additional_arg_spec=argument_spec)
@@ -91,13 +124,14 @@ class GreenLakeHostFactsModule(GreenLakeDataServiceModule):
     def execute_module(self):
         ansible_facts = {'hosts': []}
         if self.module.params.get('id') or self.module.params.get('name'):
-            ansible_facts["hosts"].append(self.resource_data)
+            ansible_facts["hosts"].append(
+                self.project_facts(self.resource_data))
             if self.options:
                 more_facts = self.__gather_optional_facts()
                 ansible_facts.update(more_facts)
         else:
-            api_response = self.resource_client.host_list(**self.facts_params)
-            ansible_facts["hosts"] = eval(str(api_response["items"]))
+            ansible_facts["hosts"] = self.list_facts(
+                self.resource_client.host_list, **self.facts_params)
 
         return dict(changed=False, ansible_facts=ansible_facts)
 
@@ -105,11 +139,20 @@ class GreenLakeHostFactsModule(GreenLakeDataServiceModule):
         more_facts = {}
 
         if self.options.get('getVolumes'):
-            api_response = self.resource_client.volumeset_get_byvolumeset_id(
-                self.module.params['id'])
-            response = api_response.to_dict()
-            if response.get("items"):
-                more_facts["volumes"] = response["items"]
+            host_groups = self.resource_data.get("host_groups")
+            if host_groups is None:
+                # The host does not tell its host groups, list them
+                topology = self.get_export_topology(('host_groups',))
+                host_group_ids = topology.host_host_groups.get(
+                    self.resource_data["id"], ())
+            else:
+                host_group_ids = [
+                    host_group.get("id") if isinstance(host_group, dict)
+                    else host_group for host_group in host_groups]
+            items = [self.project_facts(volume) for volume
+                     in self.get_host_group_volumes(host_group_ids)]
+            if items:
+                more_facts["volumes"] = items
 
         return more_facts
 
@@ -29,6 +29,13 @@ options:
             - List with the Greenlake Data Service host group resource properties.
         required: true
         type: dict
+    max_blast_radius:
+        description:
+            - On C(absent), maximum number of other volumes, volume sets, host groups and hosts the removal may affect.
+              The export topology is listed in bulk before the removal, and the task fails without removing anything
+              when the blast radius is larger. The blast radius is returned in the C(blast_radius) fact.
+        required: false
+        type: int
 '''
 
 EXAMPLES = '''
@@ -91,6 +98,8 @@ class GreenLakeDataServiceHostGroupModule(GreenLakeDataServiceModule):
     MSG_ALREADY_PRESENT = ("Host Group resource exists with the"
                            "same configuration")
 
+    RESOURCE_TYPES = ('host-initiator-group', 'host-initiator-groups')
+
     UPDATE_FIELDS = ["hosts_to_create",
                      "name",
                      "updated_hosts"]
@@ -98,6 +107,7 @@ class GreenLakeDataServiceHostGroupModule(GreenLakeDataServiceModule):
     def __init__(self):
 
         additional_arg_spec = dict(data=dict(required=True, type='dict'),
+                                   max_blast_radius=dict(type='int'),
                                    state=dict(
                                        required=True,
                                        choices=['present', 'absent']))
@@ -134,7 +144,7 @@ class GreenLakeDataServiceHostGroupModule(GreenLakeDataServiceModule):
         Handles create/update operations
         """
         ansible_facts, msg, changed = {"host_groups": []}, "", False
-        result = {}
+        result, updates = {}, None
 
         if self.resource_data:
             self.process_input_data(self.UPDATE_FIELDS)
@@ -172,6 +182,9 @@ class GreenLakeDataServiceHostGroupModule(GreenLakeDataServiceModule):
                     update_host_group_input)
 
                 result = self.get_task(api_response.to_dict())
+                if not host_ids_to_update:
+                    # The hosts are unchanged, so the host group is known
+                    updates = self.data
                 changed = True
                 msg = self.MSG_UPDATED
 
@@ -185,7 +198,7 @@ class GreenLakeDataServiceHostGroupModule(GreenLakeDataServiceModule):
             msg = self.MSG_CREATED
 
         if result and not result.get("error"):
-            self.set_resource_data()
+            self.refresh_resource_data(result, updates)
             changed = True
 
         ansible_facts["host_groups"].append(self.resource_data)
@@ -197,10 +210,14 @@ class GreenLakeDataServiceHostGroupModule(GreenLakeDataServiceModule):
         )
 
     def _absent(self):
-        changed = False
+        changed, ansible_facts = False, {}
+        msg = ''
 
         if self.data.get("id") or self.data.get("name"):
             host_group_id = self.resource_data["id"]
+            blast_radius = self.check_blast_radius("host_groups", host_group_id)
+            if blast_radius:
+                ansible_facts["blast_radius"] = blast_radius
 
             self.delete_resource(
                 "/api/v1/host-initiator-groups/{host_group_id}?force={force}"
@@ -210,7 +227,7 @@ class GreenLakeDataServiceHostGroupModule(GreenLakeDataServiceModule):
             msg = self.MSG_DELETED
             self.resource_data = {}
 
-        return changed, msg, {}
+        return changed, msg, ansible_facts
 
 
 def main():
@@ -21,6 +21,25 @@ options:
         - Id of the Greenlake Data Service host initiators.
       required: false
       type: str
+    where:
+      description:
+        - List of predicates the listed resources must match, each one a dict with the C(field) (nested fields separated by C(.)),
+          the C(op) and the C(value) to compare with.
+        - "C(op) is one of C(eq) (default), C(ne), C(gt), C(ge), C(lt), C(le), which are sent to the API in the filter query,
+          or C(in), C(not_in), C(contains), C(startswith), C(endswith), C(regex), which are checked on the decoded resources."
+        - Set C(local) to C(true) on a predicate to check it on the decoded resources when the API can not filter on its field.
+        - Set C(datetime) to C(true) on a predicate whose C(value) is an ISO 8601 date-time, which the API expects unquoted.
+          The other string values are always quoted.
+        - The predicates are combined with C(and), along with the C(filter) of C(params).
+      required: false
+      type: list
+    select:
+      description:
+        - List of the fields to keep in the facts, e.g. C(id), C(address) or C(protocol). Nested fields are separated by
+          C(.).
+        - The selection is applied to every page once it is decoded, so only the selected fields are kept in the facts.
+      required: false
+      type: list
     params:
       description:
         - List of params to delimit, filter and sort the list of resources.
@@ -40,6 +59,17 @@ EXAMPLES = '''
     client_id: <client_id>
     client_secret: <client_secret>
 - debug: var=host_initiators
+
+- name: Get the address and protocol of the GreenLake host initiators
+  greenlake_host_initiator_facts:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    select:
+      - id
+      - address
+      - protocol
+- debug: var=host_initiators
 '''
 
 RETURN = '''
@@ -55,9 +85,13 @@ from greenlake_data_services.api import host_initiators_api
 
 class GreenLakeHostInitiatorFactsModule(GreenLakeDataServiceModule):
 
+    FAN_OUT_PROFILES = True
+
     def __init__(self):
         argument_spec = dict(id=dict(type='str'),
-                             params=dict(type='dict'))
+                             params=dict(type='dict'),
+                             select=dict(type='list'),
+                             where=dict(type='list'))
 
         super(GreenLakeHostInitiatorFactsModule, self).__init__(
             additional_arg_spec=argument_spec)
@@ -77,13 +111,14 @@ class GreenLakeHostInitiatorFactsModule(GreenLakeDataServiceModule):
         ansible_facts = {'host_initiators': []}
 
         if self.module.params.get('id'):
-            ansible_facts["host_initiators"].append(self.resource_data)
+            ansible_facts["host_initiators"].append(
+                self.project_facts(self.resource_data))
         else:
-            api_response = self.resource_client.host_initiator_list(
-                **self.facts_params)
             ansible_facts["host_initiators"] = (
                 ansible_facts["host_initiators"] +
-                eval(api_response.to_str()).get("items", []))
+                self.list_facts(
+                    self.resource_client.host_initiator_list,
+                    **self.facts_params))
 
         return dict(changed=False, ansible_facts=ansible_facts)
 
@@ -0,0 +1,133 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+DOCUMENTATION = '''
+---
+module: greenlake_query
+short_description: Query the local index of the Greenlake Data Service resources
+description:
+    - Answers questions about the fleet from the SQLite index built by the M(greenlake_sync) module, without any API call.
+    - The database is opened read only, and only the reading statements are allowed.
+version_added: "2.13.8"
+requirements:
+    - python >= 3.8
+author: "Sijeesh Kattumunda (@sijeesh)"
+options:
+    db_path:
+      description:
+        - Path of the SQLite database built by M(greenlake_sync).
+      required: false
+      default: ~/.ansible/greenlake_fleet.db
+      type: path
+    query:
+      description:
+        - "Name of a predefined query. Each query expects one argument in C(args):
+          C(volumes_exported_to_host_group): C(host_group) id or name
+          C(host_groups_of_volume): C(volume) id or name
+          C(hosts_of_host_group): C(host_group) id or name, also returns the host initiators
+          C(volume_set_members): C(volume_set) id or name
+          C(volumes_of_system): C(system) id or name"
+        - Mutually exclusive with C(sql).
+      required: false
+      type: str
+    sql:
+      description:
+        - Single SELECT statement to run against the index. The C(resources) table holds the C(kind), C(id), C(name), C(system_id) and
+          JSON C(body) of every resource, and the C(relations) table the C(relation), C(source_id), C(target_id) and
+          C(target_name) of their references.
+        - Other statements, such as C(INSERT), C(PRAGMA) or C(ATTACH), and several statements fail the task.
+        - Mutually exclusive with C(query).
+      required: false
+      type: str
+    args:
+      description:
+        - Arguments of the query, a dict for named placeholders or a list for C(?) placeholders.
+      required: false
+      type: raw
+'''
+
+EXAMPLES = '''
+- name: Get the volumes exported to a host group
+  greenlake_query:
+    query: volumes_exported_to_host_group
+    args:
+      host_group: "hostGroupAnsibleTest"
+- debug: var=query_results
+
+- name: Count the volumes per system
+  greenlake_query:
+    sql: >-
+      SELECT system_id, count(*) AS volumes FROM resources
+      WHERE kind = 'volumes' GROUP BY system_id
+- debug: var=query_results
+'''
+
+RETURN = '''
+query_results:
+    description: Rows returned by the query, as dicts.
+    returned: Always, but can be empty.
+    type: list
+'''
+
+import sqlite3
+import traceback
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.fleet_index import DEFAULT_DB_PATH, NAMED_QUERIES, FleetIndex
+
+
+class GreenLakeQueryModule(object):
+
+    SUPPORTS_CHECK_MODE = True
+
+    def __init__(self):
+        argument_spec = dict(db_path=dict(type='path',
+                                          default=DEFAULT_DB_PATH),
+                             query=dict(type='str',
+                                        choices=sorted(NAMED_QUERIES)),
+                             sql=dict(type='str'),
+                             args=dict(type='raw'))
+
+        self.module = self._create_module(
+            argument_spec, mutually_exclusive=[['query', 'sql']],
+            required_one_of=[['query', 'sql']],
+            supports_check_mode=self.SUPPORTS_CHECK_MODE)
+
+    def _create_module(self, argument_spec, **kwargs):
+        """
+        Creates the AnsibleModule. Overridden by the controller action plugin,
+        which runs the query where greenlake_sync writes the index.
+        """
+        return AnsibleModule(argument_spec=argument_spec, **kwargs)
+
+    def execute_module(self):
+        index = FleetIndex(self.module.params['db_path'], read_only=True)
+        try:
+            if self.module.params.get('query'):
+                rows = index.named_query(self.module.params['query'],
+                                         self.module.params.get('args'))
+            else:
+                rows = index.select(self.module.params['sql'],
+                                   self.module.params.get('args'))
+        finally:
+            index.close()
+
+        return dict(changed=False, ansible_facts=dict(query_results=rows))
+
+    def run(self):
+        try:
+            self.module.exit_json(**self.execute_module())
+        except sqlite3.Error as exception:
+            self.module.fail_json(msg=str(exception),
+                                  exception=traceback.format_exc())
+
+
+def main():
+    GreenLakeQueryModule().run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,356 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+DOCUMENTATION = '''
+---
+module: greenlake_snapshot
+short_description: Manage the snapshots of Greenlake Data Service volumes and volume sets.
+description:
+    - Creates a snapshot of many volumes or volume sets at once, and prunes their snapshots by count or age.
+    - The snapshot requests are sent concurrently and their tasks waited for together. Pruning lists the snapshots of
+      each parent once and deletes the expired ones concurrently.
+version_added: "2.13.8"
+requirements:
+    - python >= 3.8
+    - greenlake_data_services >= 1.0.0
+author: "Sijeesh Kattumunda (@sijeesh)"
+options:
+    state:
+        description:
+            - C(present) will create a snapshot of every parent, then prune the snapshots by the retention options.
+              C(absent) will only prune the snapshots, and requires C(retain_count) or C(retain_days).
+        choices: ['present', 'absent']
+        required: true
+        type: str
+    system_id:
+        description:
+            - Id of the storage system of the parents.
+        required: true
+        type: str
+    parent_type:
+        description:
+            - Type of the parents.
+        choices: ['volume', 'volume_set']
+        default: volume
+        required: false
+        type: str
+    parents:
+        description:
+            - Ids or names of the volumes or volume sets.
+        required: true
+        type: list
+    name_prefix:
+        description:
+            - Prefix of the snapshot names. The created snapshots are named with the prefix and the creation time, and
+              only the snapshots whose name starts with the prefix are pruned.
+            - Required by C(retain_count) and C(retain_days), so the manual snapshots are never pruned.
+        required: false
+        type: str
+    data:
+        description:
+            - Additional snapshot properties sent with every snapshot request, in the API format, e.g. C(comment) or
+              C(expireSecs).
+        required: false
+        type: dict
+    retain_count:
+        description:
+            - Number of the most recent snapshots kept for each parent. The snapshots whose creation time is unknown
+              are neither counted nor deleted.
+        required: false
+        type: int
+    retain_days:
+        description:
+            - Age in days past which the snapshots are deleted.
+        required: false
+        type: int
+    max_workers:
+        description:
+            - Maximum number of concurrent snapshot requests. Ignored when the C(async_transport) setting is enabled,
+              the requests are then bounded by its C(max_connections), or when the C(adaptive_concurrency) setting is
+              enabled.
+        required: false
+        default: 8
+        type: int
+'''
+
+EXAMPLES = '''
+- name: Snapshot GreenLake DSCC Volumes and keep the last 7 snapshots
+  greenlake_snapshot:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    system_id: <system_id>
+    state: present
+    parents:
+      - "AnsibleTestVolume.0"
+      - "AnsibleTestVolume.1"
+    name_prefix: "daily-"
+    retain_count: 7
+
+- debug: var=snapshots
+
+- name: Prune the GreenLake DSCC Volume Set snapshots older than 30 days
+  greenlake_snapshot:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    system_id: <system_id>
+    state: absent
+    parent_type: volume_set
+    parents:
+      - "ansble-test-volumeset"
+    name_prefix: "daily-"
+    retain_days: 30
+
+- debug: var=snapshots
+'''
+
+RETURN = '''
+snapshots:
+    description: Names of the created snapshots and the deleted snapshots per parent, the failures, the elapsed seconds and
+                 the created and deleted snapshots per second.
+    returned: Always.
+    type: dict
+'''
+
+import json
+import time
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.greenlake import DEFAULT_MAX_WORKERS, GreenLakeDataServiceModule, GreenLakeDataServiceModuleException, format_filter_value
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.snapshot_retention import expired_snapshots
+
+from greenlake_data_services.api import volume_sets_api
+from greenlake_data_services.api import volumes_api
+
+PARENT_PATHS = {
+    'volume': "/api/v1/storage-systems/device-type1/{system_id}/volumes/{parent_id}/snapshots",
+    'volume_set': "/api/v1/storage-systems/device-type1/{system_id}/applicationsets/{parent_id}/snapshots",
+}
+
+
+class SnapshotModule(GreenLakeDataServiceModule):
+
+    MSG_CREATED = "{0} snapshots created, {1} snapshots deleted"
+    MSG_PRUNED = "{0} snapshots deleted"
+    MSG_NOT_FOUND = "Parents not found: {0}"
+    MSG_FAILED = "{0} snapshot requests failed: {1}"
+    MSG_NO_RETENTION = "state absent requires retain_count or retain_days"
+    MSG_NO_PREFIX = "retain_count and retain_days require name_prefix"
+
+    def __init__(self):
+
+        additional_arg_spec = dict(system_id=dict(required=True, type='str'),
+                                   parent_type=dict(
+                                       default='volume',
+                                       choices=['volume', 'volume_set']),
+                                   parents=dict(required=True, type='list'),
+                                   name_prefix=dict(type='str'),
+                                   data=dict(type='dict'),
+                                   retain_count=dict(type='int'),
+                                   retain_days=dict(type='int'),
+                                   max_workers=dict(
+                                       type='int',
+                                       default=DEFAULT_MAX_WORKERS),
+                                   state=dict(
+                                       required=True,
+                                       choices=['present', 'absent']))
+
+        super(SnapshotModule, self).__init__(
+            additional_arg_spec=additional_arg_spec)
+
+        self.parent_type = self.module.params['parent_type']
+        if self.parent_type == 'volume':
+            self.set_resource_client(
+                volumes_api.VolumesApi(self.greenlake_client))
+        else:
+            self.set_resource_client(
+                volume_sets_api.VolumeSetsApi(self.greenlake_client))
+
+        self.max_workers = self.module.params['max_workers']
+        self.name_prefix = self.module.params.get('name_prefix') or ''
+
+    def execute_module(self):
+        params = self.module.params
+        prune = (params.get('retain_count') is not None
+                 or params.get('retain_days') is not None)
+        if self.state == 'absent' and not prune:
+            raise GreenLakeDataServiceModuleException(self.MSG_NO_RETENTION)
+        if prune and not self.name_prefix:
+            raise GreenLakeDataServiceModuleException(self.MSG_NO_PREFIX)
+
+        start = time.time()
+        parent_ids = self._resolve_parents(params['parents'])
+        facts = dict(created=[], deleted={}, failed=[])
+
+        if self.state == 'present':
+            facts['created'] = self._create_snapshots(parent_ids,
+                                                      facts['failed'])
+        created_elapsed = time.time() - start
+
+        if prune:
+            facts['deleted'] = self._prune_snapshots(parent_ids,
+                                                     facts['failed'])
+
+        elapsed = time.time() - start
+        deleted_count = sum(len(names) for names in facts['deleted'].values())
+        facts.update(
+            elapsed=round(elapsed, 3),
+            created_per_second=round(
+                len(facts['created']) / created_elapsed, 2)
+            if created_elapsed else 0,
+            deleted_per_second=round(
+                deleted_count / (elapsed - created_elapsed), 2)
+            if deleted_count and elapsed > created_elapsed else 0)
+
+        if facts['failed']:
+            raise GreenLakeDataServiceModuleException(
+                self.MSG_FAILED.format(len(facts['failed']),
+                                       "; ".join(facts['failed'])))
+
+        if self.state == 'present':
+            msg = self.MSG_CREATED.format(len(facts['created']),
+                                          deleted_count)
+        else:
+            msg = self.MSG_PRUNED.format(deleted_count)
+
+        return dict(changed=bool(facts['created'] or deleted_count), msg=msg,
+                    ansible_facts=dict(snapshots=facts))
+
+    def _resolve_parents(self, parents):
+        """
+        Returns the ids of the parents, listing the parents of the system
+        once to resolve the ones given by name.
+        """
+        system_id = self.module.params['system_id']
+        if self.parent_type == 'volume':
+            listed = self.iter_resource_items(
+                self.resource_client.volumes_list,
+                filter="systemId eq " + format_filter_value(system_id))
+            name_field = "name"
+        else:
+            listed = self.iter_resource_items(
+                self.resource_client.device_type1_volume_sets_list,
+                system_id)
+            name_field = "app_set_name"
+
+        ids, ids_by_name = set(), {}
+        for resource in listed:
+            ids.add(resource["id"])
+            ids_by_name[resource.get(name_field)] = resource["id"]
+
+        missing = [parent for parent in parents
+                   if parent not in ids and parent not in ids_by_name]
+        if missing:
+            raise GreenLakeDataServiceModuleException(
+                self.MSG_NOT_FOUND.format(", ".join(missing)))
+
+        return [parent if parent in ids else ids_by_name[parent]
+                for parent in parents]
+
+    def _snapshots_path(self, parent_id):
+        return PARENT_PATHS[self.parent_type].format(
+            system_id=self.module.params['system_id'], parent_id=parent_id)
+
+    def _create_snapshots(self, parent_ids, failed):
+        """
+        Submits a snapshot of every parent concurrently, then waits for all
+        the tasks at once.
+
+        Returns: list of the created snapshot names.
+        """
+        name = self.name_prefix + time.strftime("%Y%m%d%H%M%S")
+        body = dict(self.module.params.get('data') or {})
+        body["snapshotName"] = name
+
+        submitted = self.request_concurrently(
+            [('POST', self._snapshots_path(parent_id), json.dumps(body))
+             for parent_id in parent_ids], self.max_workers)
+
+        tasks, task_parents = [], []
+        for parent_id, (task, error) in zip(parent_ids, submitted):
+            if error:
+                failed.append("{0}: {1}".format(parent_id, error))
+            else:
+                tasks.append(task)
+                task_parents.append(parent_id)
+
+        created = []
+        for parent_id, (task, error) in zip(task_parents,
+                                            self.wait_for_tasks(tasks)):
+            if error:
+                failed.append("{0}: {1}".format(parent_id,
+                                                task.get("message", "")))
+            else:
+                created.append("{0}/{1}".format(parent_id, name))
+
+        return created
+
+    def _list_snapshots(self, parent_id):
+        system_id = self.module.params['system_id']
+        if self.parent_type == 'volume':
+            return self.list_resource_items(
+                self.resource_client.device_type1_volume_snapshots_list,
+                system_id, parent_id)
+        return self.list_resource_items(
+            self.resource_client.device_type1_volume_set_snapshots_list,
+            system_id, parent_id)
+
+    def _expired_snapshots(self, snapshots):
+        return expired_snapshots(
+            snapshots, self.name_prefix,
+            retain_count=self.module.params.get('retain_count'),
+            retain_days=self.module.params.get('retain_days'))
+
+    def _prune_snapshots(self, parent_ids, failed):
+        """
+        Lists the snapshots of every parent once, then deletes the expired
+        ones concurrently and waits for all the tasks at once.
+
+        Returns: dict of the deleted snapshot names per parent.
+        """
+        listings = self.run_concurrently(self._list_snapshots, parent_ids,
+                                         self.max_workers)
+
+        expired = []
+        for parent_id, (snapshots, error) in zip(parent_ids, listings):
+            if error:
+                failed.append("{0}: {1}".format(parent_id, error))
+                continue
+            expired.extend((parent_id, snapshot)
+                           for snapshot in self._expired_snapshots(snapshots))
+
+        submitted = self.request_concurrently(
+            [('DELETE', "{0}/{1}".format(self._snapshots_path(parent_id),
+                                         snapshot["id"]), None)
+             for parent_id, snapshot in expired], self.max_workers)
+
+        tasks, task_items = [], []
+        for item, (task, error) in zip(expired, submitted):
+            if error:
+                failed.append("{0}: {1}".format(item[1]["id"], error))
+            else:
+                tasks.append(task)
+                task_items.append(item)
+
+        deleted = {}
+        for (parent_id, snapshot), (task, error) in zip(
+                task_items, self.wait_for_tasks(tasks)):
+            if error:
+                failed.append("{0}: {1}".format(snapshot["id"],
+                                                task.get("message", "")))
+            else:
+                deleted.setdefault(parent_id, []).append(
+                    snapshot.get("name") or snapshot["id"])
+
+        return deleted
+
+
+def main():
+    SnapshotModule().run()
+
+
+if __name__ == '__main__':
+    main()
@@ -21,6 +21,25 @@ options:
         - Id of the Greenlake Data Service storage system resource.
       required: false
       type: str
+    where:
+      description:
+        - List of predicates the listed resources must match, each one a dict with the C(field) (nested fields separated by C(.)),
+          the C(op) and the C(value) to compare with.
+        - "C(op) is one of C(eq) (default), C(ne), C(gt), C(ge), C(lt), C(le), which are sent to the API in the filter query,
+          or C(in), C(not_in), C(contains), C(startswith), C(endswith), C(regex), which are checked on the decoded resources."
+        - Set C(local) to C(true) on a predicate to check it on the decoded resources when the API can not filter on its field.
+        - Set C(datetime) to C(true) on a predicate whose C(value) is an ISO 8601 date-time, which the API expects unquoted.
+          The other string values are always quoted.
+        - The predicates are combined with C(and), along with the C(filter) of C(params).
+      required: false
+      type: list
+    select:
+      description:
+        - List of the fields to keep in the facts, e.g. C(id), C(name) or C(state). Nested fields are separated by C(.).
+        - The selection is sent to the API as a C(select) query, so the unneeded fields are not even transferred.
+        - Fields named with acronyms should use the API spelling, e.g. C(systemWWN).
+      required: false
+      type: list
     params:
       description:
         - List of params to delimit, filter and sort the list of resources.
@@ -41,6 +60,17 @@ EXAMPLES = '''
     client_id: <client_id>
     client_secret: <client_secret>
 - debug: var=storage_systems
+
+- name: Get the name, state and WWN of the GreenLake storage systems
+  greenlake_storage_system_facts:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    select:
+      - name
+      - state
+      - systemWWN
+- debug: var=storage_systems
 '''
 
 RETURN = '''
@@ -56,10 +86,14 @@ from greenlake_data_services.api import storage_systems_api
 
 class GreenLakeStorageSystemFactsModule(GreenLakeDataServiceModule):
 
+    FAN_OUT_PROFILES = True
+
     def __init__(self):
         argument_spec = dict(id=dict(type='str'),
                              device_type=dict(type='int'),
-                             params=dict(type='dict'))
+                             params=dict(type='dict'),
+                             select=dict(type='list'),
+                             where=dict(type='list'))
 
         super(GreenLakeStorageSystemFactsModule, self).__init__(
             additional_arg_spec=argument_spec)
@@ -74,34 +108,36 @@ class GreenLakeStorageSystemFactsModule(GreenLakeDataServiceModule):
             device_type = self.module.params['device_type']
             if device_type == 1:
                 if self.module.params.get('id'):
-                    resp = self.resource_client.device_type1_system_get_by_id(
-                        self.module.params['id'])
                     ansible_facts["storage_systems"].append(
-                        eval(resp.to_str()))
+                        self.project_facts(self.get_raw_response(
+                            self.resource_client.device_type1_system_get_by_id,
+                            self.module.params['id'])))
                 else:
                     # Get all Primera / Alletra 9K storage systems
-                    resp = self.resource_client.device_type1_systems_list(
-                        **self.facts_params)
-                    ansible_facts["storage_systems"] = eval(str(resp["items"]))
+                    ansible_facts["storage_systems"] = self.list_facts(
+                        self.resource_client.device_type1_systems_list,
+                        select_pushdown=True, **self.facts_params)
             else:
                 if self.module.params.get('id'):
-                    resp = self.resource_client.device_type2_get_storage_system_by_id(
-                        self.module.params['id'])
-                    ansible_facts["storage_systems"].append(eval(resp.to_str()))
+                    ansible_facts["storage_systems"].append(
+                        self.project_facts(self.get_raw_response(
+                            self.resource_client.device_type2_get_storage_system_by_id,
+                            self.module.params['id'])))
                 else:
                     # Get all storage systems by Nimble / Alletra 6K
-                    resp = self.resource_client.device_type2_get_storage_system(
-                        **self.facts_params)
-                    ansible_facts["storage_systems"] = eval(str(resp["items"]))
+                    ansible_facts["storage_systems"] = self.list_facts(
+                        self.resource_client.device_type2_get_storage_system,
+                        select_pushdown=True, **self.facts_params)
         else:
             if self.module.params.get('id'):
-                resp = self.resource_client.system_get_by_id(
-                    self.module.params['id'])
-                ansible_facts["storage_systems"].append(resp.to_dict())
+                ansible_facts["storage_systems"].append(
+                    self.project_facts(self.get_raw_response(
+                        self.resource_client.system_get_by_id,
+                        self.module.params['id'])))
             else:
-                resp = self.resource_client.systems_list(
+                ansible_facts["storage_systems"] = self.list_facts(
+                    self.resource_client.systems_list, select_pushdown=True,
                     **self.facts_params)
-                ansible_facts["storage_systems"] = resp.to_dict()["items"]
 
         return dict(changed=False, ansible_facts=ansible_facts)
 
@@ -0,0 +1,127 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+DOCUMENTATION = '''
+---
+module: greenlake_sync
+short_description: Sync the Greenlake Data Service resources into a local index
+description:
+    - Pages through the storage systems, volumes, volume sets, hosts, host groups and host initiators and stores them,
+      along with their relations, in a local SQLite database.
+    - Only the resources whose content changed are written, and the resources no longer listed are removed.
+    - The index is queried without any API call by the M(greenlake_query) module.
+version_added: "2.13.8"
+requirements:
+    - python >= 3.8
+    - greenlake_data_services >= 1.0.0
+author: "Sijeesh Kattumunda (@sijeesh)"
+options:
+    db_path:
+      description:
+        - Path of the SQLite database, created if missing.
+      required: false
+      default: ~/.ansible/greenlake_fleet.db
+      type: path
+    collections:
+      description:
+        - Collections to sync. All of them when not set.
+      required: false
+      choices: ['storage_systems', 'volumes', 'volume_sets', 'hosts', 'host_groups', 'host_initiators']
+      type: list
+    max_age:
+      description:
+        - Skip the collections completely synced less than C(max_age) seconds ago. C(0) always syncs. A collection whose
+          last listing was incomplete is always synced again.
+      required: false
+      default: 0
+      type: int
+    page_size:
+      description:
+        - Number of resources requested per API call.
+      required: false
+      default: 500
+      type: int
+'''
+
+EXAMPLES = '''
+- name: Sync the GreenLake fleet index
+  greenlake_sync:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    max_age: 600
+- debug: var=fleet_sync
+'''
+
+RETURN = '''
+fleet_sync:
+    description: Number of fetched, inserted, updated, deleted and unchanged resources, whether the listing was complete (the
+                 resources missing from an incomplete listing are not deleted) and elapsed seconds, per collection.
+    returned: Always.
+    type: dict
+'''
+
+import time
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.greenlake import GreenLakeDataServiceModule
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.fleet_index import COLLECTIONS, DEFAULT_DB_PATH, FleetIndex
+
+
+class GreenLakeSyncModule(GreenLakeDataServiceModule):
+
+    MSG_SYNCED = "Fleet index synced"
+    MSG_UNCHANGED = "Fleet index is up to date"
+
+    def __init__(self):
+        argument_spec = dict(db_path=dict(type='path',
+                                          default=DEFAULT_DB_PATH),
+                             collections=dict(type='list', elements='str',
+                                              choices=list(COLLECTIONS)),
+                             max_age=dict(type='int', default=0),
+                             page_size=dict(type='int', default=500))
+
+        super(GreenLakeSyncModule, self).__init__(
+            additional_arg_spec=argument_spec)
+
+    def execute_module(self):
+        list_calls = self.get_collection_list_calls()
+        max_age = self.module.params['max_age']
+        results = {}
+
+        index = FleetIndex(self.module.params['db_path'])
+        try:
+            for kind in self.module.params.get('collections') or COLLECTIONS:
+                synced_at = index.synced_at(kind)
+                if (max_age and synced_at
+                        and time.time() - synced_at < max_age):
+                    results[kind] = dict(skipped=True)
+                    continue
+
+                start = time.time()
+                listing = {}
+                results[kind] = index.sync_collection(
+                    kind, self.iter_resource_items(
+                        list_calls[kind], listing=listing,
+                        page_size=self.module.params['page_size']),
+                    listing)
+                results[kind]['elapsed'] = round(time.time() - start, 3)
+        finally:
+            index.close()
+
+        changed = any(stats.get('inserted') or stats.get('updated')
+                      or stats.get('deleted') for stats in results.values())
+
+        return dict(changed=changed,
+                    msg=self.MSG_SYNCED if changed else self.MSG_UNCHANGED,
+                    ansible_facts=dict(fleet_sync=results))
+
+
+def main():
+    GreenLakeSyncModule().run()
+
+
+if __name__ == '__main__':
+    main()
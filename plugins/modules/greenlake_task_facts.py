@@ -0,0 +1,240 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+DOCUMENTATION = '''
+---
+module: greenlake_task_facts
+short_description: Retrieve the facts about the task history
+description:
+    - Retrieve the facts about the HPE Greenlake Data Services tasks, page by page, with the duration statistics of
+      every operation.
+version_added: "2.13.8"
+requirements:
+    - python >= 3.8
+    - greenlake_data_services >= 1.0.0
+author: "Sijeesh Kattumunda (@sijeesh)"
+options:
+    task_state:
+      description:
+        - List of the task states to keep, e.g. C(SUCCEEDED), C(FAILED) or C(RUNNING). Sent to the API in the filter query.
+      required: false
+      type: list
+    created_after:
+      description:
+        - ISO 8601 time, keep the tasks created at or after it. Sent to the API in the filter query.
+      required: false
+      type: str
+    created_before:
+      description:
+        - ISO 8601 time, keep the tasks created before it. Sent to the API in the filter query.
+      required: false
+      type: str
+    resource_type:
+      description:
+        - Keep the tasks of an associated resource type, e.g. C(storage-systems). Sent to the API in the filter query.
+      required: false
+      type: str
+    output:
+      description:
+        - Stream the tasks to a file, one JSON object per line, instead of returning them in the C(tasks) fact. The pages
+          are written as they are received, so the memory used does not grow with the number of tasks.
+        - "C(path): file path. C(append): append to the file instead of replacing it, defaults to C(false)."
+      required: false
+      type: dict
+    aggregate:
+      description:
+        - Count the tasks by state and compute the duration statistics of every operation, instead of returning the tasks
+          in the C(tasks) fact. Can be combined with C(output) to stream and aggregate in a single pass.
+        - "C(group_by): list of the fields identifying an operation, nested fields separated by C(.), defaults to C(name)."
+      required: false
+      type: dict
+    where:
+      description:
+        - List of predicates the listed resources must match, each one a dict with the C(field) (nested fields separated by C(.)),
+          the C(op) and the C(value) to compare with.
+        - "C(op) is one of C(eq) (default), C(ne), C(gt), C(ge), C(lt), C(le), which are sent to the API in the filter query,
+          or C(in), C(not_in), C(contains), C(startswith), C(endswith), C(regex), which are checked on the decoded resources."
+        - Set C(local) to C(true) on a predicate to check it on the decoded resources when the API can not filter on its field.
+        - Set C(datetime) to C(true) on a predicate whose C(value) is an ISO 8601 date-time, which the API expects unquoted.
+          The other string values are always quoted.
+        - The predicates are combined with C(and), along with the C(filter) of C(params).
+      required: false
+      type: list
+    select:
+      description:
+        - List of the fields to keep in the facts and in the C(output) file, e.g. C(id), C(name) or C(state). Nested fields
+          are separated by C(.). The statistics of C(aggregate) are computed on the complete tasks.
+      required: false
+      type: list
+    params:
+      description:
+        - List of params to filter and sort the list of tasks.
+        - "params allowed:
+           C(filter): Filter criteria - e.g. name eq 'Create volume' (optional)
+           C(limit): The number of tasks requested per API call, defaults to 500 (optional)
+           C(offset): The number of tasks to skip (optional)
+           C(sort): The sort order of the returned data set, e.g. createdAt desc (optional)"
+      required: false
+      type: dict
+'''
+
+EXAMPLES = '''
+- name: Get the failed GreenLake tasks of June
+  greenlake_task_facts:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    task_state:
+      - FAILED
+      - TIMEDOUT
+    created_after: "2023-06-01T00:00:00Z"
+    created_before: "2023-07-01T00:00:00Z"
+- debug: var=tasks
+
+- name: Stream the task history to a file and compute the duration of every operation
+  greenlake_task_facts:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    created_after: "2023-01-01T00:00:00Z"
+    output:
+      path: "~/.ansible/tmp/greenlake_tasks.jsonl"
+    aggregate:
+      group_by:
+        - name
+- debug: var=task_stats
+'''
+
+RETURN = '''
+tasks:
+    description: Has all the Greenlake Data Service facts about the tasks.
+    returned: When neither output nor aggregate is set.
+    type: list
+task_stats:
+    description: Total number of tasks, first and last creation time, counts per state, and per operation the counts per
+                 state and the min, max, mean, total, p50, p90 and p99 durations in seconds of the finished tasks.
+    returned: When aggregate is set.
+    type: dict
+task_output:
+    description: Path of the output file and number of tasks written.
+    returned: When output is set.
+    type: dict
+'''
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.greenlake import GreenLakeDataServiceModule, GreenLakeDataServiceModuleException, compile_where, format_filter_value, join_filters, matches_where
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.task_history import TaskDurationStats, TaskWriter
+from greenlake_data_services.api import tasks_api
+
+
+class GreenLakeTaskFactsModule(GreenLakeDataServiceModule):
+
+    def __init__(self):
+        argument_spec = dict(task_state=dict(type='list'),
+                             created_after=dict(type='str'),
+                             created_before=dict(type='str'),
+                             resource_type=dict(type='str'),
+                             output=dict(type='dict'),
+                             aggregate=dict(type='dict'),
+                             params=dict(type='dict'),
+                             select=dict(type='list'),
+                             where=dict(type='list'))
+
+        super(GreenLakeTaskFactsModule, self).__init__(
+            additional_arg_spec=argument_spec)
+
+        self.set_resource_client(tasks_api.TasksApi(self.greenlake_client))
+
+    def execute_module(self):
+        output = self.module.params.get('output')
+        aggregate = self.module.params.get('aggregate')
+
+        if output is None and aggregate is None:
+            tasks = [self.project_facts(task) for task in self._iter_tasks()]
+            return dict(changed=False, ansible_facts=dict(tasks=tasks))
+
+        if output is not None and not output.get('path'):
+            raise GreenLakeDataServiceModuleException(
+                "output requires a path")
+
+        stats = (TaskDurationStats(aggregate.get('group_by'))
+                 if aggregate is not None else None)
+        writer = (TaskWriter(output['path'], bool(output.get('append')))
+                  if output is not None else None)
+
+        if writer:
+            with writer:
+                for task in self._iter_tasks():
+                    if stats:
+                        stats.add(task)
+                    writer.write(self.project_facts(task))
+        else:
+            for task in self._iter_tasks():
+                stats.add(task)
+
+        ansible_facts = {}
+        if stats:
+            ansible_facts['task_stats'] = stats.to_facts()
+        if writer:
+            ansible_facts['task_output'] = dict(path=writer.path,
+                                                count=writer.count)
+
+        return dict(changed=False, ansible_facts=ansible_facts)
+
+    def _get_filter(self):
+        """
+        Compiles the task options and the 'where' option.
+
+        Returns: tuple of the server-side filter and the local predicates.
+        """
+        filters = [self.facts_params.get('filter')]
+
+        states = self.module.params.get('task_state') or []
+        if states:
+            clause = " or ".join("state eq {0}".format(
+                format_filter_value(state)) for state in states)
+            filters.append("({0})".format(clause) if len(states) > 1
+                           else clause)
+
+        if self.module.params.get('created_after'):
+            filters.append("createdAt ge {0}".format(format_filter_value(
+                self.module.params['created_after'], is_datetime=True)))
+        if self.module.params.get('created_before'):
+            filters.append("createdAt lt {0}".format(format_filter_value(
+                self.module.params['created_before'], is_datetime=True)))
+
+        if self.module.params.get('resource_type'):
+            filters.append(
+                "associatedResources/any(r: r/type eq {0})".format(
+                    format_filter_value(self.module.params['resource_type'])))
+
+        server_filter, local_predicates = compile_where(self.where)
+        return join_filters(*(filters + [server_filter])), local_predicates
+
+    def _iter_tasks(self):
+        """
+        Streams the complete tasks page by page, the 'select' option being
+        applied by the caller so the statistics see every field.
+        """
+        params = dict((key, value) for key, value in self.facts_params.items()
+                      if key in ('offset', 'sort'))
+        page_size = int(self.facts_params.get('limit') or 500)
+
+        task_filter, local_predicates = self._get_filter()
+        if task_filter:
+            params['filter'] = task_filter
+
+        for task in self.iter_resource_items(self.resource_client.list_tasks,
+                                             page_size=page_size, **params):
+            if matches_where(task, local_predicates):
+                yield task
+
+
+def main():
+    GreenLakeTaskFactsModule().run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+DOCUMENTATION = '''
+---
+module: greenlake_topology_facts
+short_description: Retrieve the export topology of the Greenlake Data Service resources
+description:
+    - Lists in bulk the volumes, volume sets, host groups and hosts, and joins them into the export topology.
+    - Optionally returns the blast radius of the removal of a resource, i.e. the volumes, volume sets, host groups and
+      hosts it affects.
+version_added: "2.13.8"
+requirements:
+    - python >= 3.8
+    - greenlake_data_services >= 1.0.0
+author: "Sijeesh Kattumunda (@sijeesh)"
+options:
+    kind:
+      description:
+        - Collection of the resource to compute the blast radius of.
+      required: false
+      choices: ['volumes', 'volume_sets', 'host_groups', 'hosts']
+      type: str
+    id:
+      description:
+        - Id of the resource to compute the blast radius of. Requires C(kind).
+      required: false
+      type: str
+'''
+
+EXAMPLES = '''
+- name: Gather facts about the export topology
+  greenlake_topology_facts:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+- debug: var=export_topology
+
+- name: Gather facts about the blast radius of a host group
+  greenlake_topology_facts:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    kind: host_groups
+    id: "<host_group_id>"
+- debug: var=blast_radius
+'''
+
+RETURN = '''
+export_topology:
+    description: Sorted id lists of the volume to host groups, host group to volumes, host group to hosts, host to
+                 initiators and volume set to member volumes mappings.
+    returned: Always.
+    type: dict
+blast_radius:
+    description: Volumes, volume sets, host groups and hosts affected by the removal of the resource, and their count.
+    returned: When kind and id are set.
+    type: dict
+'''
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.greenlake import GreenLakeDataServiceModule
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.topology import TOPOLOGY_COLLECTIONS
+
+
+class GreenLakeTopologyFactsModule(GreenLakeDataServiceModule):
+
+    FAN_OUT_PROFILES = True
+
+    def __init__(self):
+        argument_spec = dict(kind=dict(type='str',
+                                       choices=list(TOPOLOGY_COLLECTIONS)),
+                             id=dict(type='str'))
+
+        super(GreenLakeTopologyFactsModule, self).__init__(
+            additional_arg_spec=argument_spec)
+
+    def execute_module(self):
+        topology = self.get_export_topology()
+        ansible_facts = dict(export_topology=topology.to_facts())
+
+        kind = self.module.params.get('kind')
+        resource_id = self.module.params.get('id')
+        if kind and resource_id:
+            ansible_facts['blast_radius'] = topology.blast_radius(
+                kind, resource_id)
+
+        return dict(changed=False, ansible_facts=ansible_facts)
+
+
+def main():
+    GreenLakeTopologyFactsModule().run()
+
+
+if __name__ == '__main__':
+    main()
@@ -29,6 +29,21 @@ options:
             - List with the Greenlake Data Service volume resource properties.
         required: true
         type: dict
+    cascade:
+        description:
+            - On C(absent), also delete the volume snapshots and unexport the volume from its host groups.
+              The removal is first cascaded by the API. When the API does not support it, the snapshot removals and the
+              unexport are submitted together and waited for at once before the volume removal.
+        required: false
+        default: true
+        type: bool
+    max_blast_radius:
+        description:
+            - On C(absent), maximum number of other volumes, volume sets, host groups and hosts the removal may affect.
+              The export topology is listed in bulk before the removal, and the task fails without removing anything
+              when the blast radius is larger. The blast radius is returned in the C(blast_radius) fact.
+        required: false
+        type: int
 '''
 
 EXAMPLES = '''
@@ -82,12 +97,16 @@ volumes:
     type: dict
 '''
 
-from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.greenlake import GreenLakeDataServiceModule, compare
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.greenlake import GreenLakeDataServiceModule, GreenLakeDataServiceModuleException, compare
 
 from greenlake_data_services.api import volumes_api
+from greenlake_data_services.exceptions import ApiException
 from greenlake_data_services.model.volume_put import VolumePut
 from greenlake_data_services.model.un_export_vlun import UnExportVlun
 
+# Statuses of a volume removal rejecting the cascade options
+CASCADE_UNSUPPORTED_STATUSES = (400, 422, 501)
+
 
 class VolumeModule(GreenLakeDataServiceModule):
 
@@ -95,6 +114,11 @@ class VolumeModule(GreenLakeDataServiceModule):
     MSG_DELETED = "Volume resource deleted successfully"
     MSG_UPDATED = "Volume resource updated"
     MSG_ALREADY_PRESENT = 'Volume resource exists with the same details'
+    MSG_DELETE_FAILED = "Volume resource deletion failed"
+    MSG_CASCADE_FAILED = ("Volume snapshots deletion or unexport failed, "
+                          "volume not deleted: {0}")
+
+    RESOURCE_TYPES = ('volume', 'volumes')
 
     UPDATE_FIELDS = ["conversion_type",
                      "name",
@@ -117,6 +141,8 @@ class VolumeModule(GreenLakeDataServiceModule):
 
         additional_arg_spec = dict(data=dict(required=True, type='dict'),
                                    system_id=dict(type='str'),
+                                   max_blast_radius=dict(type='int'),
+                                   cascade=dict(type='bool', default=True),
                                    state=dict(
                                        required=True,
                                        choices=['present', 'absent']))
@@ -146,7 +172,7 @@ class VolumeModule(GreenLakeDataServiceModule):
 
     def _present(self):
         ansible_facts, msg, changed = {"volumes": []}, "", False
-        result = {}
+        result, updates = {}, None
 
         if self.resource_data:
             self.process_input_data(self.UPDATE_FIELDS)
@@ -187,6 +213,9 @@ class VolumeModule(GreenLakeDataServiceModule):
                     volume_put)
 
                 result = self.get_task(api_response.to_dict())
+                updates = data_copy
+                if self.new_name:
+                    updates[self.resource_name_field] = self.new_name
                 changed = True
                 msg = self.MSG_UPDATED
         else:
@@ -197,7 +226,7 @@ class VolumeModule(GreenLakeDataServiceModule):
             msg = self.MSG_CREATED
 
         if result and not result.get("error"):
-            self.set_resource_data()
+            self.refresh_resource_data(result, updates)
             changed = True
 
         ansible_facts["volumes"].append(self.resource_data)
@@ -214,18 +243,28 @@ class VolumeModule(GreenLakeDataServiceModule):
                 "{volume_id}/snapshots/{snapshot}").format(
                     system_id=system_id,
                     volume_id=volume_id,
-                    snapshot=snapshot_id))
+                    snapshot=snapshot_id),
+            wait=False)
 
     def _delete_volume_snapshots_all(self, system_id, id):
-        api_response = self.resource_client.device_type1_volume_snapshots_list(
+        """
+        Submits the removal of all the volume snapshots.
+
+        Returns: list of the submitted tasks.
+        """
+        snapshots = self.list_resource_items(
+            self.resource_client.device_type1_volume_snapshots_list,
             system_id, id)
-        response = api_response.to_dict()
-        if response.get("items"):
-            for snapshot in response.get("items"):
-                self._delete_volume_snapshot(system_id, id, snapshot["id"])
+        return [self._delete_volume_snapshot(system_id, id, snapshot["id"])
+                for snapshot in snapshots]
 
     # (Device type1) Get host initiator groups
     def _device_type1_get_host_initiators(self):
+        if self.export_topology:
+            # Already listed in bulk for the blast radius check
+            return sorted(self.export_topology.volume_host_groups[
+                self.resource_data["id"]])
+
         host_initiator_groups = self.resource_data['initiators']
         host_group_ids = []
         for host_inititaor_group in host_initiator_groups:
@@ -233,34 +272,76 @@ class VolumeModule(GreenLakeDataServiceModule):
         return host_group_ids
 
     def _volume_unexport(self, system_id, volume_id):
+        """
+        Submits the unexport of the volume from all its host groups.
+
+        Returns: list of the submitted tasks.
+        """
         host_group_ids = self._device_type1_get_host_initiators()
+        if not host_group_ids:
+            return []
+
         un_export_vlun = UnExportVlun(host_group_ids=host_group_ids,)
-        if un_export_vlun.get('host_group_ids') and len(un_export_vlun.get(
-           'host_group_ids')) > 0:
-            response = self.resource_client.device_type1_vlun_unexport(
-                system_id, volume_id, un_export_vlun)
-            return self.get_task(response.to_dict())
+        response = self.resource_client.device_type1_vlun_unexport(
+            system_id, volume_id, un_export_vlun)
+        return [response.to_dict()]
+
+    def _volume_delete(self, system_id, volume_id, **kwargs):
+        response = self.resource_client.volume_delete(
+            system_id, volume_id, **kwargs)
+        return self.get_task(response.to_dict())
+
+    def _cascade_delete(self, system_id, volume_id):
+        """
+        Deletes the volume along with its snapshots and exports.
+
+        The API is first asked to cascade the removal. When it rejects the
+        cascade options, the snapshot removals and the unexport are all
+        submitted at once and waited for together, before the volume
+        removal, so the sequence costs two task waits. A cascaded removal
+        that fails is returned as is, since its failure may leave the volume
+        in use.
+        """
+        try:
+            return self._volume_delete(system_id, volume_id,
+                                       cascade=True, un_export=True)
+        except ApiException as exception:
+            if exception.status not in CASCADE_UNSUPPORTED_STATUSES:
+                raise
+
+        tasks = (self._delete_volume_snapshots_all(system_id, volume_id)
+                 + self._volume_unexport(system_id, volume_id))
+        for task, error in self.wait_for_tasks(tasks):
+            if error:
+                raise GreenLakeDataServiceModuleException(
+                    self.MSG_CASCADE_FAILED.format(task.get("message", "")))
+
+        return self._volume_delete(system_id, volume_id)
 
     def _absent(self):
-        changed = False
+        changed, ansible_facts = False, {}
         msg = self.MSG_DELETED
-        un_export = True # bool | UnExport Host,HostSet and delete volume (optional)
-        cascade = True # bool | Delete snapshot and volume (optional)
 
         if self.data.get("id") or self.data.get("name"):
             resource_id = self.resource_data["id"]
-            api_response = self.resource_client.volume_get_by_id(resource_id)
-            self.resource_data = api_response.to_dict()
-            system_id = api_response.to_dict()["system_id"]
-            self._delete_volume_snapshots_all(system_id, resource_id)
-            self._volume_unexport(system_id, resource_id)
+            blast_radius = self.check_blast_radius("volumes", resource_id)
+            if blast_radius:
+                ansible_facts["blast_radius"] = blast_radius
+
+            system_id = self.resource_data["system_id"]
+
+            if self.module.params['cascade']:
+                result = self._cascade_delete(system_id, resource_id)
+            else:
+                result = self._volume_delete(system_id, resource_id)
 
-            api_response = self.resource_client.volume_delete(
-                system_id, resource_id)
+            if result.get("error"):
+                raise GreenLakeDataServiceModuleException(
+                    result.get("message") or self.MSG_DELETE_FAILED)
 
             changed = True
 
-        return changed, msg, {}
+        return changed, msg, ansible_facts
 
 
 def main():
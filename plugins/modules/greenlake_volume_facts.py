@@ -34,6 +34,24 @@ options:
         - "To gather facts about getSnapshots
            a Volume name/id is required. Otherwise, these options will be ignored."
       type: list
+    where:
+      description:
+        - List of predicates the listed resources must match, each one a dict with the C(field) (nested fields separated by C(.)),
+          the C(op) and the C(value) to compare with.
+        - "C(op) is one of C(eq) (default), C(ne), C(gt), C(ge), C(lt), C(le), which are sent to the API in the filter query,
+          or C(in), C(not_in), C(contains), C(startswith), C(endswith), C(regex), which are checked on the decoded resources."
+        - Set C(local) to C(true) on a predicate to check it on the decoded resources when the API can not filter on its field.
+        - Set C(datetime) to C(true) on a predicate whose C(value) is an ISO 8601 date-time, which the API expects unquoted.
+          The other string values are always quoted.
+        - The predicates are combined with C(and), along with the C(filter) of C(params).
+      required: false
+      type: list
+    select:
+      description:
+        - List of the fields to keep in the facts, e.g. C(id), C(name) or C(size_mi_b). Nested fields are separated by C(.).
+        - The selection is sent to the API as a C(select) query, so the unneeded fields are not even transferred.
+      required: false
+      type: list
     params:
       description:
         - List of params to delimit, filter and sort the list of resources.
@@ -53,6 +71,26 @@ EXAMPLES = '''
     client_id: <client_id>
     client_secret: <client_secret>
 - debug: var=volumes
+
+- name: Get the id, name and size of the large production volumes of a system
+  greenlake_volume_facts:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    select:
+      - id
+      - name
+      - size_mi_b
+    where:
+      - field: system_id
+        value: "2M29510B8L"
+      - field: size_mi_b
+        op: ge
+        value: 1048576
+      - field: name
+        op: startswith
+        value: "prod-"
+- debug: var=volumes
 '''
 
 RETURN = '''
@@ -68,11 +106,15 @@ from greenlake_data_services.api import volumes_api
 
 class GreenLakeVolumeFactsModule(GreenLakeDataServiceModule):
 
+    FAN_OUT_PROFILES = True
+
     def __init__(self):
         argument_spec = dict(id=dict(type='str'),
                              name=dict(type='str'),
                              options=dict(type='list'),
-                             params=dict(type='dict'))
+                             params=dict(type='dict'),
+                             select=dict(type='list'),
+                             where=dict(type='list'))
 
         super(GreenLakeVolumeFactsModule, self).__init__(
             additional_arg_spec=argument_spec)
@@ -90,30 +132,27 @@ class GreenLakeVolumeFactsModule(GreenLakeDataServiceModule):
         ansible_facts = {'volumes': []}
 
         if self.module.params.get('id') or self.module.params.get('name'):
-            ansible_facts["volumes"].append(self.resource_data)
+            ansible_facts["volumes"].append(
+                self.project_facts(self.resource_data))
             if self.options:
                 more_facts = self.__gather_optional_facts(ansible_facts)
                 ansible_facts.update(more_facts)
         else:
-            api_response = self.resource_client.volumes_list(
+            ansible_facts["volumes"] = self.list_facts(
+                self.resource_client.volumes_list, select_pushdown=True,
                 **self.facts_params)
 
-            ansible_facts["volumes"] = api_response.to_dict()["items"]
-
         return dict(changed=False, ansible_facts=ansible_facts)
 
     def __gather_optional_facts(self, ansible_facts):
         more_facts = {"snapshots": []}
 
         if self.options.get('getSnapshots'):
-            response = self.resource_client.device_type1_volume_snapshots_list(
-                ansible_facts["volumes"][0]["system_id"],
+            more_facts["snapshots"] = self.list_resource_items(
+                self.resource_client.device_type1_volume_snapshots_list,
+                self.resource_data["system_id"],
                 self.module.params['id'])
 
-            resource = response.to_dict()
-            if resource.get("items"):
-                more_facts["snapshots"] = resource["items"]
-
         return more_facts
 
 
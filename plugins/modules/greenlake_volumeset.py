@@ -21,14 +21,40 @@ options:
             - Indicates the desired state for the Greenlake Data Service volumeset resources.
               C(present) will ensure data properties are compliant with Greenlake Data Service.
               C(absent) will remove the resource from Greenlake Data Service, if it exists.
-        choices: ['present', 'absent']
+              C(export) and C(unexport) will export or unexport the resource to or from the C(host_group_ids) host groups.
+        choices: ['present', 'absent', 'export', 'unexport']
         required: true
         type: str
     data:
         description:
             - List with the Greenlake Data Service volumeset resource properties.
+            - "On C(export) and C(unexport), C(volume_sets) can list several volume sets, each one a dict with its C(id) or
+              C(name) and its C(host_group_ids), which are all processed in one run. The volume sets whose member volumes
+              are already exported to, or unexported from, all their host groups are skipped. When some of them fail,
+              the facts of the other ones are still returned, along with the failures in C(volume_set_failures)."
+            - "On C(present), C(volume_sets) can list several existing volume sets, each one a dict with its C(id) or C(name),
+              the other fields to update, including C(new_name) to rename it, and either the exact C(members) or the
+              C(add_members) and C(remove_members).
+              Members are given by volume name or id, or as dicts with the C(id) or C(name) of the volume. They are
+              resolved to volume ids, the membership changes are submitted by id, and the volume sets are all
+              reconciled in one run."
+            - C(volume_sets) requires C(system_id).
         required: true
         type: dict
+    max_workers:
+        description:
+            - Maximum number of volume sets exported, unexported or updated concurrently when C(volume_sets) lists several
+              of them. Ignored when the C(adaptive_concurrency) setting is enabled.
+        required: false
+        default: 8
+        type: int
+    max_blast_radius:
+        description:
+            - On C(absent), maximum number of other volumes, volume sets, host groups and hosts the removal may affect.
+              The export topology is listed in bulk before the removal, and the task fails without removing anything
+              when the blast radius is larger. The blast radius is returned in the C(blast_radius) fact.
+        required: false
+        type: int
 '''
 
 EXAMPLES = '''
@@ -95,6 +121,49 @@ EXAMPLES = '''
 
 - debug: var=volume_sets
 
+- name: Export several GreenLake DSCC Volume Sets at once
+  greenlake_volumeset:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    device_type: 1
+    system_id: <system_id>"
+    state: export
+    max_workers: 16
+    data:
+      volume_sets:
+        - name: "ansble-test-volumeset"
+          host_group_ids:
+            - "7711267b21c145b9b65f84dbd0122acd"
+        - id: "<volume_set_id>"
+          host_group_ids:
+            - "7711267b21c145b9b65f84dbd0122acd"
+            - "<host_group_id>"
+
+- debug: var=volume_sets
+
+- name: Reconcile the members of several GreenLake DSCC Volume Sets
+  greenlake_volumeset:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    device_type: 1
+    system_id: <system_id>"
+    state: present
+    data:
+      volume_sets:
+        - name: "ansble-test-volumeset"
+          members:
+            - "AnsibleTestVolume.0"
+            - "AnsibleTestVolume.1"
+        - name: "ansble-test-volumeset-2"
+          add_members:
+            - "AnsibleTestVolume.2"
+          remove_members:
+            - "AnsibleTestVolume.3"
+
+- debug: var=volume_sets
+
 - name: Delete GreenLake DSCC Volume Set
   greenlake_volumeset:
     host: <host>
@@ -114,9 +183,14 @@ volume_sets:
     description: Has the facts about Greenlake Data Service volumesets resources
     returned: On state 'present'. Can be null.
     type: dict
+volume_set_failures:
+    description: Id, name and error message of the volume sets whose export or unexport failed, the facts of the other
+                 volume sets being returned in volume_sets.
+    returned: On state 'export' and 'unexport' with volume_sets, when some of them failed.
+    type: list
 '''
 
-from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.greenlake import GreenLakeDataServiceModule, compare
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.greenlake import DEFAULT_MAX_WORKERS, GreenLakeDataServiceModule, GreenLakeDataServiceModuleException, compare, format_filter_value
 from greenlake_data_services.api import volume_sets_api
 from greenlake_data_services.model.create_app_set_input import CreateAppSetInput
 from greenlake_data_services.model.volume_set_put import VolumeSetPut
@@ -128,7 +202,23 @@ class VolumeSetModule(GreenLakeDataServiceModule):
 
     MSG_DELETED = "Volume Set deleted successfully"
     MSG_UPDATED = "Volume Set resource updated"
+    MSG_UPDATED_MANY = "{0} of {1} Volume Sets updated"
+    MSG_MEMBERS_NOT_FOUND = "Volumes not found: {0}"
     MSG_ALREADY_PRESENT = 'Volume Set resource exists with the same details'
+    MSG_EXPORTED = "Volume Sets exported"
+    MSG_UNEXPORTED = "Volume Sets unexported"
+    MSG_ALREADY_EXPORTED = "Volume Sets already exported to the host groups"
+    MSG_ALREADY_UNEXPORTED = ("Volume Sets already unexported from the host "
+                              "groups")
+    MSG_EXPORT_FAILED = "{0} of Volume Set {1} failed: {2}"
+    MSG_TASK_FAILED = "task ended in state {0}"
+    MSG_NOT_FOUND = "Volume Sets not found: {0}"
+    MSG_FAILED = "{0} of {1} Volume Sets failed: {2}"
+    MSG_MISSING_ID_OR_NAME = "Volume Sets need an id or a name: entry {0}"
+    MSG_SYSTEM_ID_REQUIRED = "volume_sets requires system_id"
+
+    RESOURCE_TYPES = ('volume-set', 'volume-sets', 'applicationset',
+                      'applicationsets')
 
     FEILDS_TO_REPLACE_FOR_UPDATE = ["app_set_type"]
 
@@ -136,9 +226,14 @@ class VolumeSetModule(GreenLakeDataServiceModule):
 
         additional_arg_spec = dict(data=dict(required=True, type='dict'),
                                    system_id=dict(type='str'),
+                                   max_blast_radius=dict(type='int'),
+                                   max_workers=dict(
+                                       type='int',
+                                       default=DEFAULT_MAX_WORKERS),
                                    state=dict(
                                        required=True,
-                                       choices=['present', 'absent', 'export'],
+                                       choices=['present', 'absent', 'export',
+                                                'unexport'],
                                        ),
                                    device_type=dict(
                                        required=True,
@@ -165,10 +260,18 @@ class VolumeSetModule(GreenLakeDataServiceModule):
     def execute_module(self):
         changed, msg, ansible_facts = False, '', {}
 
-        if self.state == 'present':
+        if self.data.get("volume_sets") and not self.system_id:
+            raise GreenLakeDataServiceModuleException(
+                self.MSG_SYSTEM_ID_REQUIRED)
+
+        if self.state == 'present' and self.data.get("volume_sets"):
+            changed, msg, ansible_facts = self._present_many()
+        elif self.state == 'present':
             changed, msg, ansible_facts = self._present()
         elif self.state == 'absent':
             changed, msg, ansible_facts = self._absent()
+        elif self.data.get("volume_sets"):
+            return self._export_many(self.state)
         elif self.state == 'export':
             changed, msg, ansible_facts = self._export()
         elif self.state == 'unexport':
@@ -187,7 +290,7 @@ class VolumeSetModule(GreenLakeDataServiceModule):
 
     def _present(self):
         ansible_facts, msg, changed = {"volume_sets": []}, "", False
-        result = {}
+        result, updates = {}, None
 
         if self.resource_data:
             # Remove this from data for comparison as the field names
@@ -237,6 +340,12 @@ class VolumeSetModule(GreenLakeDataServiceModule):
 
                 result = self._update_resource(
                     self.system_id, self.resource_data['id'], volume_set_put)
+
+                updates = dict(self.data)
+                updates["members"] = [
+                    member for member in self.resource_data["members"]
+                    if member not in members_to_be_removed
+                ] + members_to_be_added
                 changed = True
                 msg = self.MSG_UPDATED
         else:
@@ -248,7 +357,7 @@ class VolumeSetModule(GreenLakeDataServiceModule):
             result = self.get_task(api_response.to_dict())
 
         if result and not result.get("error"):
-            self.set_resource_data()
+            self.refresh_resource_data(result, updates)
             changed = True
 
         # Set facts
@@ -256,13 +365,164 @@ class VolumeSetModule(GreenLakeDataServiceModule):
 
         return changed, msg, ansible_facts
 
+    def _get_volume_names(self):
+        """
+        Returns the names of the system volumes by id, from one listing.
+        """
+        volumes = self.iter_resource_items(
+            self.get_collection_list_calls()["volumes"],
+            filter="systemId eq " + format_filter_value(self.system_id))
+        return dict((volume["id"], volume.get("name")) for volume in volumes)
+
+    def _present_many(self):
+        """
+        Reconciles the fields and the members of several volume sets.
+
+        The volume sets are listed once, the members are resolved to volume
+        ids with one listing of the system volumes, and the membership
+        changes are computed with set differences of the ids and submitted by
+        id. Only the volume sets that differ are updated, concurrently.
+        """
+        volume_sets = self.data["volume_sets"]
+        listed = self._list_volume_sets()
+        resource_ids = self._resolve_volume_sets(volume_sets, listed)
+        wanted_ids = set(resource_ids)
+        resources = dict((resource["id"], resource) for resource in listed
+                         if resource["id"] in wanted_ids)
+
+        missing = sorted(wanted_ids - set(resources))
+        if missing:
+            raise GreenLakeDataServiceModuleException(
+                self.MSG_NOT_FOUND.format(", ".join(missing)))
+
+        requested = []
+        for volume_set in volume_sets:
+            for field in ("members", "add_members", "remove_members"):
+                requested.extend(volume_set.get(field) or [])
+
+        volume_names = self._get_volume_names() if requested else {}
+        volume_ids = dict((name, volume_id)
+                          for volume_id, name in volume_names.items())
+
+        def member_id(member):
+            if isinstance(member, dict):
+                return (member.get("id")
+                        or volume_ids.get(member.get("name")))
+            if member in volume_names:
+                return member
+            return volume_ids.get(member)
+
+        unknown = sorted(str(member) for member in requested
+                         if member_id(member) is None)
+        if unknown:
+            raise GreenLakeDataServiceModuleException(
+                self.MSG_MEMBERS_NOT_FOUND.format(", ".join(unknown)))
+
+        def new_member(volume_id, members):
+            # Same shape as the members the resource already has
+            sample = members[0] if members else None
+            if isinstance(sample, dict):
+                return dict(id=volume_id, name=volume_names.get(volume_id))
+            if sample is not None and sample not in volume_names:
+                return volume_names.get(volume_id)
+            return volume_id
+
+        updates = []
+        for resource_id, volume_set in zip(resource_ids, volume_sets):
+            resource = resources[resource_id].copy()
+            fields = dict(volume_set)
+            for field in ("id", "name", self.resource_name_field):
+                fields.pop(field, None)
+            new_name = fields.pop("new_name", None)
+            if (new_name
+                    and new_name != resource.get(self.resource_name_field)):
+                fields[self.resource_name_field] = new_name
+
+            # To handle mismatch of fields value(case) in request and response
+            for field in self.FEILDS_TO_REPLACE_FOR_UPDATE:
+                if fields.get(field):
+                    resource[field] = fields[field]
+            members = fields.pop("members", None)
+            add_members = fields.pop("add_members", None) or []
+            remove_members = fields.pop("remove_members", None) or []
+
+            resource_members = resource.get("members") or []
+            current = set(member_id(member)
+                          for member in resource_members) - set([None])
+            if members is not None:
+                wanted = set(member_id(member) for member in members)
+            elif add_members or remove_members:
+                wanted = ((current | set(member_id(member)
+                                         for member in add_members))
+                          - set(member_id(member)
+                                for member in remove_members))
+            else:
+                wanted = current
+
+            to_add = sorted(wanted - current)
+            to_remove = sorted(current - wanted)
+
+            merged_data = resource.copy()
+            merged_data.update(fields)
+
+            if (compare(resource, merged_data)
+                    and not to_add and not to_remove):
+                continue
+
+            if to_add:
+                fields["add_members"] = to_add
+            if to_remove:
+                fields["remove_members"] = to_remove
+            if to_add or to_remove:
+                merged_data["members"] = [
+                    member for member in resource_members
+                    if member_id(member) not in to_remove] + [
+                    new_member(volume_id, resource_members)
+                    for volume_id in to_add]
+            updates.append((resource_id, fields, merged_data))
+
+        def update(change):
+            resource_id, fields, merged_data = change
+            result = self._update_resource(self.system_id, resource_id,
+                                           VolumeSetPut(**fields))
+            if result.get("error"):
+                raise GreenLakeDataServiceModuleException(
+                    result.get("message") or self.MSG_UPDATED)
+            return merged_data
+
+        results = self.run_concurrently(
+            update, updates, self.module.params['max_workers'])
+
+        updated = dict((change[0], resource) for change, (resource, error)
+                       in zip(updates, results) if not error)
+        errors = ["{0}: {1}".format(change[0], error)
+                  for change, (_, error) in zip(updates, results) if error]
+        if errors:
+            raise GreenLakeDataServiceModuleException(
+                self.MSG_FAILED.format(len(errors), len(volume_sets),
+                                       "; ".join(errors)))
+
+        ansible_facts = {"volume_sets": [
+            updated.get(resource_id, resources[resource_id])
+            for resource_id in resource_ids]}
+
+        if not updated:
+            return False, self.MSG_ALREADY_PRESENT, ansible_facts
+
+        return True, self.MSG_UPDATED_MANY.format(
+            len(updated), len(volume_sets)), ansible_facts
+
     def _absent(self):
-        changed = False
+        changed, ansible_facts = False, {}
         msg = self.MSG_DELETED
 
         if self.data.get("id") or self.data.get(self.resource_name_field):
             system_id = self.resource_data["system_id"]
             id = self.resource_data["id"]
+            blast_radius = self.check_blast_radius("volume_sets", id)
+            if blast_radius:
+                ansible_facts["blast_radius"] = blast_radius
+
             self._delete_volumeset_snapshots_all(system_id, id)
 
             api_response = self.resource_client.device_type1_volume_sets_delete_by_id(
@@ -272,7 +532,7 @@ class VolumeSetModule(GreenLakeDataServiceModule):
         else:
             msg = "Resource already deleted"
 
-        return changed, msg, {}
+        return changed, msg, ansible_facts
 
     def _export(self):
         ansible_facts, msg, changed = {"volume_sets": []}, "", False
@@ -290,7 +550,8 @@ class VolumeSetModule(GreenLakeDataServiceModule):
             result = self.get_task(api_response.to_dict())
 
             if result and not result.get("error"):
-                self.set_resource_data()
+                # The exports are not part of the write, read them back
+                self.refresh_resource_data(result)
                 changed = True
 
             ansible_facts["volume_sets"].append(self.resource_data)
@@ -299,7 +560,7 @@ class VolumeSetModule(GreenLakeDataServiceModule):
 
     def _unexport(self):
         ansible_facts, msg, changed = {"volume_sets": []}, "", False
-        if self.data.get("id") or self.data.get("name"):
+        if self.data.get("id") or self.data.get(self.resource_name_field):
             un_export_app_set_post = UnExportAppSetPost(
                 host_group_ids=self.data.get("host_group_ids", []))
 
@@ -313,30 +574,163 @@ class VolumeSetModule(GreenLakeDataServiceModule):
             result = self.get_task(response.to_dict())
 
             if result and not result.get("error"):
-                self.set_resource_data()
+                # The exports are not part of the write, read them back
+                self.refresh_resource_data(result)
                 changed = True
 
         ansible_facts["volume_sets"].append(self.resource_data)
 
         return changed, msg, ansible_facts
 
+    def _list_volume_sets(self):
+        return list(self.iter_resource_items(
+            self.resource_client.device_type1_volume_sets_list,
+            self.system_id))
+
+    def _resolve_volume_sets(self, volume_sets, listed=None):
+        """
+        Returns the ids of the given volume sets, listing the volume sets of
+        the system once when some of them are given by name.
+
+        :arg list listed: Volume sets of the system, when already listed.
+        """
+        for index, volume_set in enumerate(volume_sets):
+            if not volume_set.get("id") and not volume_set.get("name"):
+                raise GreenLakeDataServiceModuleException(
+                    self.MSG_MISSING_ID_OR_NAME.format(index))
+
+        names = set(volume_set["name"] for volume_set in volume_sets
+                    if not volume_set.get("id") and volume_set.get("name"))
+        ids_by_name = {}
+        if names:
+            if listed is None:
+                listed = self._list_volume_sets()
+            for resource in listed:
+                if resource.get(self.resource_name_field) in names:
+                    ids_by_name[resource[self.resource_name_field]] = \
+                        resource["id"]
+
+        missing = sorted(names - set(ids_by_name))
+        if missing:
+            raise GreenLakeDataServiceModuleException(
+                self.MSG_NOT_FOUND.format(", ".join(missing)))
+
+        return [volume_set.get("id") or ids_by_name[volume_set["name"]]
+                for volume_set in volume_sets]
+
+    def _export_many(self, state):
+        """
+        Exports or unexports several volume sets, each one to or from its own
+        host groups.
+
+        The volumes and volume sets are listed once, and the volume sets
+        whose member volumes are already exported to, or unexported from,
+        all their host groups are skipped. The other calls and their tasks
+        run concurrently, and only the volume sets that changed are read
+        back. The facts of the volume sets that succeeded are returned along
+        with the failures.
+        """
+        volume_sets = self.data["volume_sets"]
+        topology = self.get_export_topology(('volumes', 'volume_sets'))
+        listed = [resource for resource
+                  in topology.resources['volume_sets'].values()
+                  if resource.get("system_id") == self.system_id]
+        resource_ids = self._resolve_volume_sets(volume_sets, listed)
+
+        def is_applied(resource_id, host_group_ids):
+            members = topology.volume_set_members.get(resource_id)
+            if not members or not host_group_ids:
+                return False
+            host_group_ids = set(host_group_ids)
+            for volume_id in members:
+                exported = topology.volume_host_groups.get(volume_id, set())
+                if state == 'export' and not host_group_ids <= exported:
+                    return False
+                if state == 'unexport' and host_group_ids & exported:
+                    return False
+            return True
+
+        def export(pair):
+            resource_id, host_group_ids = pair
+            if state == 'export':
+                response = self.resource_client.device_type1_volume_set_export(
+                    self.system_id, resource_id,
+                    ExportAppSetPost(host_group_ids=host_group_ids))
+            else:
+                response = self.resource_client.device_type1_volume_set_unexport(
+                    self.system_id, resource_id,
+                    UnExportAppSetPost(host_group_ids=host_group_ids))
+
+            result = self.get_task(response.to_dict())
+            if result.get("error"):
+                task = result.get("response") or {}
+                raise GreenLakeDataServiceModuleException(
+                    result.get("message") or self.MSG_TASK_FAILED.format(
+                        task.get("state") or task.get("status")))
+
+            return self.get_resource_by_id_or_name(id=resource_id)
+
+        pairs = [(resource_id, volume_set.get("host_group_ids", []))
+                 for resource_id, volume_set in zip(resource_ids, volume_sets)]
+        submitted = [pair for pair in pairs if not is_applied(*pair)]
+        results = dict(zip(
+            [resource_id for resource_id, _ in submitted],
+            self.run_concurrently(export, submitted,
+                                  self.module.params['max_workers'])))
+
+        resources, failures = [], []
+        for resource_id, volume_set in zip(resource_ids, volume_sets):
+            if resource_id not in results:
+                resources.append(topology.resources['volume_sets'][
+                    resource_id])
+                continue
+            resource, error = results[resource_id]
+            if error:
+                name = (volume_set.get("name") or topology.resources[
+                    'volume_sets'][resource_id].get(self.resource_name_field))
+                failures.append(dict(
+                    id=resource_id, name=name,
+                    msg=self.MSG_EXPORT_FAILED.format(state, name, error)))
+            else:
+                resources.append(resource)
+
+        changed = any(not results[resource_id][1] for resource_id in results)
+        ansible_facts = {"volume_sets": resources}
+        if failures:
+            ansible_facts["volume_set_failures"] = failures
+            return dict(failed=True, changed=changed,
+                        msg=self.MSG_FAILED.format(
+                            len(failures), len(volume_sets),
+                            "; ".join(failure["msg"]
+                                      for failure in failures)),
+                        ansible_facts=ansible_facts)
+
+        if state == 'export':
+            msg = self.MSG_EXPORTED if changed else self.MSG_ALREADY_EXPORTED
+        else:
+            msg = (self.MSG_UNEXPORTED if changed
+                   else self.MSG_ALREADY_UNEXPORTED)
+        return dict(changed=changed, msg=msg, ansible_facts=ansible_facts)
+
     def _delete_volumeset_snapshot(self,
                                    system_id, volume_set_id, snapshot_id):
         return self.delete_resource(
             "/api/v1/storage-systems/device-type1/{system_id}/applicationsets/{volume_set_id}/snapshots/{snapshot_id}".format(
                 system_id=system_id,
                 volume_set_id=volume_set_id,
-                snapshot_id=snapshot_id))
+                snapshot_id=snapshot_id),
+            wait=False)
 
     def _delete_volumeset_snapshots_all(self, system_id, volume_set_id):
-        api_response = self.resource_client.device_type1_volume_set_snapshots_list(system_id, volume_set_id)
-        response = api_response.to_dict()
-
-        if response.get("items"):
-            for snapshot in response.get("items"):
-                self._delete_volume_snapshot(
-                    system_id, volume_set_id, snapshot["id"])
-
+        snapshots = self.list_resource_items(
+            self.resource_client.device_type1_volume_set_snapshots_list,
+            system_id, volume_set_id)
+
+        # Submit all the removals, then wait for them together
+        tasks = [self._delete_volumeset_snapshot(
+            system_id, volume_set_id, snapshot["id"])
+            for snapshot in snapshots]
+        return self.wait_for_tasks(tasks)
 
 def main():
     '''
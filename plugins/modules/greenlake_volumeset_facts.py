@@ -35,6 +35,26 @@ options:
         - "To gather facts about getVolumes and getSnapshots
            a Volumeset name/id is required. Otherwise, these options will be ignored."
       type: list
+    where:
+      description:
+        - List of predicates the listed resources must match, each one a dict with the C(field) (nested fields separated by C(.)),
+          the C(op) and the C(value) to compare with.
+        - "C(op) is one of C(eq) (default), C(ne), C(gt), C(ge), C(lt), C(le), which are sent to the API in the filter query,
+          or C(in), C(not_in), C(contains), C(startswith), C(endswith), C(regex), which are checked on the decoded resources."
+        - Set C(local) to C(true) on a predicate to check it on the decoded resources when the API can not filter on its field.
+        - Set C(datetime) to C(true) on a predicate whose C(value) is an ISO 8601 date-time, which the API expects unquoted.
+          The other string values are always quoted.
+        - The predicates are combined with C(and), along with the C(filter) of C(params).
+      required: false
+      type: list
+    select:
+      description:
+        - List of the fields to keep in the facts, e.g. C(id), C(app_set_name) or C(members). Nested fields are separated
+          by C(.), e.g. C(members.name).
+        - When listing the volume sets of all the systems, the selection is sent to the API as a C(select) query,
+          so the unneeded fields are not even transferred. Otherwise it is applied to every page once it is decoded.
+      required: false
+      type: list
     params:
       description:
         - List of params to delimit, filter and sort the list of resources.
@@ -55,6 +75,16 @@ EXAMPLES = '''
     client_id: <client_id>
     client_secret: <client_secret>
 - debug: var=volume_sets
+
+- name: Get the GreenLake volume sets with the names of their members
+  greenlake_volumeset_facts:
+    host: <host>
+    client_id: <client_id>
+    client_secret: <client_secret>
+    select:
+      - app_set_name
+      - members.name
+- debug: var=volume_sets
 '''
 
 RETURN = '''
@@ -70,6 +100,8 @@ from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.greenl
 
 class GreenLakeVolumeSetFactsModule(GreenLakeDataServiceModule):
 
+    FAN_OUT_PROFILES = True
+
     def __init__(self):
         argument_spec = dict(id=dict(type='str'),
                              name=dict(type='str'),
@@ -77,7 +109,9 @@ class GreenLakeVolumeSetFactsModule(GreenLakeDataServiceModule):
                              device_type=dict(required=True,
                                               choices=['1', '2']),
                              options=dict(type='list'),
-                             params=dict(type='dict'))
+                             params=dict(type='dict'),
+                             select=dict(type='list'),
+                             where=dict(type='list'))
 
         super(GreenLakeVolumeSetFactsModule, self).__init__(
             additional_arg_spec=argument_spec)
@@ -97,44 +131,38 @@ class GreenLakeVolumeSetFactsModule(GreenLakeDataServiceModule):
         ansible_facts = {'volume_sets': []}
 
         if self.module.params.get('id') or self.module.params.get('name'):
-            ansible_facts["volume_sets"].append(self.resource_data)
+            ansible_facts["volume_sets"].append(
+                self.project_facts(self.resource_data))
 
             if self.options:
                 more_facts = self.__gather_optional_facts(ansible_facts)
                 ansible_facts.update(more_facts)
 
         elif self.module.params.get('system_id'):
-            api_response = self.resource_client.device_type1_volume_sets_list(
+            ansible_facts["volume_sets"] = self.list_facts(
+                self.resource_client.device_type1_volume_sets_list,
                 self.module.params['system_id'])
 
-            ansible_facts["volume_sets"] = api_response.to_dict()["items"]
-
         else:
-            api_response = self.resource_client.volumeset_list(
+            ansible_facts["volume_sets"] = self.list_facts(
+                self.resource_client.volumeset_list, select_pushdown=True,
                 **self.facts_params)
 
-            ansible_facts["volume_sets"] = api_response.to_dict()["items"]
-
         return dict(changed=False, ansible_facts=ansible_facts)
 
     def __gather_optional_facts(self, ansible_facts):
         more_facts = {"snapshots": [], "volumes": []}
 
         if self.options.get('getVolumes'):
-            api_response = self.resource_client.volumeset_get_byvolumeset_id(
-               self.resource_data['id'])
-            response = api_response.to_dict()
-            if response.get("items"):
-                more_facts["volumes"] = response["items"]
+            more_facts["volumes"] = self.list_resource_items(
+                self.resource_client.volumeset_get_byvolumeset_id,
+                self.resource_data['id'])
 
         if self.options.get('getSnapshots'):
-            api_response = self.resource_client.device_type1_volume_set_snapshots_list(
+            more_facts["snapshots"] = self.list_resource_items(
+                self.resource_client.device_type1_volume_set_snapshots_list,
                 self.resource_data["system_id"],
                 self.resource_data['id'])
-            response = api_response.to_dict()
-
-            if response.get("items"):
-                more_facts["snapshots"] = response["items"]
 
         return more_facts
 
@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Runs the collection modules in the controller worker process.
+
+The modules only talk to the GreenLake REST API, so the action plugins can
+call the module class directly instead of packaging it with AnsiballZ,
+copying it and starting a Python interpreter that imports the SDK again for
+every task. The access tokens and the HTTP sessions stay in the worker
+process, and are reused by the next loop items of the task.
+
+The modules run on the target host as usual unless the
+greenlake_controller_execution variable is set to true, since the
+configuration files and the environment are then read on the controller.
+"""
+
+import importlib
+import inspect
+import traceback
+
+from ansible.module_utils._text import to_native
+from ansible.module_utils.common.parameters import remove_values
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.plugins.action import ActionBase
+
+try:
+    # ansible-core >= 2.11, the modules run on the target with older versions
+    from ansible.module_utils.common.arg_spec import ArgumentSpecValidator
+    HAS_ARGUMENT_SPEC_VALIDATOR = True
+except ImportError:
+    HAS_ARGUMENT_SPEC_VALIDATOR = False
+
+COLLECTION = 'hpe.greenlake_data_services'
+MODULES_PACKAGE = 'ansible_collections.hpe.greenlake_data_services.plugins.modules'
+CONTROLLER_EXECUTION_VAR = 'greenlake_controller_execution'
+
+
+class ControllerModuleExit(Exception):
+    """
+    Raised by ControllerModule.exit_json and fail_json with the result of
+    the module.
+    """
+
+    def __init__(self, result):
+        super(ControllerModuleExit, self).__init__(result.get('msg', ''))
+        self.result = result
+
+
+class ControllerModule(object):
+    """
+    Stand-in for AnsibleModule, validating the task arguments in the
+    controller and returning the result instead of printing it.
+    """
+
+    def __init__(self, argument_spec, args, supports_check_mode=False,
+                 **kwargs):
+        """
+        Args:
+            argument_spec: argument spec of the module.
+            args: task arguments.
+            supports_check_mode: as for AnsibleModule, the action plugin
+                skipping the modules which do not support it.
+            kwargs: mutually_exclusive, required_one_of and the other
+                constraints of AnsibleModule.
+        """
+        validation = ArgumentSpecValidator(argument_spec,
+                                           **kwargs).validate(args)
+        self.params = validation.validated_parameters
+        self.no_log_values = get_no_log_values(argument_spec, self.params)
+        self.warnings = []
+
+        if validation.error_messages:
+            self.fail_json(msg='; '.join(validation.error_messages))
+
+    def warn(self, warning):
+        self.warnings.append(warning)
+
+    def exit_json(self, **kwargs):
+        if self.warnings:
+            kwargs.setdefault('warnings', []).extend(self.warnings)
+        raise ControllerModuleExit(remove_values(kwargs, self.no_log_values))
+
+    def fail_json(self, msg, **kwargs):
+        kwargs['failed'] = True
+        kwargs['msg'] = msg
+        self.exit_json(**kwargs)
+
+
+def get_no_log_values(argument_spec, params):
+    """
+    Returns the values of the no_log parameters, including the ones of the
+    suboptions, to mask in the result of the module.
+    """
+    values = set()
+    for name, spec in argument_spec.items():
+        value = params.get(name)
+        if value is None or value == '':
+            continue
+
+        if spec.get('no_log'):
+            if isinstance(value, dict):
+                value = list(value.values())
+            if isinstance(value, (list, tuple, set)):
+                values.update(to_native(item) for item in value
+                              if item not in (None, ''))
+            else:
+                values.add(to_native(value))
+
+        if spec.get('options'):
+            for item in value if isinstance(value, list) else [value]:
+                if isinstance(item, dict):
+                    values.update(get_no_log_values(spec['options'], item))
+
+    return values
+
+
+def load_module_class(module_name):
+    """
+    Imports a collection module and returns its module class, the most
+    derived class defined in the module file.
+
+    Raises: ImportError when the module, or a requirement of it such as the
+        SDK, can not be imported on the controller.
+    """
+    module = importlib.import_module(MODULES_PACKAGE + '.' + module_name)
+    classes = [value for value in vars(module).values()
+               if inspect.isclass(value) and value.__module__ == module.__name__
+               and hasattr(value, 'execute_module')]
+    classes = [cls for cls in classes
+               if not any(other is not cls and issubclass(other, cls)
+                          for other in classes)]
+    if len(classes) != 1:
+        raise ImportError("No module class found in " + module_name)
+    return classes[0]
+
+
+def run_in_controller(module_class, args):
+    """
+    Runs a module class with the task arguments.
+
+    Returns: the result of the module, as returned by a module process.
+    """
+    class ControllerRun(module_class):
+
+        def _create_module(self, argument_spec, **kwargs):
+            return ControllerModule(argument_spec, args, **kwargs)
+
+    ControllerRun.__name__ = module_class.__name__
+
+    try:
+        ControllerRun().run()
+    except ControllerModuleExit as exit:
+        return exit.result
+    except Exception as exception:
+        return dict(failed=True, msg=to_native(exception),
+                    exception=traceback.format_exc())
+
+    return dict(failed=True, msg="The module returned no result")
+
+
+class GreenLakeActionBase(ActionBase):
+    """
+    Action plugin running the module of the same name in the controller.
+
+    Only runs in the controller when the greenlake_controller_execution
+    variable is true, and falls back to the usual module execution on the
+    target for async tasks, with ansible-core < 2.11, or when the module
+    can not be imported on the controller.
+    """
+
+    TRANSFERS_FILES = False
+
+    # Name of the module run by the action plugin
+    MODULE_NAME = None
+
+    # Modules which must run at the same place, e.g. the module writing
+    # the local files the module reads. The module runs on the target when
+    # one of them can not run in the controller.
+    COLOCATED_MODULES = ()
+
+    def run(self, tmp=None, task_vars=None):
+        result = super(GreenLakeActionBase, self).run(tmp, task_vars)
+        del tmp
+
+        task_vars = task_vars or {}
+        module_class = None
+        # Background tasks run on the target, through the async wrapper
+        if (HAS_ARGUMENT_SPEC_VALIDATOR
+                and boolean(task_vars.get(CONTROLLER_EXECUTION_VAR, False),
+                            strict=False)
+                and not self._task.async_val):
+            try:
+                for module_name in self.COLOCATED_MODULES:
+                    load_module_class(module_name)
+                module_class = load_module_class(self.MODULE_NAME)
+            except ImportError as exception:
+                self._display.vvv(
+                    "Running %s on the target, it can not be imported on "
+                    "the controller: %s" % (self.MODULE_NAME,
+                                            to_native(exception)))
+
+        if module_class is None:
+            result.update(self._execute_module(
+                module_name=COLLECTION + '.' + self.MODULE_NAME,
+                module_args=self._task.args, task_vars=task_vars))
+            return result
+
+        if (self._play_context.check_mode
+                and not getattr(module_class, 'SUPPORTS_CHECK_MODE', False)):
+            result.update(skipped=True,
+                          msg="The module does not support check mode")
+            return result
+
+        result.update(run_in_controller(module_class, dict(self._task.args)))
+        return result
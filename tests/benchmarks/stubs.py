@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Synthetic resources and stubbed clients shared by the benchmarks.
+"""
+
+import json
+import re
+
+import pytest
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.greenlake import GreenLakeDataServiceModule, decode_json_response
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.response_cache import CachedResponse
+
+SYSTEM_ID = "2M29510B8L"
+
+# Number of host groups a volume is exported to, per resource size
+EXPORTS = {'realistic': 4, 'extreme': 2000}
+
+
+def make_volume(index, size='realistic'):
+    """
+    Returns a volume in the API format. 'extreme' volumes are exported to
+    thousands of host groups and carry large nested documents.
+    """
+    exports = EXPORTS[size]
+    volume = {
+        "id": "%032x" % index,
+        "name": "AnsibleTestVolume.%d" % index,
+        "systemId": SYSTEM_ID,
+        "sizeMiB": 16384.0,
+        "usedSizeMiB": 1024.0,
+        "comment": "Ansible library test",
+        "wwn": "60002AC00000000000%06d" % index,
+        "customerId": "0123456789abcdef0123456789abcdef",
+        "userCpg": "SSD_r6",
+        "snapCpg": "SSD_r6",
+        "provisioningType": "TPVV",
+        "dataReduction": True,
+        "creationTime": {"ms": 1686000000000 + index, "tz": "UTC"},
+        "capacityEfficiency": {"compaction": 1.5, "deduplication": 1.1},
+        "hostGroups": [{"id": "%032x" % (1000000 + group),
+                        "name": "hostGroup%d" % group}
+                       for group in range(exports)],
+        "associatedLinks": [{"type": "snapshots",
+                             "resourceUri": "/api/v1/volumes/%032x/snapshots"
+                             % index}],
+    }
+
+    if size == 'extreme':
+        volume["metadata"] = dict(("key%d" % key, {"value": "x" * 64,
+                                                   "tags": list(range(16))})
+                                  for key in range(500))
+
+    return volume
+
+
+def to_resource_data(resource):
+    """
+    Returns a resource keyed like the decoded resources of the modules.
+    """
+    return decode_json_response(json.dumps(resource))
+
+
+class StubRESTClient(object):
+    """
+    Stands in for the SDK REST client. GET requests of a collection answer
+    with the page of items, the other GET requests with the first item.
+    """
+
+    ITEM_URL = re.compile(r'/[0-9a-f]{32}$')
+
+    def __init__(self, items):
+        self.page = json.dumps({"items": items, "count": len(items),
+                                "offset": 0, "total": len(items)}).encode('utf-8')
+        self.item = json.dumps(items[0] if items else {}).encode('utf-8')
+
+    def GET(self, url, **kwargs):
+        body = self.item if self.ITEM_URL.search(url) else self.page
+        return CachedResponse({'Content-Type': 'application/json'}, body)
+
+
+def make_api_client(items):
+    """
+    Returns a SDK ApiClient answering from the items instead of the API.
+    """
+    greenlake_data_services = pytest.importorskip('greenlake_data_services')
+
+    configuration = greenlake_data_services.Configuration(
+        access_token='token', host='https://localhost')
+    api_client = greenlake_data_services.ApiClient(configuration)
+    api_client.rest_client = StubRESTClient(items)
+    return api_client
+
+
+class BenchModule(GreenLakeDataServiceModule):
+    """
+    Module running the shared helpers without Ansible and without the API.
+    """
+
+    def __init__(self, resource_client):
+        self.resource_client = resource_client
+        self.resource_data = {}
+        self.export_topology = None
+        self.rate_limiter = None
+        self.response_cache = None
+        self.where = []
+        self.select = []
+        self.projection = {}
+        self.device_type = "1"
+
+    def execute_module(self):
+        pass
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Benchmarks the resource comparison helpers the modules run on every
+reconcile.
+"""
+
+import copy
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.greenlake import (
+    _standardize_value, compare, compare_list, transform_list_to_dict)
+
+from stubs import make_volume, to_resource_data
+
+SIZES = ['realistic', 'extreme']
+
+
+@pytest.fixture(params=SIZES)
+def resource(request):
+    return to_resource_data(make_volume(1, request.param))
+
+
+@pytest.mark.benchmark(group='compare')
+def test_compare_equal(benchmark, resource):
+    # Reordered copy, the worst case: every value is compared
+    other = copy.deepcopy(resource)
+    other["host_groups"].reverse()
+
+    assert benchmark(compare, resource, other)
+
+
+@pytest.mark.benchmark(group='compare')
+def test_compare_changed(benchmark, resource):
+    other = copy.deepcopy(resource)
+    other["host_groups"][-1]["name"] = "renamed"
+
+    assert not benchmark(compare, resource, other)
+
+
+@pytest.mark.benchmark(group='compare_list')
+def test_compare_list(benchmark, resource):
+    host_groups = resource["host_groups"]
+    reordered = list(reversed(host_groups))
+
+    assert benchmark(compare_list, host_groups, reordered)
+
+
+@pytest.mark.benchmark(group='standardize_value')
+@pytest.mark.parametrize('value', [
+    16384.0, "16384", "AnsibleTestVolume.1", None,
+    ["SSD_r6", "SSD_r6", 1, 2.0] * 64,
+], ids=['float', 'number', 'string', 'none', 'list'])
+def test_standardize_value(benchmark, value):
+    benchmark(_standardize_value, value)
+
+
+@pytest.mark.benchmark(group='transform_list_to_dict')
+@pytest.mark.parametrize('count', [10, 10000])
+def test_transform_list_to_dict(benchmark, count):
+    options = (["getVolumes", "getSnapshots"] * (count // 4)
+               + [{"option%d" % index: {"limit": index}}
+                  for index in range(count // 2)])
+
+    result = benchmark(transform_list_to_dict, options)
+    assert result["getVolumes"]
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Benchmarks the *_get_by_id_or_name helpers and the SDK model conversion
+they replace, against a stubbed REST client.
+"""
+
+import pytest
+
+pytest.importorskip('greenlake_data_services')
+pytest.importorskip('pytest_benchmark')
+
+from greenlake_data_services.api import volumes_api
+
+from stubs import BenchModule, make_api_client, make_volume
+
+SIZES = ['realistic', 'extreme']
+
+# Number of volumes in the page answering a lookup by name
+PAGE_SIZE = 10
+
+
+@pytest.fixture(params=SIZES)
+def module(request):
+    items = [make_volume(index, request.param) for index in range(PAGE_SIZE)]
+    return BenchModule(volumes_api.VolumesApi(make_api_client(items)))
+
+
+@pytest.mark.benchmark(group='get_by_id')
+def test_sdk_model_to_dict(benchmark, module):
+    resource = benchmark(
+        lambda: module.resource_client.volume_get_by_id("%032x" % 0).to_dict())
+    assert resource["system_id"]
+
+
+@pytest.mark.benchmark(group='get_by_id')
+def test_volume_get_by_id(benchmark, module):
+    resource = benchmark(module.volume_get_by_id_or_name, "%032x" % 0, None)
+    assert resource["system_id"]
+
+
+@pytest.mark.benchmark(group='get_by_name')
+def test_sdk_list_model_to_dict(benchmark, module):
+    items = benchmark(lambda: module.resource_client.volumes_list(
+        filter="name eq 'AnsibleTestVolume.0'").to_dict()["items"])
+    assert items[0]["system_id"]
+
+
+@pytest.mark.benchmark(group='get_by_name')
+def test_volume_get_by_name(benchmark, module):
+    resource = benchmark(module.volume_get_by_id_or_name, None,
+                         "AnsibleTestVolume.0")
+    assert resource["system_id"]
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Compares the SDK model deserialization of list pages with the raw JSON fast
+path used by the facts modules.
+
+Run with: pytest tests/benchmarks/test_list_decode.py --benchmark-group-by=param
+"""
+
+import pytest
+
+greenlake_data_services = pytest.importorskip('greenlake_data_services')
+pytest.importorskip('pytest_benchmark')
+
+from greenlake_data_services.api import volumes_api
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.greenlake import decode_json_response
+
+from stubs import make_api_client, make_volume
+
+PAGE_SIZES = [100, 1000, 10000]
+
+
+@pytest.fixture(params=PAGE_SIZES, ids=lambda size: 'items=%d' % size)
+def volumes(request):
+    items = [make_volume(index) for index in range(request.param)]
+    return volumes_api.VolumesApi(make_api_client(items))
+
+
+@pytest.mark.benchmark(group='volumes_list')
+def test_sdk_models_to_dict(benchmark, volumes):
+    items = benchmark(lambda: volumes.volumes_list().to_dict()["items"])
+    assert items[0]["system_id"] == "2M29510B8L"
+
+
+@pytest.mark.benchmark(group='volumes_list')
+def test_sdk_models_eval_to_str(benchmark, volumes):
+    items = benchmark(
+        lambda: eval(volumes.volumes_list().to_str()).get("items", []))
+    assert items[0]["system_id"] == "2M29510B8L"
+
+
+@pytest.mark.benchmark(group='volumes_list')
+def test_raw_json(benchmark, volumes):
+    items = benchmark(lambda: decode_json_response(
+        volumes.volumes_list(_preload_content=False).data)["items"])
+    assert items[0]["system_id"] == "2M29510B8L"
+    assert items[0]["size_mi_b"] == 16384.0
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Benchmarks the HTTP/1.1 and the HTTP/2 transports sending a burst of
+concurrent GET requests to a local server answering after a fixed latency.
+
+The server speaks HTTP/1.1 and cleartext HTTP/2 on the same port, the HTTP/2
+client using prior knowledge since there is no TLS to negotiate it with ALPN.
+"""
+
+import asyncio
+import concurrent.futures
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+pytest.importorskip('requests')
+pytest.importorskip('httpx')
+pytest.importorskip('h2')
+pytest.importorskip('hypercorn')
+
+import requests
+from hypercorn.asyncio import serve
+from hypercorn.config import Config
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.http2_transport import Http2Session, create_http2_client
+
+# Seconds the server takes to answer a request
+LATENCY = 0.02
+
+# Number of requests sent at the same time, per burst
+CONCURRENCY = [16, 64]
+
+BODY = json.dumps({"items": [{"id": "%032x" % index,
+                              "name": "AnsibleTestVolume.%d" % index}
+                             for index in range(10)]}).encode('utf-8')
+
+
+async def app(scope, receive, send):
+    if scope['type'] != 'http':
+        return
+    await asyncio.sleep(LATENCY)
+    await send({'type': 'http.response.start', 'status': 200,
+                'headers': [(b'content-type', b'application/json')]})
+    await send({'type': 'http.response.body', 'body': BODY})
+
+
+@pytest.fixture(scope='module')
+def server_url():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+
+    config = Config()
+    config.bind = ['127.0.0.1:{0}'.format(port)]
+    config.accesslog = None
+    config.errorlog = None
+
+    loop = asyncio.new_event_loop()
+    stopped = asyncio.Event()
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.call_soon(started.set)
+        loop.run_until_complete(serve(app, config,
+                                      shutdown_trigger=stopped.wait))
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    started.wait()
+
+    url = 'http://127.0.0.1:{0}/api/v1/volumes'.format(port)
+    for _ in range(50):
+        try:
+            requests.get(url, timeout=1)
+            break
+        except requests.ConnectionError:
+            time.sleep(0.1)
+
+    yield url
+
+    loop.call_soon_threadsafe(stopped.set)
+    thread.join(5)
+
+
+def send_burst(session, url, concurrency):
+    with concurrent.futures.ThreadPoolExecutor(concurrency) as executor:
+        responses = list(executor.map(
+            lambda index: session.request('GET', url,
+                                          params={'offset': index}),
+            range(concurrency)))
+    assert all(response.status_code == 200 for response in responses)
+    return responses
+
+
+@pytest.mark.parametrize('concurrency', CONCURRENCY)
+@pytest.mark.benchmark(group='transport')
+def test_http1_burst(benchmark, server_url, concurrency):
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=concurrency)
+    session.mount('http://', adapter)
+
+    responses = benchmark.pedantic(send_burst,
+                                   args=(session, server_url, concurrency),
+                                   rounds=10, warmup_rounds=1)
+    assert responses[0].json()['items']
+    session.close()
+
+
+@pytest.mark.parametrize('concurrency', CONCURRENCY)
+@pytest.mark.benchmark(group='transport')
+def test_http2_burst(benchmark, server_url, concurrency):
+    session = Http2Session(create_http2_client(max_connections=1,
+                                               prior_knowledge=True))
+
+    responses = benchmark.pedantic(send_burst,
+                                   args=(session, server_url, concurrency),
+                                   rounds=10, warmup_rounds=1)
+    assert responses[0].http_version == 'HTTP/2'
+    assert responses[0].json()['items']
+    session.close()
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Throughput and soak harness running the collection modules through
+ansible-playbook against the local stand-in API.
+
+Every inventory host is a local connection running one task of the
+scenario, so --hosts sets the number of tasks per run and --forks the
+number of concurrent module processes. The modules append their own
+statistics (elapsed time, requests, token fetches, coalesced requests,
+settled adaptive concurrency, peak memory) to the file named by
+GREENLAKE_STATS_FILE, and the stand-in API counts the requests it served.
+
+Examples:
+
+    python tests/load/run_load.py --scenario volume --hosts 200 --forks 50
+    python tests/load/run_load.py --scenario facts --forks 100 --latency 0.2
+    python tests/load/run_load.py --scenario host --duration 1800 --output soak.json
+
+The collection must be installed, or --collections-path must point at the
+directory holding ansible_collections/hpe/greenlake_data_services.
+"""
+
+import argparse
+import json
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from stand_in_api import TOKEN_PATH, STATS_PATH, StandInAPI, start_server
+
+SYSTEM_ID = "2M29510B8L"
+
+SCENARIOS = {
+    # The first round creates a volume per host, the next ones reconcile it
+    'volume': """
+    - name: Reconcile volume
+      hpe.greenlake_data_services.greenlake_volume:
+        config: "{{ config }}"
+        system_id: "%(system_id)s"
+        state: present
+        data:
+          name: "load-{{ inventory_hostname }}"
+          size_mib: 16384.0
+          user_cpg: "SSD_r6"
+          snap_cpg: "SSD_r6"
+""",
+    'host': """
+    - name: Reconcile host
+      hpe.greenlake_data_services.greenlake_host:
+        config: "{{ config }}"
+        state: present
+        data:
+          name: "load-{{ inventory_hostname }}"
+          initiator_ids: []
+          operating_system: "Ubuntu"
+          user_created: true
+""",
+    'facts': """
+    - name: Gather volume facts
+      hpe.greenlake_data_services.greenlake_volume_facts:
+        config: "{{ config }}"
+    - name: Gather host facts
+      hpe.greenlake_data_services.greenlake_host_facts:
+        config: "{{ config }}"
+""",
+}
+
+
+def percentile(values, fraction):
+    """
+    Returns the nearest rank percentile of the values.
+    """
+    if not values:
+        return None
+    values = sorted(values)
+    rank = min(len(values), max(1, int(math.ceil(fraction * len(values)))))
+    return values[rank - 1]
+
+
+def read_stats(path):
+    stats = []
+    if os.path.exists(path):
+        with open(path) as stats_fd:
+            for line in stats_fd:
+                try:
+                    stats.append(json.loads(line))
+                except ValueError:
+                    continue
+    return stats
+
+
+def server_stats(base_url):
+    with urllib.request.urlopen(base_url + STATS_PATH) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def write_files(workdir, args, base_url):
+    config = os.path.join(workdir, 'greenlake_config.json')
+    with open(config, 'w') as config_fd:
+        json.dump({"host": base_url, "client_id": "load",
+                   "client_secret": "load",
+                   "token_url": base_url + TOKEN_PATH}, config_fd)
+
+    inventory = os.path.join(workdir, 'inventory')
+    with open(inventory, 'w') as inventory_fd:
+        inventory_fd.write('[load]\n')
+        for index in range(args.hosts):
+            inventory_fd.write(
+                'load%05d ansible_connection=local '
+                'ansible_python_interpreter=%s\n' % (index, sys.executable))
+
+    playbook = os.path.join(workdir, 'playbook.yml')
+    with open(playbook, 'w') as playbook_fd:
+        playbook_fd.write("""---
+- hosts: load
+  gather_facts: false
+  vars:
+    config: "%(config)s"
+  tasks:
+%(tasks)s
+""" % dict(config=config,
+           tasks=SCENARIOS[args.scenario] % dict(system_id=SYSTEM_ID)))
+
+    return inventory, playbook
+
+
+def run_once(args, inventory, playbook, base_url, stats_file, round_number):
+    env = dict(os.environ,
+               GREENLAKE_STATS_FILE=stats_file,
+               # The stand-in token endpoint is served over http
+               OAUTHLIB_INSECURE_TRANSPORT='1',
+               ANSIBLE_HOST_KEY_CHECKING='False',
+               ANSIBLE_STDOUT_CALLBACK='null' if not args.verbose
+               else 'default')
+    if args.collections_path:
+        env['ANSIBLE_COLLECTIONS_PATH'] = args.collections_path
+
+    if os.path.exists(stats_file):
+        os.remove(stats_file)
+    before = server_stats(base_url)
+
+    start = time.time()
+    process = subprocess.run(
+        ['ansible-playbook', '-i', inventory, '-f', str(args.forks),
+         playbook],
+        env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+    wall = time.time() - start
+
+    after = server_stats(base_url)
+    served = dict((key, after.get(key, 0) - before.get(key, 0))
+                  for key in after)
+    stats = read_stats(stats_file)
+
+    tasks = len(stats)
+    latencies = [entry['elapsed'] for entry in stats]
+    memory = [entry['max_rss_kb'] for entry in stats]
+    api_calls = sum(value for key, value in served.items() if key != 'token')
+
+    return dict(
+        round=round_number,
+        returncode=process.returncode,
+        output=process.stdout.decode('utf-8', 'replace')[-2000:]
+        if process.returncode else '',
+        wall_seconds=round(wall, 3),
+        tasks=tasks,
+        tasks_per_minute=round(tasks / wall * 60, 1) if wall else None,
+        latency_p50=percentile(latencies, 0.50),
+        latency_p95=percentile(latencies, 0.95),
+        latency_p99=percentile(latencies, 0.99),
+        api_calls=served,
+        api_calls_per_task=round(api_calls / tasks, 2) if tasks else None,
+        token_fetches=served.get('token', 0),
+        coalesced=sum(sum((entry.get('coalesced') or {}).values())
+                      for entry in stats),
+        concurrency_limit_p50=percentile(
+            [entry['concurrency']['limit'] for entry in stats
+             if entry.get('concurrency')], 0.50),
+        max_rss_kb_p50=percentile(memory, 0.50),
+        max_rss_kb_max=max(memory) if memory else None,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.split('\n\n')[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenario', choices=sorted(SCENARIOS),
+                        default='volume')
+    parser.add_argument('--hosts', type=int, default=100,
+                        help='inventory hosts, i.e. tasks per run')
+    parser.add_argument('--forks', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=1,
+                        help='runs of the playbook')
+    parser.add_argument('--duration', type=float, default=0,
+                        help='soak: repeat the runs for this many seconds')
+    parser.add_argument('--latency', type=float, default=0.05,
+                        help='seconds added to every API request')
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--task-latency', type=float, default=0.0,
+                        help='seconds before the tasks succeed')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='fraction of the writes failing with 500')
+    parser.add_argument('--collections-path')
+    parser.add_argument('--output', help='JSON file of the results')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args()
+
+    api = StandInAPI(args.latency, args.jitter, args.task_latency,
+                     args.error_rate)
+    server = start_server(api)
+    base_url = 'http://127.0.0.1:%d' % server.server_port
+
+    workdir = tempfile.mkdtemp(prefix='greenlake_load_')
+    try:
+        inventory, playbook = write_files(workdir, args, base_url)
+        stats_file = os.path.join(workdir, 'stats.jsonl')
+
+        results, round_number = [], 0
+        deadline = time.time() + args.duration
+        while (round_number < args.rounds
+               or (args.duration and time.time() < deadline)):
+            result = run_once(args, inventory, playbook, base_url,
+                              stats_file, round_number)
+            results.append(result)
+            print(json.dumps(dict((key, value) for key, value
+                                  in result.items() if key != 'output')))
+            if result['returncode'] and result['output']:
+                print(result['output'], file=sys.stderr)
+            round_number += 1
+    finally:
+        server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = dict(scenario=args.scenario, hosts=args.hosts, forks=args.forks,
+                  latency=args.latency, task_latency=args.task_latency,
+                  rounds=results)
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+
+    return 1 if any(result['returncode'] for result in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
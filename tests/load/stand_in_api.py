@@ -0,0 +1,285 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Local stand-in for the Greenlake Data Services API and its token endpoint,
+used by the load harness.
+
+Resources live in memory, one store per collection, the collection being the
+last non id segment of the path, so the per system and the global endpoints
+of a collection share their resources. Every write answers with a task that
+succeeds after task_latency seconds. Every request is delayed by latency
+seconds, plus a random jitter, and counted.
+
+Run standalone with: python tests/load/stand_in_api.py --port 8443 --latency 0.05
+"""
+
+import argparse
+import collections
+import json
+import random
+import re
+import threading
+import time
+import uuid
+
+try:
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+except ImportError:
+    raise SystemExit("The stand-in API requires python >= 3.7")
+
+TOKEN_PATH = '/as/token.oauth2'
+STATS_PATH = '/_stats'
+
+ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+FILTER_PATTERN = re.compile(r"(\w+) eq '?((?:[^']|'')*)'?")
+
+
+def camel_case(name):
+    first, *rest = name.split('_')
+    return first + ''.join(part.title() for part in rest)
+
+
+class StandInAPI(object):
+    """
+    In-memory state and counters of the stand-in API.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, task_latency=0.0,
+                 error_rate=0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.task_latency = task_latency
+        self.error_rate = error_rate
+        self.collections = collections.defaultdict(dict)
+        self.tasks = {}
+        self.counts = collections.Counter()
+        self.lock = threading.Lock()
+
+    def delay(self):
+        time.sleep(max(0.0, self.latency + random.uniform(-self.jitter,
+                                                          self.jitter)))
+
+    def count(self, key):
+        with self.lock:
+            self.counts[key] += 1
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counts)
+
+    def new_task(self, resource):
+        task_id = uuid.uuid4().hex
+        with self.lock:
+            self.tasks[task_id] = dict(created=time.time(),
+                                       resource=resource)
+        return {"taskUri": "/api/v1/tasks/" + task_id, "status": "SUBMITTED",
+                "message": ""}
+
+    def get_task(self, task_id):
+        with self.lock:
+            task = self.tasks.get(task_id)
+        if not task:
+            return 404, {"message": "task not found"}
+
+        done = time.time() - task['created'] >= self.task_latency
+        resource = task['resource'] or {}
+        return 200, {
+            "id": task_id,
+            "taskUri": "/api/v1/tasks/" + task_id,
+            "status": "SUCCEEDED" if done else "RUNNING",
+            "state": "SUCCEEDED" if done else "RUNNING",
+            "message": "",
+            "associatedResources": [
+                {"id": resource.get("id"), "name": resource.get("name"),
+                 "type": resource.get("type", ""),
+                 "resourceUri": resource.get("resourceUri", "")}
+            ] if done and resource else [],
+        }
+
+    @staticmethod
+    def split(path):
+        """
+        Returns the collection name and the resource id of a path.
+        """
+        parts = [part for part in path.split('/') if part]
+        if parts and ID_PATTERN.match(parts[-1]):
+            return parts[-2] if len(parts) > 1 else '', parts[-1]
+        return parts[-1] if parts else '', None
+
+    def list(self, collection, query):
+        with self.lock:
+            items = list(self.collections[collection].values())
+
+        for field, value in FILTER_PATTERN.findall(
+                (query.get('filter') or [''])[0]):
+            value = value.replace("''", "'")
+            items = [item for item in items
+                     if str(item.get(camel_case(field), item.get(field)))
+                     == value]
+
+        total = len(items)
+        offset = int((query.get('offset') or [0])[0])
+        limit = int((query.get('limit') or [total or 1])[0])
+        items = items[offset:offset + limit]
+
+        return 200, {"items": items, "count": len(items), "offset": offset,
+                     "total": total}
+
+    def handle(self, method, path, query, body):
+        collection, resource_id = self.split(path)
+        store = self.collections[collection]
+
+        if collection == 'tasks' and resource_id and method == 'GET':
+            return self.get_task(resource_id)
+
+        if method == 'GET':
+            if resource_id is None:
+                return self.list(collection, query)
+            with self.lock:
+                resource = store.get(resource_id)
+            return (200, resource) if resource else (404, {})
+
+        if self.error_rate and random.random() < self.error_rate:
+            return 500, {"message": "injected failure"}
+
+        parts = [part for part in path.split('/') if part]
+        is_action = len(parts) > 1 and ID_PATTERN.match(parts[-2])
+
+        if method == 'POST' and resource_id is None and not is_action:
+            resource = dict(body or {})
+            resource["id"] = uuid.uuid4().hex
+            resource.setdefault("name", resource.get("appSetName"))
+            resource["resourceUri"] = path.rstrip('/') + '/' + resource["id"]
+            if 'device-type1' in parts:
+                resource["systemId"] = parts[parts.index('device-type1') + 1]
+            with self.lock:
+                store[resource["id"]] = resource
+            return 202, self.new_task(resource)
+
+        if method in ('PUT', 'PATCH') and resource_id:
+            with self.lock:
+                resource = store.get(resource_id)
+                if resource is None:
+                    return 404, {}
+                resource.update(body or {})
+            return 202, self.new_task(resource)
+
+        if method == 'DELETE' and resource_id:
+            with self.lock:
+                resource = store.pop(resource_id, None)
+            return (202, self.new_task(resource)) if resource else (404, {})
+
+        # Actions, e.g. exports: answered with a task on the parent
+        return 202, self.new_task(None)
+
+
+def make_handler(api):
+
+    class Handler(BaseHTTPRequestHandler):
+
+        protocol_version = 'HTTP/1.1'
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, status, payload):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _body(self):
+            length = int(self.headers.get('Content-Length') or 0)
+            if not length:
+                return {}
+            raw = self.rfile.read(length)
+            try:
+                return json.loads(raw)
+            except ValueError:
+                # Form encoded token requests
+                return dict((key, values[0]) for key, values
+                            in parse_qs(raw.decode('utf-8')).items())
+
+        def _dispatch(self, method):
+            url = urlparse(self.path)
+            body = self._body()
+
+            if url.path == STATS_PATH:
+                return self._reply(200, api.stats())
+
+            api.delay()
+
+            if url.path == TOKEN_PATH:
+                api.count('token')
+                return self._reply(200, {"access_token": uuid.uuid4().hex,
+                                         "token_type": "bearer",
+                                         "expires_in": 7200})
+
+            kind = ('poll' if '/tasks/' in url.path else
+                    'read' if method == 'GET' else 'write')
+            api.count(kind)
+            status, payload = api.handle(method, url.path,
+                                         parse_qs(url.query), body)
+            self._reply(status, payload)
+
+        def do_GET(self):
+            self._dispatch('GET')
+
+        def do_POST(self):
+            self._dispatch('POST')
+
+        def do_PUT(self):
+            self._dispatch('PUT')
+
+        def do_PATCH(self):
+            self._dispatch('PATCH')
+
+        def do_DELETE(self):
+            self._dispatch('DELETE')
+
+    return Handler
+
+
+def start_server(api, port=0):
+    """
+    Starts the stand-in API in a background thread.
+
+    Returns: the server, its base url being
+        'http://127.0.0.1:%d' % server.server_port
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(api))
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--port', type=int, default=8443)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--jitter', type=float, default=0.01)
+    parser.add_argument('--task-latency', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = start_server(StandInAPI(args.latency, args.jitter,
+                                     args.task_latency, args.error_rate),
+                          args.port)
+    print("Stand-in API listening on http://127.0.0.1:%d" % server.server_port)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
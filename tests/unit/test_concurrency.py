@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Behavior of the AIMD concurrency limiter.
+"""
+
+import threading
+import time
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.concurrency import AdaptiveConcurrencyLimiter, get_concurrency_limiter
+
+
+def fill(limiter):
+    """
+    Takes every free slot of the limiter.
+    """
+    tickets = []
+    while True:
+        ticket = limiter.try_acquire()
+        if ticket is None:
+            return tickets
+        tickets.append(ticket)
+
+
+def test_429_burst_cuts_once():
+    limiter = AdaptiveConcurrencyLimiter(initial=8, max_limit=16)
+    tickets = fill(limiter)
+    assert len(tickets) == 8
+
+    for ticket in tickets:
+        limiter.release(ticket, 'write', throttled=True)
+
+    facts = limiter.to_facts()
+    assert facts['limit'] == 4
+    assert facts['cuts'] == 1
+    assert facts['throttled'] == 8
+
+
+def test_429_after_cut_cuts_again():
+    limiter = AdaptiveConcurrencyLimiter(initial=8, max_limit=16)
+    limiter.release(limiter.acquire(), 'write', throttled=True)
+    limiter.release(limiter.acquire(), 'write', throttled=True)
+
+    assert limiter.to_facts()['limit'] == 2
+    assert limiter.to_facts()['cuts'] == 2
+
+
+def test_cut_stops_at_min_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial=2, min_limit=2)
+    limiter.release(limiter.acquire(), 'read', throttled=True)
+
+    assert limiter.to_facts()['limit'] == 2
+
+
+def test_latency_spike_cuts():
+    limiter = AdaptiveConcurrencyLimiter(initial=8, latency_tolerance=2.0)
+    for _ in range(3):
+        limiter.release(limiter.acquire(), 'read')
+
+    generation, started_at = limiter.acquire()
+    limiter.release((generation, started_at - 5), 'read')
+
+    facts = limiter.to_facts()
+    assert facts['latency_spikes'] == 1
+    assert facts['limit'] == 4
+
+
+def test_increase_only_when_busy():
+    limiter = AdaptiveConcurrencyLimiter(initial=4, max_limit=16)
+
+    # One request at a time never uses half of the limit
+    for _ in range(50):
+        limiter.release(limiter.acquire(), 'read')
+    assert limiter.to_facts()['limit'] == 4
+
+    for _ in range(4):
+        for ticket in fill(limiter):
+            limiter.release(ticket, 'read')
+
+    facts = limiter.to_facts()
+    assert facts['limit'] > 4
+    assert facts['increases'] == facts['limit'] - 4
+
+
+def test_increase_stops_at_max_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial=2, max_limit=3)
+    for _ in range(20):
+        for ticket in fill(limiter):
+            limiter.release(ticket, 'read')
+
+    assert limiter.to_facts()['limit'] == 3
+
+
+def test_acquire_waits_for_a_slot():
+    limiter = AdaptiveConcurrencyLimiter(initial=1, max_limit=1)
+    ticket = limiter.acquire()
+    assert limiter.try_acquire() is None
+
+    acquired = threading.Event()
+
+    def acquire():
+        limiter.release(limiter.acquire(), 'read')
+        acquired.set()
+
+    thread = threading.Thread(target=acquire)
+    thread.start()
+    time.sleep(0.05)
+    assert not acquired.is_set()
+
+    limiter.release(ticket, 'read')
+    thread.join(5)
+    assert acquired.is_set()
+    assert limiter.to_facts()['peak'] == 1
+
+
+def test_get_concurrency_limiter():
+    assert get_concurrency_limiter(None) is None
+    assert get_concurrency_limiter(True).to_facts()['max_limit'] == 64
+
+    limiter = get_concurrency_limiter({'initial': 2, 'max': 8})
+    assert limiter.to_facts()['limit'] == 2
+    assert limiter.to_facts()['max_limit'] == 8
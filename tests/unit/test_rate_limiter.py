@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Behavior of the token bucket rate limiter shared by the module processes.
+"""
+
+import os
+
+import pytest
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.rate_limiter import TokenBucketRateLimiter, get_rate_limiter
+
+# Seconds of slack on the computed waits
+TOLERANCE = 0.05
+
+
+@pytest.fixture
+def state_file(tmp_path):
+    return str(tmp_path / 'rate_limit.json')
+
+
+def test_burst_then_rate(state_file):
+    limiter = TokenBucketRateLimiter({'read': {'rate': 10, 'burst': 3}},
+                                     state_file)
+
+    waits = [limiter.reserve('read') for _ in range(5)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3] == pytest.approx(0.1, abs=TOLERANCE)
+    assert waits[4] == pytest.approx(0.2, abs=TOLERANCE)
+
+
+def test_unlimited_bucket(state_file):
+    limiter = TokenBucketRateLimiter({'read': {'rate': 10}}, state_file)
+
+    assert all(limiter.reserve('write') == 0.0 for _ in range(100))
+
+
+def test_processes_share_the_budget(state_file):
+    buckets = {'write': {'rate': 10, 'burst': 2}}
+    first = TokenBucketRateLimiter(buckets, state_file)
+    second = TokenBucketRateLimiter(buckets, state_file)
+
+    assert first.reserve('write') == 0.0
+    assert second.reserve('write') == 0.0
+    assert first.reserve('write') == pytest.approx(0.1, abs=TOLERANCE)
+
+
+def test_penalize_backs_off(state_file):
+    limiter = TokenBucketRateLimiter({'poll': {'rate': 10, 'burst': 5}},
+                                     state_file)
+
+    limiter.penalize('poll', 2)
+
+    assert limiter.reserve('poll') == pytest.approx(2.1, abs=TOLERANCE)
+
+
+def test_get_rate_limiter(tmp_path):
+    assert get_rate_limiter(None, 'host', 'client') is None
+    assert get_rate_limiter({'read': {}}, 'host', 'client') is None
+
+    state_file = str(tmp_path / 'state.json')
+    limiter = get_rate_limiter({'read': {'rate': 5},
+                                'state_file': state_file}, 'host', 'client')
+    assert limiter.state_file == state_file
+    assert limiter.buckets == {'read': (5.0, 5.0)}
+    assert not os.path.exists(state_file)
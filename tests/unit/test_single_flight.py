@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Behavior of the coalescing of identical concurrent calls.
+"""
+
+import threading
+import time
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.single_flight import SingleFlight
+
+CALLERS = 8
+
+
+def call_concurrently(single_flight, key, func):
+    """
+    Calls func through single_flight from CALLERS threads, the first call
+    being held until every other caller joined it.
+
+    Returns: list of the (result, exception) of the callers.
+    """
+    release = threading.Event()
+    outcomes = []
+    lock = threading.Lock()
+
+    def held():
+        release.wait(5)
+        return func()
+
+    def caller():
+        try:
+            outcome = (single_flight.do(key, held), None)
+        except Exception as exception:
+            outcome = (None, exception)
+        with lock:
+            outcomes.append(outcome)
+
+    threads = [threading.Thread(target=caller) for _ in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+
+    deadline = time.time() + 5
+    while (single_flight.saved.get(key, 0) < CALLERS - 1
+           and time.time() < deadline):
+        time.sleep(0.01)
+    release.set()
+
+    for thread in threads:
+        thread.join(5)
+    return outcomes
+
+
+def test_callers_share_the_result():
+    single_flight = SingleFlight()
+    calls = []
+
+    def func():
+        calls.append(1)
+        return {'id': 'a'}
+
+    outcomes = call_concurrently(single_flight, 'GET /volumes', func)
+
+    assert len(calls) == 1
+    assert single_flight.saved == {'GET /volumes': CALLERS - 1}
+    assert len(outcomes) == CALLERS
+    results = [result for result, _ in outcomes]
+    assert all(result is results[0] for result in results)
+
+
+def test_callers_share_the_exception():
+    single_flight = SingleFlight()
+
+    def func():
+        raise ValueError('HTTP 500')
+
+    outcomes = call_concurrently(single_flight, 'GET /volumes', func)
+
+    errors = [error for _, error in outcomes]
+    assert len(errors) == CALLERS
+    assert all(isinstance(error, ValueError) for error in errors)
+
+
+def test_calls_after_completion_are_not_coalesced():
+    single_flight = SingleFlight()
+    calls = []
+
+    for _ in range(3):
+        single_flight.do('GET /volumes', lambda: calls.append(1))
+
+    assert len(calls) == 3
+    assert single_flight.saved == {}
+
+
+def test_different_keys_are_not_coalesced():
+    single_flight = SingleFlight()
+
+    assert single_flight.do('GET /volumes', lambda: 1) == 1
+    assert single_flight.do('GET /hosts', lambda: 2) == 2
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+
+# Copyright: Hewlett Packard Enterprise Development LP.
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""
+Selection of the snapshots pruned by greenlake_snapshot.
+"""
+
+import pytest
+
+from ansible_collections.hpe.greenlake_data_services.plugins.module_utils.snapshot_retention import expired_snapshots, snapshot_time
+
+# 2024-01-10T00:00:00Z
+NOW = 1704844800.0
+DAY = 86400
+
+
+def snapshot(name, days_ago=None, **fields):
+    fields.update(id=name, name=name)
+    if days_ago is not None:
+        fields['creation_time'] = dict(ms=int((NOW - days_ago * DAY) * 1000))
+    return fields
+
+
+def names(snapshots):
+    return [item['name'] for item in snapshots]
+
+
+SNAPSHOTS = [
+    snapshot('daily-3', 3),
+    snapshot('daily-1', 1),
+    snapshot('manual', 10),
+    snapshot('daily-2', 2),
+    snapshot('daily-unknown'),
+    snapshot('daily-garbled', creation_time='yesterday'),
+    snapshot('daily-9', 9),
+]
+
+
+def test_retain_count_keeps_the_most_recent():
+    expired = expired_snapshots(SNAPSHOTS, 'daily-', retain_count=2,
+                                now=NOW)
+    assert names(expired) == ['daily-3', 'daily-9']
+
+
+def test_retain_days():
+    expired = expired_snapshots(SNAPSHOTS, 'daily-', retain_days=2,
+                                now=NOW + 1)
+    assert names(expired) == ['daily-2', 'daily-3', 'daily-9']
+
+
+def test_retain_count_and_days():
+    expired = expired_snapshots(SNAPSHOTS, 'daily-', retain_count=3,
+                                retain_days=5, now=NOW)
+    assert names(expired) == ['daily-9']
+
+
+def test_unknown_time_never_expires():
+    expired = expired_snapshots(SNAPSHOTS, 'daily-', retain_count=0,
+                                retain_days=0, now=NOW)
+    assert 'daily-unknown' not in names(expired)
+    assert 'daily-garbled' not in names(expired)
+    assert len(expired) == 4
+
+
+def test_nothing_pruned_without_prefix_or_retention():
+    assert expired_snapshots(SNAPSHOTS, '', retain_count=0, now=NOW) == []
+    assert expired_snapshots(SNAPSHOTS, None, retain_days=0, now=NOW) == []
+    assert expired_snapshots(SNAPSHOTS, 'daily-', now=NOW) == []
+
+
+def test_snapshot_time_formats():
+    assert snapshot_time(dict(creation_time=dict(ms=1704844800000))) == NOW
+    assert snapshot_time(dict(creation_time=1704844800)) == NOW
+    assert snapshot_time(
+        dict(created_at='2024-01-10T00:00:00.1234567Z')) == pytest.approx(
+            NOW + 0.123456)
+    assert snapshot_time(dict(created_at='2024-01-10T01:00:00+01:00')) == NOW
+    assert snapshot_time(dict(created_at='2024-01-10T00:00:00')) == NOW
+    assert snapshot_time(dict(created_at='garbled')) is None
+    assert snapshot_time(dict()) is None